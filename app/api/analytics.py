@@ -1,15 +1,61 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models.schemas import WeeklyReportResponseSchema
-from app.tools.analytics import weekly_report
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from app.models.schemas import (
+    PeriodReportResponseSchema,
+    UsageReportResponseSchema,
+    WeeklyReportResponseSchema,
+)
+from app.tools.analytics import (
+    compute_period_report,
+    compute_weekly_report,
+    current_week_start,
+    data_version,
+)
+from app.tools.report_cache import etag_matches, get_report_cache, report_etag
 from app.core.config import APP_TZ
+from app.db import usage
+from app.db.engine import connection
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 
+def _versioned_report(
+    response: Response,
+    if_none_match: Optional[str],
+    user_id: str,
+    kind: str,
+    params: Tuple,
+    compute: Callable[[], Dict[str, Any]],
+) -> Union[Response, Dict[str, Any]]:
+    """
+    Serve a report through the user's data version: a matching If-None-Match
+    gets a bare 304, otherwise the report comes from the cache or compute().
+    """
+    version = data_version(user_id)
+    headers = {
+        "ETag": report_etag(user_id, kind, params, version),
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    cache = get_report_cache()
+    if cache is None:
+        report = compute()
+    else:
+        report = cache.get_or_compute(user_id, kind, params, version, compute)
+    response.headers.update(headers)
+    return report
+
+
 @router.get("/weekly-report", response_model=WeeklyReportResponseSchema)
 def get_weekly_report(
+    response: Response,
     user_id: str = Query(..., description="User ID"),
     tz: str = Query(APP_TZ, description="Timezone (e.g., Asia/Kolkata)"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Generate a weekly expense report for the user.
@@ -22,7 +68,16 @@ def get_weekly_report(
     - Insights and patterns
     """
     try:
-        report = weekly_report(user_id, tz)
+        report = _versioned_report(
+            response,
+            if_none_match,
+            user_id,
+            "weekly",
+            (tz, current_week_start(tz)),
+            lambda: compute_weekly_report(user_id, tz),
+        )
+        if isinstance(report, Response):
+            return report
         return WeeklyReportResponseSchema(**report)
     except Exception as e:
         raise HTTPException(
@@ -30,6 +85,84 @@ def get_weekly_report(
         )
 
 
+@router.get("/report", response_model=PeriodReportResponseSchema)
+def get_period_report(
+    response: Response,
+    user_id: str = Query(..., description="User ID"),
+    start: date = Query(..., description="First day of the period (YYYY-MM-DD)"),
+    end: date = Query(..., description="Last day of the period (YYYY-MM-DD)"),
+    granularity: Literal["day", "week", "month"] = Query(
+        "day", description="Bucket size for by_bucket"
+    ),
+    compare: bool = Query(False, description="Include the previous period"),
+    tz: str = Query(APP_TZ, description="Timezone (e.g., Asia/Kolkata)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Generate an expense report for any date range.
+
+    Returns the weekly report fields for the period plus:
+    - Totals per day/week/month bucket
+    - Optional comparison with the previous period of the same length
+    """
+    try:
+        report = _versioned_report(
+            response,
+            if_none_match,
+            user_id,
+            "period",
+            (tz, start, end, granularity, compare),
+            lambda: compute_period_report(
+                user_id, start, end, granularity, compare, tz
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error generating report: {str(e)}"
+        )
+    if isinstance(report, Response):
+        return report
+    return PeriodReportResponseSchema(**report)
+
+
+@router.get("/usage", response_model=UsageReportResponseSchema)
+def get_llm_usage(
+    start: Optional[date] = Query(None, description="First day (default: 7 days ago)"),
+    end: Optional[date] = Query(None, description="Last day (default: today)"),
+    user_id: Optional[str] = Query(None, description="Only this user's usage"),
+    group_by: List[Literal["user_id", "thread_id", "node", "day"]] = Query(
+        ["user_id", "thread_id"], description="Columns to group by"
+    ),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum rows"),
+):
+    """
+    LLM calls, tokens and estimated cost over a date range, heaviest first.
+
+    Group by user_id + thread_id to find runaway threads, by node to see
+    where tokens go (agent, process_expense, context summaries), or by day
+    to measure an optimization.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    recorder = usage.get_usage_recorder()
+    try:
+        if recorder is not None:
+            # Include calls made since the last periodic flush
+            recorder.flush()
+        with connection(usage.DB_PATH) as conn:
+            report = usage.usage_report(conn, start, end, group_by, user_id, limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error generating usage report: {str(e)}"
+        )
+    return UsageReportResponseSchema(**report)
+
+
 @router.get("/health")
 def health_check():
     """Health check endpoint for analytics service."""
@@ -1,31 +1,88 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
 from app.models.schemas import ChatSchema, ChatResponseSchema
-from app.core.state_graph import build_graph
-from app.core.config import APP_TZ
+from app.core.state_graph import abuild_graph
+from app.core.config import APP_TZ, CHAT_MAX_CONCURRENCY, CHAT_TIMEOUT_S
+from app.core import metrics
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import logging
 import uuid
-import concurrent.futures
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-# Initialize the graph once (in production, consider using FastAPI lifecycle events)
+# Initialize the graph once, on first use from the serving event loop
 graph = None
-# Shared thread pool to run blocking LLM calls without hanging the main thread
-_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+_graph_lock = asyncio.Lock()
+# Caps conversations in flight; everything else waits on the event loop, not a thread
+_semaphore = asyncio.Semaphore(CHAT_MAX_CONCURRENCY)
 
 logger = logging.getLogger(__name__)
 
 
-def get_graph():
+async def get_graph():
     global graph
     if graph is None:
-        graph = build_graph()
+        async with _graph_lock:
+            if graph is None:
+                graph = await abuild_graph()
     return graph
 
 
+async def close_graph():
+    """Close the async checkpointer connection (called on app shutdown)."""
+    global graph
+    if graph is not None:
+        await graph.checkpointer.conn.close()
+        graph = None
+
+
+def _message_text(msg) -> str:
+    """Flatten a message's content (str or list of content blocks) into text."""
+    content = getattr(msg, "content", str(msg))
+
+    if isinstance(content, list):
+        text_parts = []
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text":
+                text_parts.append(block.get("text", ""))
+            elif isinstance(block, str):
+                text_parts.append(block)
+        content = " ".join(text_parts) if text_parts else str(content)
+
+    return content
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@asynccontextmanager
+async def _slot(endpoint: str):
+    """Hold a concurrency slot, tracked by the waiting/in-flight gauges."""
+    metrics.CHAT_WAITING.inc()
+    try:
+        await _semaphore.acquire()
+    finally:
+        metrics.CHAT_WAITING.dec()
+    metrics.CHAT_IN_FLIGHT.inc()
+    try:
+        with metrics.CHAT_SECONDS.time(endpoint):
+            yield
+    finally:
+        metrics.CHAT_IN_FLIGHT.dec()
+        _semaphore.release()
+
+
+async def _run_graph(app, inputs, config):
+    async with _slot("message"):
+        return await app.ainvoke(inputs, config)
+
+
 @router.post("/message", response_model=ChatResponseSchema)
-def send_message(request: ChatSchema):
+async def send_message(request: ChatSchema):
     """
     Send a message to the finance manager agent.
 
@@ -40,7 +97,7 @@ def send_message(request: ChatSchema):
             # fallback for immutable models
             object.__setattr__(request, "thread_id", thread_id)
 
-        app = get_graph()
+        app = await get_graph()
 
         config = {
             "configurable": {
@@ -50,19 +107,21 @@ def send_message(request: ChatSchema):
             }
         }
 
-        # Run the blocking invoke in a thread with a timeout to avoid indefinite hangs
+        # Run the graph with a timeout to avoid indefinite hangs
         logger.info(
             "Invoking LangGraph agent for user %s thread %s",
             request.user_id,
             request.thread_id,
         )
-        future = _executor.submit(
-            app.invoke, {"messages": [HumanMessage(content=request.message)]}, config
-        )
         try:
-            output = future.result(timeout=60)
-        except concurrent.futures.TimeoutError:
-            future.cancel()
+            output = await asyncio.wait_for(
+                _run_graph(
+                    app, {"messages": [HumanMessage(content=request.message)]}, config
+                ),
+                timeout=CHAT_TIMEOUT_S,
+            )
+        except asyncio.TimeoutError:
+            metrics.CHAT_TIMEOUTS.inc("message")
             logger.error("LLM invoke timed out for user %s", request.user_id)
             raise HTTPException(status_code=504, detail="LLM request timed out")
         except Exception as e:
@@ -71,19 +130,7 @@ def send_message(request: ChatSchema):
                 status_code=500, detail=f"Error processing message: {e}"
             )
 
-        last_msg = output["messages"][-1]
-        response_content = getattr(last_msg, "content", str(last_msg))
-
-        if isinstance(response_content, list):
-            text_parts = []
-            for block in response_content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-                elif isinstance(block, str):
-                    text_parts.append(block)
-            response_content = (
-                " ".join(text_parts) if text_parts else str(response_content)
-            )
+        response_content = _message_text(output["messages"][-1])
 
         return ChatResponseSchema(
             user_id=request.user_id,
@@ -93,12 +140,92 @@ def send_message(request: ChatSchema):
             status="success",
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error processing message: {str(e)}"
         )
 
 
+@router.post("/stream")
+async def stream_message(request: ChatSchema):
+    """
+    Send a message and stream the agent's progress as Server-Sent Events.
+
+    Events:
+    - token: text chunk generated by the agent model
+    - tool_start / tool_end: tool name with its input / output
+    - final: the complete ChatResponseSchema payload
+    - error: status code and detail if the run fails
+    """
+    thread_id = request.thread_id or str(uuid.uuid4())
+    config = {
+        "configurable": {
+            "user_id": request.user_id,
+            "thread_id": thread_id,
+            "tz": request.tz or APP_TZ,
+        }
+    }
+    inputs = {"messages": [HumanMessage(content=request.message)]}
+    app = await get_graph()
+
+    async def events():
+        output = None
+        try:
+            async with _slot("stream"), asyncio.timeout(CHAT_TIMEOUT_S):
+                async for ev in app.astream_events(inputs, config, version="v2"):
+                    kind = ev["event"]
+                    node = ev.get("metadata", {}).get("langgraph_node")
+
+                    if kind == "on_chat_model_stream" and node == "agent":
+                        text = _message_text(ev["data"]["chunk"])
+                        if text:
+                            yield _sse("token", {"text": text})
+                    elif kind == "on_tool_start":
+                        yield _sse(
+                            "tool_start",
+                            {"name": ev["name"], "input": ev["data"].get("input")},
+                        )
+                    elif kind == "on_tool_end":
+                        out = ev["data"].get("output")
+                        yield _sse(
+                            "tool_end",
+                            {
+                                "name": ev["name"],
+                                "output": getattr(out, "content", out),
+                            },
+                        )
+                    elif kind == "on_chain_end" and not ev.get("parent_ids"):
+                        output = ev["data"].get("output")
+        except TimeoutError:
+            metrics.CHAT_TIMEOUTS.inc("stream")
+            logger.error("LLM stream timed out for user %s", request.user_id)
+            yield _sse("error", {"status": 504, "detail": "LLM request timed out"})
+            return
+        except Exception as e:
+            logger.exception("Error during agent stream: %s", e)
+            yield _sse(
+                "error", {"status": 500, "detail": f"Error processing message: {e}"}
+            )
+            return
+
+        final = ChatResponseSchema(
+            user_id=request.user_id,
+            thread_id=thread_id,
+            user_message=request.message,
+            agent_response=_message_text(output["messages"][-1]) if output else "",
+            status="success",
+        )
+        yield _sse("final", final.model_dump(mode="json"))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/health")
 def health_check():
     """Health check endpoint to verify the chat service is running."""
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import tempfile
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import ValidationError
+
+from app.core.config import APP_TZ, BULK_MAX_ITEMS
+from app.models.schemas import (
+    BulkExpenseSchema,
+    BulkExpenseResponseSchema,
+    StatementImportResponseSchema,
+)
+from app.tools.ingest import ingest_texts
+from app.tools.statement_import import (
+    StatementFormatError,
+    import_statement,
+    open_text,
+)
+
+router = APIRouter(prefix="/api/expenses", tags=["expenses"])
+
+logger = logging.getLogger(__name__)
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+async def _ndjson_lines(request: Request):
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    # The last line may not end in a newline
+    yield buffer
+
+
+async def _ndjson_texts(request: Request):
+    """Yield texts from an NDJSON body line by line as it arrives."""
+    count = 0
+    async for line in _ndjson_lines(request):
+        text = _parse_ndjson_line(line)
+        if text is None:
+            continue
+        count += 1
+        if count > BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {BULK_MAX_ITEMS} items allowed",
+            )
+        yield text
+
+
+def _parse_ndjson_line(line: bytes) -> Optional[str]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        value = json.loads(line)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=422, detail=f"Invalid NDJSON line: {line!r}")
+    if isinstance(value, dict):
+        value = value.get("text")
+    if not isinstance(value, str):
+        raise HTTPException(
+            status_code=422, detail='Each NDJSON line must be a string or {"text": ...}'
+        )
+    return value
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkExpenseResponseSchema,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": BulkExpenseSchema.model_json_schema(),
+                },
+                "application/x-ndjson": {
+                    "schema": {"type": "string", "description": "One text per line"}
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def bulk_ingest(
+    request: Request,
+    user_id: Optional[str] = Query(None, description="User ID (NDJSON bodies)"),
+    tz: Optional[str] = Query(None, description="Timezone (NDJSON bodies)"),
+):
+    """
+    Extract and log many raw expense texts in one call.
+
+    Accepts either a JSON body (BulkExpenseSchema) or an NDJSON stream with
+    one text (or {"text": ...} object) per line and user_id/tz as query params.
+    Clear expenses are inserted in batched transactions; ambiguous ones are
+    returned with their clarification question and not logged.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_TYPES:
+        if not user_id:
+            raise HTTPException(status_code=422, detail="user_id query param required")
+        texts = _ndjson_texts(request)
+    else:
+        try:
+            body = BulkExpenseSchema.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        if len(body.texts) > BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413, detail=f"At most {BULK_MAX_ITEMS} items allowed"
+            )
+        user_id, tz, texts = body.user_id, body.tz or tz, body.texts
+
+    try:
+        result = await ingest_texts(user_id, texts, tz or APP_TZ)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Bulk ingestion failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error ingesting expenses: {e}")
+
+    return BulkExpenseResponseSchema(**result)
+
+
+@router.post(
+    "/import",
+    response_model=StatementImportResponseSchema,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ofx": {"schema": {"type": "string"}},
+            },
+            "required": True,
+        }
+    },
+)
+async def import_bank_statement(
+    request: Request,
+    user_id: str = Query(..., description="User ID"),
+    format: Literal["csv", "ofx"] = Query("csv", description="Statement format"),
+    tz: str = Query(APP_TZ, description="Timezone (e.g., Asia/Kolkata)"),
+    date_format: Optional[str] = Query(None, description="strptime date format"),
+    positive_debits: bool = Query(False, description="Positive amounts are debits"),
+):
+    """
+    Import a CSV/OFX bank statement sent as the raw request body.
+
+    Rows are mapped to expenses and categorized locally (no LLM), then
+    inserted in large transactions. The upload is spooled to disk, so
+    memory stays constant regardless of file size.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        def run():
+            return import_statement(
+                user_id,
+                open_text(spool),
+                fmt=format,
+                tz=tz,
+                date_format=date_format,
+                positive_debits=positive_debits,
+            )
+
+        try:
+            result = await asyncio.to_thread(run)
+        except StatementFormatError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception as e:
+            logger.exception("Statement import failed: %s", e)
+            raise HTTPException(
+                status_code=500, detail=f"Error importing statement: {e}"
+            )
+
+    return StatementImportResponseSchema(**result)
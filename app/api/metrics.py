@@ -0,0 +1,49 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics
+from app.core.context_window import context_window_stats
+from app.core.router import router_stats
+from app.db.usage import get_usage_recorder
+from app.db.write_queue import get_write_queue
+from app.tools.categorizer import get_categorizer
+from app.tools.extraction_cache import get_extraction_cache
+from app.tools.fast_parser import fast_path_stats
+from app.tools.merchants import get_merchant_index
+from app.tools.report_cache import get_report_cache
+
+router = APIRouter(tags=["metrics"])
+
+
+def component_stats() -> Dict[str, Dict[str, Any]]:
+    """stats() of every optimization component that is enabled."""
+    stats = {
+        "router": router_stats(),
+        "fast_parser": fast_path_stats(),
+        "context_window": context_window_stats(),
+    }
+    for name, get in (
+        ("write_queue", get_write_queue),
+        ("llm_usage", get_usage_recorder),
+        ("categorizer", get_categorizer),
+        ("merchant_index", get_merchant_index),
+        ("extraction_cache", get_extraction_cache),
+        ("report_cache", get_report_cache),
+    ):
+        component = get()
+        if component is not None:
+            stats[name] = component.stats()
+    return stats
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint: node, tool, LLM and SQL latency histograms,
+    chat concurrency gauges and timeouts, plus component counters.
+    """
+    return PlainTextResponse(
+        metrics.render(component_stats()), media_type=metrics.CONTENT_TYPE
+    )
@@ -23,3 +23,84 @@ LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY")
 LANGCHAIN_PROJECT = os.getenv("LANGCHAIN_PROJECT")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Rule-based extraction in front of the LLM (see app/tools/fast_parser.py)
+FAST_PARSER_ENABLED = os.getenv("FAST_PARSER_ENABLED", "true").lower() == "true"
+FAST_PARSER_MIN_CONFIDENCE = float(os.getenv("FAST_PARSER_MIN_CONFIDENCE", "0.85"))
+
+# Per-user categorizer learned from past expenses (see app/tools/categorizer.py)
+CATEGORIZER_ENABLED = os.getenv("CATEGORIZER_ENABLED", "true").lower() == "true"
+CATEGORIZER_MIN_CONFIDENCE = float(os.getenv("CATEGORIZER_MIN_CONFIDENCE", "0.85"))
+CATEGORIZER_MAX_ROWS = int(os.getenv("CATEGORIZER_MAX_ROWS", "5000"))
+CATEGORIZER_MAX_USERS = int(os.getenv("CATEGORIZER_MAX_USERS", "256"))
+
+# Canonical merchant ids for merchant spellings (see app/tools/merchants.py)
+MERCHANT_INDEX_ENABLED = os.getenv("MERCHANT_INDEX_ENABLED", "true").lower() == "true"
+
+# LLM token accounting (see app/db/usage.py); prices are USD per million tokens
+USAGE_TRACKING_ENABLED = os.getenv("USAGE_TRACKING_ENABLED", "true").lower() == "true"
+USAGE_FLUSH_INTERVAL_S = float(os.getenv("USAGE_FLUSH_INTERVAL_S", "30"))
+LLM_INPUT_COST_PER_MTOK = float(os.getenv("LLM_INPUT_COST_PER_MTOK", "1.25"))
+LLM_OUTPUT_COST_PER_MTOK = float(os.getenv("LLM_OUTPUT_COST_PER_MTOK", "10.0"))
+
+# Cache of LLM extraction results (see app/tools/extraction_cache.py)
+EXTRACTION_CACHE_ENABLED = (
+    os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+)
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "2048"))
+EXTRACTION_CACHE_TTL_S = int(os.getenv("EXTRACTION_CACHE_TTL_S", str(7 * 24 * 3600)))
+# Optional SQLite file to persist the cache across restarts; empty disables it
+EXTRACTION_CACHE_DB = os.getenv("EXTRACTION_CACHE_DB", "")
+
+# Shared LLM HTTP connection pool (see app/core/llm.py)
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_POOL_KEEPALIVE_S = float(os.getenv("LLM_POOL_KEEPALIVE_S", "60"))
+
+# Chat concurrency: conversations in flight per process and per-request timeout
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "32"))
+CHAT_TIMEOUT_S = float(os.getenv("CHAT_TIMEOUT_S", "60"))
+
+# Agent prompt budget (see app/core/context_window.py): once the prompt exceeds
+# CONTEXT_TOKEN_BUDGET tokens, older turns are folded into a rolling summary
+# until it fits in CONTEXT_TRIM_RATIO of the budget. 0 disables trimming.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+CONTEXT_TRIM_RATIO = float(os.getenv("CONTEXT_TRIM_RATIO", "0.5"))
+
+# Bulk ingestion (/api/expenses/bulk)
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "8"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+STATEMENT_IMPORT_BATCH_SIZE = int(os.getenv("STATEMENT_IMPORT_BATCH_SIZE", "5000"))
+
+# Computed analytics reports, keyed on the user's data version
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE_ENABLED", "true").lower() == "true"
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "1024"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# find_expenses text filters via the FTS5 trigram index (see app/db/search.py)
+FTS_SEARCH_ENABLED = os.getenv("FTS_SEARCH_ENABLED", "true").lower() == "true"
+
+# SQLite connections (see app/db/engine.py)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "10"))
+SQLITE_POOL_MAX_OVERFLOW = int(os.getenv("SQLITE_POOL_MAX_OVERFLOW", "20"))
+SQLITE_POOL_TIMEOUT_S = float(os.getenv("SQLITE_POOL_TIMEOUT_S", "30"))
+
+# Group-commit queue for expense writes (see app/db/write_queue.py)
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "false").lower() == "true"
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "256"))
+WRITE_QUEUE_MAX_WAIT_MS = float(os.getenv("WRITE_QUEUE_MAX_WAIT_MS", "5"))
+
+# LangGraph checkpoint retention (see app/db/checkpoint_retention.py)
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+CHECKPOINT_THREAD_TTL_S = float(
+    os.getenv("CHECKPOINT_THREAD_TTL_S", str(30 * 24 * 3600))
+)
+CHECKPOINT_VACUUM_PAGES = int(os.getenv("CHECKPOINT_VACUUM_PAGES", "0"))
+# Seconds between background compactions in the API process; 0 disables
+CHECKPOINT_COMPACT_INTERVAL_S = float(
+    os.getenv("CHECKPOINT_COMPACT_INTERVAL_S", "3600")
+)
@@ -0,0 +1,222 @@
+"""
+Token-budgeted prompt window for the agent.
+
+The checkpoint keeps a thread's full history, but the agent only gets the
+recent turns verbatim. When the prompt would exceed CONTEXT_TOKEN_BUDGET,
+the oldest turns (tool calls and ToolMessages included) are folded into a
+rolling summary stored in the state, cutting at HumanMessage boundaries so
+a tool call is never separated from its result. Trimming goes down to
+CONTEXT_TRIM_RATIO of the budget, so the summary is refreshed every few
+turns rather than on every message.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from app.core.config import CONTEXT_TOKEN_BUDGET, CONTEXT_TRIM_RATIO
+from app.core.llm import get_chat_model
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """
+You maintain the memory of a conversation between a user and a personal
+finance agent. Merge the previous summary with the new messages into one
+updated summary. Keep every fact needed to continue the conversation:
+expense ids, amounts, dates, categories, merchants, open clarification
+questions and preferences the user stated. Drop greetings and tool-calling
+mechanics. Reply with the summary only, in under 200 words.
+"""
+
+# Tool results are clipped in the transcript sent to the summarizer
+_TOOL_RESULT_CHARS = 500
+# Used as the summary if the summarizer call fails
+_FALLBACK_CHARS = 2000
+
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "trimmed_calls": 0,
+    "summaries": 0,
+    "summary_failures": 0,
+    "tokens_before": 0,
+    "tokens_after": 0,
+}
+
+
+def count_tokens(messages: Sequence[AnyMessage]) -> int:
+    return count_tokens_approximately(messages)
+
+
+def summary_message(summary: Optional[str]) -> List[SystemMessage]:
+    if not summary:
+        return []
+    return [SystemMessage(content=f"SUMMARY OF EARLIER CONVERSATION:\n{summary}")]
+
+
+def plan_cut(
+    messages: Sequence[AnyMessage],
+    start: int,
+    overhead: int,
+    budget: Optional[int] = None,
+    ratio: Optional[float] = None,
+) -> int:
+    """
+    Index the verbatim window should start at. start when messages[start:]
+    plus overhead tokens fit the budget, otherwise the earliest later
+    HumanMessage whose suffix fits ratio * budget (at worst the last one).
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    ratio = CONTEXT_TRIM_RATIO if ratio is None else ratio
+    if budget <= 0:
+        return start
+
+    sizes = [count_tokens([m]) for m in messages[start:]]
+    if overhead + sum(sizes) <= budget:
+        return start
+
+    target = budget * ratio
+    suffix = overhead + sum(sizes)
+    cut = start
+    for offset, size in enumerate(sizes):
+        index = start + offset
+        if index > start and isinstance(messages[index], HumanMessage):
+            cut = index
+            if suffix <= target:
+                break
+        suffix -= size
+    return cut
+
+
+def _transcript(messages: Sequence[AnyMessage]) -> str:
+    lines = []
+    for msg in messages:
+        content = msg.content if isinstance(msg.content, str) else str(msg.content)
+        if isinstance(msg, HumanMessage):
+            lines.append(f"User: {content}")
+        elif isinstance(msg, AIMessage):
+            if content:
+                lines.append(f"Agent: {content}")
+            for call in msg.tool_calls:
+                lines.append(f"Agent called {call['name']}({json.dumps(call['args'])})")
+        elif isinstance(msg, ToolMessage):
+            lines.append(f"Tool {msg.name} returned: {content[:_TOOL_RESULT_CHARS]}")
+    return "\n".join(lines)
+
+
+def _summary_prompt(previous: Optional[str], messages: Sequence[AnyMessage]):
+    return [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(
+            content=(
+                f"PREVIOUS SUMMARY:\n{previous or '(none)'}\n\n"
+                f"NEW MESSAGES:\n{_transcript(messages)}"
+            )
+        ),
+    ]
+
+
+def _fallback_summary(previous: Optional[str], messages: Sequence[AnyMessage]):
+    with _stats_lock:
+        _stats["summary_failures"] += 1
+    text = "\n".join(filter(None, [previous, _transcript(messages)]))
+    return text[-_FALLBACK_CHARS:]
+
+
+def _result_text(msg) -> str:
+    content = msg.content
+    if isinstance(content, list):
+        content = " ".join(
+            b.get("text", "") if isinstance(b, dict) else str(b) for b in content
+        )
+    return content.strip()
+
+
+def _update(summary: str, cut: int) -> Dict[str, Any]:
+    with _stats_lock:
+        _stats["summaries"] += 1
+    return {"summary": summary, "summarized_upto": cut}
+
+
+def _pending_fold(state, overhead: int):
+    messages = state.get("messages", [])
+    start = state.get("summarized_upto") or 0
+    overhead += count_tokens(summary_message(state.get("summary")))
+    cut = plan_cut(messages, start, overhead)
+    return messages[start:cut], cut
+
+
+def compact(state, overhead: int = 0) -> Dict[str, Any]:
+    """
+    State update folding the turns that no longer fit into the summary,
+    or {} if the window fits. overhead is the system prompt's token count.
+    """
+    folded, cut = _pending_fold(state, overhead)
+    if not folded:
+        return {}
+    previous = state.get("summary")
+    try:
+        summary = _result_text(
+            get_chat_model().invoke(_summary_prompt(previous, folded))
+        )
+    except Exception as e:
+        logger.warning("Conversation summary failed, keeping an excerpt: %s", e)
+        summary = _fallback_summary(previous, folded)
+    return _update(summary, cut)
+
+
+async def acompact(state, overhead: int = 0) -> Dict[str, Any]:
+    folded, cut = _pending_fold(state, overhead)
+    if not folded:
+        return {}
+    previous = state.get("summary")
+    try:
+        result = await get_chat_model().ainvoke(_summary_prompt(previous, folded))
+        summary = _result_text(result)
+    except Exception as e:
+        logger.warning("Conversation summary failed, keeping an excerpt: %s", e)
+        summary = _fallback_summary(previous, folded)
+    return _update(summary, cut)
+
+
+def window(state, system: List[AnyMessage]) -> List[AnyMessage]:
+    """The prompt sent to the agent: system messages, summary, recent turns."""
+    messages = state.get("messages", [])
+    start = state.get("summarized_upto") or 0
+    prompt = system + summary_message(state.get("summary")) + messages[start:]
+
+    before = count_tokens(system + messages)
+    after = count_tokens(prompt) if start else before
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["trimmed_calls"] += 1 if start else 0
+        _stats["tokens_before"] += before
+        _stats["tokens_after"] += after
+    logger.debug("Agent prompt: %d tokens (%d before trimming)", after, before)
+    return prompt
+
+
+def context_window_stats() -> Dict[str, Any]:
+    """Prompt token counters: before/after trimming, summaries written."""
+    with _stats_lock:
+        stats = dict(_stats)
+    before, after = stats["tokens_before"], stats["tokens_after"]
+    stats["tokens_saved"] = before - after
+    stats["saved_ratio"] = (before - after) / before if before else 0.0
+    return stats
+
+
+def reset_context_window_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,169 @@
+"""
+Fused extract-and-log path for new expenses.
+
+A clear expense used to take four LLM calls: agent -> process_expense ->
+agent -> log_expense -> agent writing the confirmation. Messages that read
+as new expenses go through expense_node instead: it runs
+process_expense and, if no extracted item is ambiguous, logs them all
+(log_expense, or log_expenses in one transaction for several), then
+confirms from a template. Ambiguous results are handed to the agent with
+the process_expense call already in the history, so it asks the
+clarification question exactly as before.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.core.config import APP_TZ, DEFAULT_USER_ID
+from app.core.router import money, tool_call_messages
+from app.tools.fast_parser import looks_like_expense
+from app.tools.ingest import entry_from_processed
+from app.tools.processor import process_expense
+from app.tools.store import log_expense, log_expenses
+
+logger = logging.getLogger(__name__)
+
+
+# A reply after these may pick between expenses ("the 500 petrol one")
+_LOOKUP_TOOLS = {"find_expenses", "update_expense", "delete_expense"}
+
+
+def _ambiguous_result(msg: ToolMessage) -> bool:
+    try:
+        result = json.loads(msg.content)
+    except (TypeError, ValueError):
+        return False
+    items = result if isinstance(result, list) else [result]
+    return any(isinstance(i, dict) and i.get("is_ambiguous") for i in items)
+
+
+def _awaiting_clarification(messages: List) -> bool:
+    """
+    True if the previous turn left a question open: an ambiguous
+    process_expense result, or a final agent reply that asks something or
+    follows an expense lookup or edit.
+    """
+    turn = []
+    for msg in reversed(messages[:-1]):
+        if isinstance(msg, HumanMessage):
+            break
+        turn.append(msg)
+    tools = [m for m in turn if isinstance(m, ToolMessage)]
+    if tools and tools[0].name == "process_expense" and _ambiguous_result(tools[0]):
+        return True
+
+    last = turn[0] if turn else None
+    if not isinstance(last, AIMessage) or last.tool_calls:
+        return False
+    asks = isinstance(last.content, str) and last.content.rstrip().endswith("?")
+    return asks or any(m.name in _LOOKUP_TOOLS for m in tools)
+
+
+def is_new_expense(messages: List) -> bool:
+    """Whether the latest message should take the fused extract-and-log path."""
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return False
+    content = messages[-1].content
+    if not isinstance(content, str) or not looks_like_expense(content):
+        return False
+    # Clarification answers need the earlier turn, which only the agent sees
+    return not _awaiting_clarification(messages)
+
+
+def _line(entry: Dict[str, Any]) -> str:
+    what = entry.get("description") or entry["category"].lower()
+    text = f"{money(entry['amount'])} for {what} ({entry['category']})"
+    if entry.get("merchant"):
+        text += f" at {entry['merchant']}"
+    return f"{text} on {entry['ts'][:10]}"
+
+
+def render_confirmation(entries: List[Dict[str, Any]], ids: List[int]) -> str:
+    if len(entries) == 1:
+        return f"Logged {_line(entries[0])}. Expense id: #{ids[0]}."
+    total = sum(float(e["amount"]) for e in entries)
+    lines = [f"Logged {len(entries)} expenses ({money(total)} in total):"]
+    lines += [f"- {_line(e)} (#{i})" for e, i in zip(entries, ids)]
+    return "\n".join(lines)
+
+
+def _context(state, config: Optional[RunnableConfig]):
+    cfg = (config or {}).get("configurable", {})
+    text = state["messages"][-1].content
+    return text, cfg.get("user_id", DEFAULT_USER_ID), cfg.get("tz", APP_TZ)
+
+
+def _entry(processed: Dict[str, Any], text: str) -> Dict[str, Any]:
+    entry = entry_from_processed(processed, text)
+    if isinstance(entry["created_at"], datetime):
+        # Tool call args are JSON, as if the agent had written them
+        entry["created_at"] = entry["created_at"].isoformat()
+    return entry
+
+
+def _log_call(user_id: str, entries: List[Dict[str, Any]]):
+    """The tool and args the agent would use: log_expense for one entry."""
+    if len(entries) == 1:
+        return log_expense, {"user_id": user_id, "entry": entries[0]}
+    return log_expenses, {"user_id": user_id, "entries": entries}
+
+
+def _logged(tool, args: Dict[str, Any], entries, result: Dict[str, Any]) -> List:
+    ids = result.get("expense_ids") or [result["expense_id"]]
+    logger.info("Fused path logged expense(s) %s", ids)
+    return tool_call_messages(tool.name, args, result) + [
+        AIMessage(content=render_confirmation(entries, ids))
+    ]
+
+
+def expense_node(state, config: RunnableConfig = None):
+    text, user_id, tz = _context(state, config)
+    try:
+        processed = process_expense.invoke({"text": text, "tz": tz}, config)
+    except Exception as e:
+        logger.warning("Fused extraction failed, handing over to the agent: %s", e)
+        return {}
+
+    messages = tool_call_messages(
+        "process_expense", {"text": text, "tz": tz}, processed
+    )
+    if any(p.get("is_ambiguous") for p in processed):
+        return {"messages": messages}
+
+    entries = [_entry(p, text) for p in processed]
+    tool, args = _log_call(user_id, entries)
+    result = tool.invoke(args, config)
+    return {"messages": messages + _logged(tool, args, entries, result)}
+
+
+async def aexpense_node(state, config: RunnableConfig = None):
+    text, user_id, tz = _context(state, config)
+    try:
+        processed = await process_expense.ainvoke({"text": text, "tz": tz}, config)
+    except Exception as e:
+        logger.warning("Fused extraction failed, handing over to the agent: %s", e)
+        return {}
+
+    messages = tool_call_messages(
+        "process_expense", {"text": text, "tz": tz}, processed
+    )
+    if any(p.get("is_ambiguous") for p in processed):
+        return {"messages": messages}
+
+    entries = [_entry(p, text) for p in processed]
+    tool, args = _log_call(user_id, entries)
+    result = await tool.ainvoke(args, config)
+    return {"messages": messages + _logged(tool, args, entries, result)}
+
+
+def route_after_expense(state) -> str:
+    """END once the expense is confirmed; otherwise the agent takes over."""
+    messages = state.get("messages", [])
+    if messages and isinstance(messages[-1], AIMessage):
+        return "__end__"
+    return "context"
@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import httpx
+from google import genai
+from google.genai import types as genai_types
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core.config import (
+    APP_TZ,
+    DEFAULT_USER_ID,
+    LLM_ID,
+    LLM_POOL_KEEPALIVE_S,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+)
+from app.core.metrics import LLM_ERRORS, LLM_SECONDS
+from app.db.usage import get_usage_recorder
+
+logger = logging.getLogger(__name__)
+
+_PROJECT = "agenticaiprep"
+_LOCATION = "us-central1"
+
+# Process-wide LLM clients. Building ChatGoogleGenerativeAI sets up auth and an
+# HTTP client, and bind_tools() converts every tool schema, so both are created
+# once and shared by all requests (the models are safe to use concurrently).
+_lock = threading.Lock()
+_chat_model = None
+_agent_model = None
+
+
+class LLMMetrics(BaseCallbackHandler):
+    """
+    Times every call of the model it is attached to, labelled with the graph
+    node it ran in ("agent", "tools" for process_expense, ...).
+    """
+
+    # Record from whatever thread/loop the call runs on; no executor hop
+    run_inline = True
+
+    def __init__(self):
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        node = (kwargs.get("metadata") or {}).get("langgraph_node", "none")
+        self._started[run_id] = (time.perf_counter(), node)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_SECONDS.observe(time.perf_counter() - started[0], started[1])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_SECONDS.observe(time.perf_counter() - started[0], started[1])
+            LLM_ERRORS.inc(started[1])
+
+
+class LLMUsage(BaseCallbackHandler):
+    """
+    Records each call's usage_metadata against the user, thread and node it
+    ran for. Callers outside a graph node can name themselves with an
+    "llm_call" metadata entry (process_expense does).
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        metadata = kwargs.get("metadata") or {}
+        self._started[run_id] = (
+            str(metadata.get("user_id") or DEFAULT_USER_ID),
+            str(metadata.get("thread_id") or ""),
+            metadata.get("llm_call") or metadata.get("langgraph_node") or "none",
+            metadata.get("tz") or APP_TZ,
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        recorder = get_usage_recorder()
+        if started is None or recorder is None:
+            return
+        user_id, thread_id, node, tz = started
+        try:
+            day = datetime.now(ZoneInfo(tz)).date().isoformat()
+        except Exception:
+            day = datetime.now(ZoneInfo(APP_TZ)).date().isoformat()
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(
+                    getattr(generation, "message", None), "usage_metadata", None
+                )
+                if usage:
+                    recorder.record(user_id, thread_id, node, day, usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_S,
+    )
+
+
+def _build_chat_model():
+    model = ChatGoogleGenerativeAI(
+        model=LLM_ID,
+        vertexai=True,
+        project=_PROJECT,
+        location=_LOCATION,
+        temperature=0.3,
+        max_output_tokens=5000,
+        max_retries=2,
+        callbacks=[LLMMetrics(), LLMUsage()],
+        client_args={"limits": _pool_limits()},
+    )
+    # With aiohttp installed google-genai sends async calls through its own
+    # session, whose connector has no limit and never sees client_args. An
+    # explicit httpx async client puts ainvoke on the same bounded pool.
+    model.client = genai.Client(
+        vertexai=True,
+        project=_PROJECT,
+        location=_LOCATION,
+        http_options=genai_types.HttpOptions(
+            client_args={"limits": _pool_limits()},
+            httpx_async_client=httpx.AsyncClient(limits=_pool_limits()),
+        ),
+    )
+    return model
+
+
+def get_chat_model():
+    """Return the shared chat model used for structured extraction."""
+    global _chat_model
+    if _chat_model is None:
+        with _lock:
+            if _chat_model is None:
+                _chat_model = _build_chat_model()
+    return _chat_model
+
+
+def get_agent_model():
+    """Return the shared chat model with ALL_TOOLS bound, for the agent node."""
+    global _agent_model
+    if _agent_model is None:
+        # Imported lazily: app.tools imports the processor, which uses this module
+        from app.tools import ALL_TOOLS
+
+        model = get_chat_model()
+        with _lock:
+            if _agent_model is None:
+                _agent_model = model.bind_tools(ALL_TOOLS)
+    return _agent_model
+
+
+def warm_up():
+    """Create the shared clients ahead of the first request."""
+    start = time.perf_counter()
+    get_chat_model()
+    get_agent_model()
+    logger.info("LLM clients ready in %.0f ms", (time.perf_counter() - start) * 1000)
+
+
+def reset():
+    """Drop the shared clients (used by tests and after config changes)."""
+    global _chat_model, _agent_model
+    with _lock:
+        _chat_model = None
+        _agent_model = None
@@ -0,0 +1,267 @@
+"""
+In-process metrics, served in the Prometheus text format at /metrics.
+
+Only what the app needs: counters, gauges and fixed-bucket histograms with
+labels. Recording is a dict lookup and a few additions under a per-metric
+lock, cheap enough to time every graph node, tool, LLM call and SQL
+statement. Stats the components already keep (write queue, router, caches,
+...) are not duplicated here; they are read and rendered when scraped.
+"""
+
+import bisect
+import functools
+import inspect
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached router answer up to a slow Gemini call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+_registry: List["_Metric"] = []
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            lines.extend(self._lines(labels, value))
+        return lines
+
+    def _lines(self, labels: Tuple[str, ...], value: Any) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        key = self._key(labels)
+        # Per-bucket (not cumulative) counts, the last one for +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _lines(self, labels: Tuple[str, ...], series: Any) -> List[str]:
+        counts, total, count = series[0], series[1], series[2]
+        lines, cumulative = [], 0
+        for bound, n in zip((*self.buckets, math.inf), counts):
+            cumulative += n
+            le = f'le="{_number(float(bound))}"'
+            lines.append(
+                f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            )
+        suffix = _labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{suffix} {_number(float(total))}")
+        lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+def timed(
+    histogram: Histogram, *labels: str, errors: Optional[Counter] = None
+) -> Callable:
+    """Decorator recording a sync or async function's duration (and failures)."""
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    if errors is not None:
+                        errors.inc(*labels)
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start, *labels)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(*labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels)
+
+        return wrapper
+
+    return decorate
+
+
+def _stats_lines(component: str, stats: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = _NAME_RE.sub("_", f"finance_{component}_{key}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_number(value)}")
+    return lines
+
+
+def render(components: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """
+    All registered metrics in the text exposition format, followed by one
+    gauge per numeric value of each component's stats() dict.
+    """
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for component, stats in (components or {}).items():
+        lines.extend(_stats_lines(component, stats))
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Zero every registered metric (used by tests)."""
+    for metric in _registry:
+        metric.clear()
+
+
+GRAPH_NODE_SECONDS = Histogram(
+    "finance_graph_node_seconds", "Time spent in each graph node", ["node"]
+)
+TOOL_SECONDS = Histogram("finance_tool_seconds", "Tool call latency", ["tool"])
+TOOL_ERRORS = Counter("finance_tool_errors_total", "Tool calls that raised", ["tool"])
+LLM_SECONDS = Histogram(
+    "finance_llm_seconds", "Gemini call latency by calling graph node", ["node"]
+)
+LLM_ERRORS = Counter(
+    "finance_llm_errors_total",
+    "Gemini calls that failed by calling graph node",
+    ["node"],
+)
+EXECUTOR_QUEUED = Gauge(
+    "finance_executor_queued", "Tool calls waiting for a worker thread"
+)
+EXECUTOR_RUNNING = Gauge(
+    "finance_executor_running", "Tool calls running on a worker thread"
+)
+CHAT_WAITING = Gauge(
+    "finance_chat_waiting", "Chat requests waiting for a concurrency slot"
+)
+CHAT_IN_FLIGHT = Gauge("finance_chat_in_flight", "Chat requests running the graph")
+CHAT_SECONDS = Histogram(
+    "finance_chat_request_seconds", "Chat graph run time per request", ["endpoint"]
+)
+CHAT_TIMEOUTS = Counter(
+    "finance_chat_timeouts_total", "Chat requests that hit CHAT_TIMEOUT_S", ["endpoint"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "finance_db_query_seconds",
+    "SQL statement time on pooled engine connections",
+    ["statement"],
+    buckets=DB_BUCKETS,
+)
+DB_CONNECTION_SECONDS = Histogram(
+    "finance_db_connection_seconds",
+    "Time raw sqlite3 connections are borrowed for (reports, migrations)",
+    buckets=DB_BUCKETS,
+)
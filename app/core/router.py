@@ -0,0 +1,246 @@
+"""
+Deterministic intent router in front of the agent.
+
+Short, unambiguous commands ("weekly report", "delete expense 42",
+"show my expenses yesterday") are matched with local patterns and run the
+tool directly, answering from a template instead of two or more agent LLM
+calls. The router writes the same AIMessage(tool_calls) / ToolMessage /
+AIMessage sequence the agent would, so the thread history reads the same
+either way. Anything it doesn't fully recognize goes to the agent.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.core.config import APP_TZ, DEFAULT_USER_ID
+from app.tools.analytics import weekly_report
+from app.tools.store import delete_expense, expense_owner, find_expenses
+
+logger = logging.getLogger(__name__)
+
+_POLITE_RE = re.compile(r"^(?:please|pls|can you|could you)\s+|\s+please$")
+
+_WEEKLY_RE = re.compile(
+    r"^(?:(?:show|give|get)(?: me)?\s+)?(?:my\s+)?(?:"
+    r"weekly (?:report|summary|spending)"
+    r"|(?:report|summary|spending|expenses report) (?:for )?this week"
+    r"|this week'?s (?:report|summary|spending)"
+    r")$"
+    r"|^how much (?:did i spend|have i spent) this week$"
+)
+_DELETE_RE = re.compile(
+    r"^(?:delete|remove)\s+expense\s+(?:id\s*|#\s*|no\.?\s*)?(?P<expense_id>\d+)$"
+)
+_FIND_RE = re.compile(
+    r"^(?:show|list|find)(?: me)?(?: all)?(?: my)? expenses"
+    r"(?:"
+    r" (?:on |for )?(?P<date>\d{4}-\d{2}-\d{2}|today|yesterday)"
+    r"| (?:at|from) (?P<merchant>[a-z0-9][\w .&'-]{1,40})"
+    r")?$"
+)
+# A merchant capture holding one of these also names a period ("at amazon
+# last week"), which the shortcut can't filter on: leave it to the agent
+_PERIOD_WORD_RE = re.compile(
+    r"\b(?:today|tonight|yesterday|tomorrow|last|this|next|past|previous"
+    r"|on|since|before|after|during|between|ago|until|till"
+    r"|days|weeks?|weekend|months?|years?|morning|afternoon|evening|night"
+    r"|(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+    r"|january|february|march|april|june|july|august|september|october"
+    r"|november|december|\d{4}-\d{2}-\d{2})\b"
+)
+
+
+@dataclass
+class Intent:
+    tool: str
+    args: Dict[str, Any]
+
+
+_stats_lock = threading.Lock()
+_stats = {"routed": 0, "fallthrough": 0}
+
+
+def _record(routed: bool):
+    with _stats_lock:
+        _stats["routed" if routed else "fallthrough"] += 1
+
+
+def router_stats() -> Dict[str, Any]:
+    """Return how many messages the router answered vs. passed to the agent."""
+    with _stats_lock:
+        routed, fallthrough = _stats["routed"], _stats["fallthrough"]
+    total = routed + fallthrough
+    return {
+        "routed": routed,
+        "fallthrough": fallthrough,
+        "routed_ratio": routed / total if total else 0.0,
+    }
+
+
+def reset_router_stats():
+    with _stats_lock:
+        _stats["routed"] = 0
+        _stats["fallthrough"] = 0
+
+
+def _normalize(text: str) -> str:
+    text = " ".join(text.lower().split()).rstrip("?.! ")
+    return _POLITE_RE.sub("", text).strip()
+
+
+def _resolve_day(value: str, tz: str) -> str:
+    today = datetime.now(ZoneInfo(tz)).date()
+    if value == "today":
+        return today.isoformat()
+    if value == "yesterday":
+        return (today - timedelta(days=1)).isoformat()
+    date.fromisoformat(value)  # raises ValueError for e.g. 2025-02-30
+    return value
+
+
+def match_intent(text: str, user_id: str, tz: str = APP_TZ) -> Optional[Intent]:
+    """Map a message onto a single tool call, or None if it isn't a plain command."""
+    text = _normalize(text)
+
+    if _WEEKLY_RE.match(text):
+        return Intent("weekly_report", {"user_id": user_id, "tz": tz})
+
+    m = _DELETE_RE.match(text)
+    if m:
+        return Intent("delete_expense", {"expense_id": int(m["expense_id"])})
+
+    m = _FIND_RE.match(text)
+    if m:
+        args = {"user_id": user_id}
+        if m["date"]:
+            try:
+                args["date"] = _resolve_day(m["date"], tz)
+            except ValueError:
+                return None
+        if m["merchant"]:
+            if _PERIOD_WORD_RE.search(m["merchant"]):
+                return None
+            args["merchant"] = m["merchant"].strip()
+        return Intent("find_expenses", args)
+
+    return None
+
+
+def money(amount: float) -> str:
+    return f"₹{amount:,.2f}"
+
+
+def render_weekly_report(report: Dict[str, Any], args: Dict[str, Any]) -> str:
+    period = f"{report['week_start']} to {report['week_end']}"
+    if not report["by_category"]:
+        return f"No expenses logged this week yet ({period})."
+
+    lines = [f"This week ({period}) you spent {money(report['total'])}.", ""]
+    lines.append("By category:")
+    lines += [f"- {c}: {money(t)}" for c, t in report["by_category"].items()]
+    if report["top_items"]:
+        lines += ["", "Top expenses:"]
+        for item in report["top_items"]:
+            label = item.get("description") or item.get("merchant") or "-"
+            lines.append(
+                f"- {money(item['amount'])} {item['category']}: {label}"
+                f" ({item['day']})"
+            )
+    lines += [""] + report["insights"]
+    return "\n".join(lines)
+
+
+def render_expenses(expenses: List[Dict[str, Any]], args: Dict[str, Any]) -> str:
+    if not expenses:
+        return "I couldn't find any matching expenses."
+    lines = [f"Found {len(expenses)} expense(s):"]
+    for e in expenses:
+        label = " - ".join(filter(None, [e.get("description"), e.get("merchant")]))
+        lines.append(
+            f"- #{e['id']} {money(e['amount'])} {e['category']}"
+            + (f": {label}" if label else "")
+            + f" ({e['created_at'][:10]})"
+        )
+    return "\n".join(lines)
+
+
+def render_delete(result: Dict[str, Any], args: Dict[str, Any]) -> str:
+    if "deleted_expense_id" in result:
+        return f"Deleted expense #{args['expense_id']}."
+    return f"I couldn't find expense #{args['expense_id']}."
+
+
+_TOOLS = {
+    "weekly_report": (weekly_report, render_weekly_report),
+    "find_expenses": (find_expenses, render_expenses),
+    "delete_expense": (delete_expense, render_delete),
+}
+
+
+def _intent_for(state, config: Optional[RunnableConfig]) -> Optional[Intent]:
+    messages = state.get("messages", [])
+    if not messages or not isinstance(messages[-1], HumanMessage):
+        return None
+    content = messages[-1].content
+    if not isinstance(content, str):
+        return None
+    cfg = (config or {}).get("configurable", {})
+    intent = match_intent(
+        content, cfg.get("user_id", DEFAULT_USER_ID), cfg.get("tz", APP_TZ)
+    )
+    if intent and intent.tool == "delete_expense":
+        # Only delete the caller's own expenses without asking the agent
+        owner = expense_owner(intent.args["expense_id"])
+        if owner != cfg.get("user_id", DEFAULT_USER_ID):
+            return None
+    _record(intent is not None)
+    return intent
+
+
+def tool_call_messages(name: str, args: Dict[str, Any], result: Any) -> List:
+    """The AIMessage(tool_calls) / ToolMessage pair the agent + ToolNode would add."""
+    call_id = f"router_{uuid.uuid4().hex[:12]}"
+    return [
+        AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}]),
+        ToolMessage(
+            content=json.dumps(result, default=str, ensure_ascii=False),
+            name=name,
+            tool_call_id=call_id,
+        ),
+    ]
+
+
+def _messages(intent: Intent, result: Any) -> Dict[str, Any]:
+    _, render = _TOOLS[intent.tool]
+    logger.info("Router answered with %s", intent.tool)
+    return {
+        "messages": tool_call_messages(intent.tool, intent.args, result)
+        + [AIMessage(content=render(result, intent.args))]
+    }
+
+
+def router_node(state, config: RunnableConfig = None):
+    intent = _intent_for(state, config)
+    if intent is None:
+        return {}
+    tool, _ = _TOOLS[intent.tool]
+    return _messages(intent, tool.invoke(intent.args, config))
+
+
+async def arouter_node(state, config: RunnableConfig = None):
+    intent = await asyncio.to_thread(_intent_for, state, config)
+    if intent is None:
+        return {}
+    tool, _ = _TOOLS[intent.tool]
+    return _messages(intent, await tool.ainvoke(intent.args, config))
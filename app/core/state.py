@@ -1,8 +1,12 @@
 from typing import Annotated
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
 
 
 class FinanceState(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
+    # Rolling summary of messages[:summarized_upto], which the agent no longer
+    # sees verbatim (they stay in the checkpoint)
+    summary: NotRequired[str]
+    summarized_upto: NotRequired[int]
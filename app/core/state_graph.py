@@ -1,10 +1,12 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.checkpoint.sqlite import SqliteSaver
-from langchain_core.messages import SystemMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
 # from langchain_openai import ChatOpenAI
-import sqlite3
+import aiosqlite
 from app.core.state import FinanceState
 from app.core.prompts import SYSTEM_PROMPT
 from app.tools import ALL_TOOLS
@@ -13,35 +15,51 @@ from app.core.config import (
     DEFAULT_USER_ID,
     APP_TZ,
     GRAPH_STATE_DB,
-    LLM_ID,
 )
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.core.llm import get_agent_model
+from app.core import context_window, metrics
+from app.core.router import arouter_node, router_node
+from app.core.expense_flow import (
+    aexpense_node,
+    expense_node,
+    is_new_expense,
+    route_after_expense,
+)
+from app.db.engine import connect, pragma_statements
 
 
 def _agent_model():
-    return ChatGoogleGenerativeAI(
-        model=LLM_ID,
-        vertexai=True,
-        project="agenticaiprep",
-        location="us-central1",
-        temperature=0.3,
-        max_output_tokens=5000,
-        max_retries=2,
-    ).bind_tools(ALL_TOOLS)
-
-
-def agent_node(state: FinanceState):
-    model = _agent_model()
+    return get_agent_model()
+
 
-    cfg = state.get("configurable", {}) if isinstance(state, dict) else {}
+def _system_messages(config: RunnableConfig = None):
+    cfg = (config or {}).get("configurable", {})
     user_id = cfg.get("user_id", DEFAULT_USER_ID)
     tz = cfg.get("tz", APP_TZ)
 
     config_sys = SystemMessage(content=f"CONFIG: user_id={user_id}, tz={tz}")
 
-    messages = [SystemMessage(content=SYSTEM_PROMPT), config_sys] + state.get(
-        "messages", []
-    )
+    return [SystemMessage(content=SYSTEM_PROMPT), config_sys]
+
+
+def _agent_messages(state: FinanceState, config: RunnableConfig = None):
+    return context_window.window(state, _system_messages(config))
+
+
+def context_node(state: FinanceState, config: RunnableConfig = None):
+    """Fold turns that no longer fit the token budget into the summary."""
+    overhead = context_window.count_tokens(_system_messages(config))
+    return context_window.compact(state, overhead)
+
+
+async def acontext_node(state: FinanceState, config: RunnableConfig = None):
+    overhead = context_window.count_tokens(_system_messages(config))
+    return await context_window.acompact(state, overhead)
+
+
+def agent_node(state: FinanceState, config: RunnableConfig = None):
+    model = _agent_model()
+    messages = _agent_messages(state, config)
     # print("=" * 50)
     # print("Messages being sent to Gemini:")
     # for i, msg in enumerate(messages):
@@ -56,21 +74,76 @@ def agent_node(state: FinanceState):
     return {"messages": [msg]}
 
 
-def build_graph():
+async def aagent_node(state: FinanceState, config: RunnableConfig = None):
+    model = _agent_model()
+    msg = await model.ainvoke(_agent_messages(state, config))
+    return {"messages": [msg]}
+
+
+def route_after_router(state: FinanceState) -> str:
+    """
+    END when the router already answered, the fused extract-and-log path
+    for messages that read as a new expense, otherwise on to the agent.
+    """
+    messages = state.get("messages", [])
+    if messages and isinstance(messages[-1], AIMessage):
+        return "__end__"
+    if is_new_expense(messages):
+        return "expense"
+    return "context"
+
+
+def _node(name: str, func, afunc) -> RunnableLambda:
+    """A graph node timed into the per-node latency histogram."""
+    timer = metrics.timed(metrics.GRAPH_NODE_SECONDS, name)
+    return RunnableLambda(timer(func), afunc=timer(afunc), name=name)
+
+
+def _compile(checkpointer):
     init_db()
 
     tool_node = ToolNode(ALL_TOOLS)
     g = StateGraph(FinanceState)
-    g.add_node("agent", agent_node)
-    g.add_node("tools", tool_node)
+    # Sync callers (CLI) use agent_node, ainvoke/astream use aagent_node
+    g.add_node("router", _node("router", router_node, arouter_node))
+    g.add_node("expense", _node("expense", expense_node, aexpense_node))
+    g.add_node("context", _node("context", context_node, acontext_node))
+    g.add_node("agent", _node("agent", agent_node, aagent_node))
+    g.add_node("tools", _node("tools", tool_node.invoke, tool_node.ainvoke))
 
-    g.add_edge(START, "agent")
+    # Plain commands are answered by the router without calling the LLM
+    g.add_edge(START, "router")
+    g.add_conditional_edges(
+        "router",
+        route_after_router,
+        {"expense": "expense", "context": "context", "__end__": END},
+    )
+    # New expenses are extracted and logged without the agent unless ambiguous
+    g.add_conditional_edges(
+        "expense", route_after_expense, {"context": "context", "__end__": END}
+    )
+    # Every agent step goes through "context" so the prompt stays in budget
+    g.add_edge("context", "agent")
     g.add_conditional_edges(
         "agent", tools_condition, {"tools": "tools", "__end__": END}
     )
-    g.add_edge("tools", "agent")
+    g.add_edge("tools", "context")
 
-    conn = sqlite3.connect(GRAPH_STATE_DB, check_same_thread=False)
+    return g.compile(checkpointer=checkpointer)
+
+
+def build_graph():
+    conn = connect(GRAPH_STATE_DB, check_same_thread=False)
     checkpointer = SqliteSaver(conn)
 
-    return g.compile(checkpointer=checkpointer)
+    return _compile(checkpointer)
+
+
+async def abuild_graph():
+    """Build the graph with an async checkpointer, for use with ainvoke/astream."""
+    conn = await aiosqlite.connect(GRAPH_STATE_DB)
+    for statement in pragma_statements():
+        await conn.execute(statement)
+    checkpointer = AsyncSqliteSaver(conn)
+
+    return _compile(checkpointer)
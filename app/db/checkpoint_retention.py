@@ -0,0 +1,195 @@
+"""
+Retention and compaction for the LangGraph checkpoint database.
+
+SqliteSaver writes a checkpoint (and its pending writes) for every step of
+every thread and never deletes any. Each checkpoint stores the full channel
+values, so only the latest few are needed to resume a thread:
+
+- keep the newest keep_last checkpoints per (thread, namespace)
+- drop threads whose newest checkpoint is older than idle_ttl_s
+- give the freed pages back with incremental VACUUM
+
+The one-time switch to auto_vacuum=INCREMENTAL rewrites the whole file with
+a full VACUUM, so only the compact_checkpoints script does it; the API's
+background compaction never blocks the database that long.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.base.id import UUID as CheckpointId
+
+from app.core.config import (
+    CHECKPOINT_KEEP_LAST,
+    CHECKPOINT_THREAD_TTL_S,
+    CHECKPOINT_VACUUM_PAGES,
+)
+from app.db.engine import connect
+
+logger = logging.getLogger(__name__)
+
+# uuid6 timestamps count 100ns intervals from the Gregorian epoch (1582-10-15)
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+_PRUNE_CHECKPOINTS = """
+    DELETE FROM checkpoints WHERE rowid IN (
+        SELECT rowid FROM (
+            SELECT rowid, ROW_NUMBER() OVER (
+                PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+            ) AS position
+            FROM checkpoints
+        )
+        WHERE position > ?
+    )
+"""
+
+_PRUNE_ORPHAN_WRITES = """
+    DELETE FROM writes WHERE NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = writes.thread_id
+          AND c.checkpoint_ns = writes.checkpoint_ns
+          AND c.checkpoint_id = writes.checkpoint_id
+    )
+"""
+
+
+def checkpoint_time(checkpoint_id: str) -> Optional[float]:
+    """Unix time a (uuid6) checkpoint id was generated, or None if not uuid6."""
+    try:
+        uid = CheckpointId(checkpoint_id)
+    except ValueError:
+        return None
+    if uid.version != 6:
+        return None
+    return (uid.time - _UUID_EPOCH_OFFSET) / 1e7
+
+
+def _db_bytes(conn: sqlite3.Connection) -> int:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    return page_size * page_count
+
+
+def _has_checkpoint_tables(conn: sqlite3.Connection) -> bool:
+    names = {
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name IN ('checkpoints', 'writes')"
+        )
+    }
+    return names == {"checkpoints", "writes"}
+
+
+def _idle_threads(conn: sqlite3.Connection, cutoff: float):
+    rows = conn.execute(
+        "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+    )
+    idle = []
+    for thread_id, latest in rows:
+        created = checkpoint_time(latest)
+        if created is not None and created < cutoff:
+            idle.append(thread_id)
+    return idle
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """
+    Switch the file to auto_vacuum=INCREMENTAL. Existing databases need one
+    full VACUUM for that to take effect; returns True if it was run.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def compact(
+    conn: sqlite3.Connection,
+    keep_last: int = CHECKPOINT_KEEP_LAST,
+    idle_ttl_s: Optional[float] = CHECKPOINT_THREAD_TTL_S,
+    vacuum_pages: int = CHECKPOINT_VACUUM_PAGES,
+    now: Optional[float] = None,
+    convert: bool = False,
+) -> Dict[str, Any]:
+    """
+    Apply the retention policy to an open checkpoint database.
+
+    vacuum_pages limits how many free pages one run gives back (0 = all).
+    Freed pages are only given back once the file is in incremental
+    auto_vacuum mode; convert=True switches it (with a full VACUUM) first.
+    Returns counts and the bytes reclaimed.
+    """
+    start = time.perf_counter()
+    bytes_before = _db_bytes(conn)
+    report = {
+        "threads_dropped": 0,
+        "checkpoints_deleted": 0,
+        "writes_deleted": 0,
+        "bytes_before": bytes_before,
+    }
+
+    if _has_checkpoint_tables(conn):
+        with conn:
+            if idle_ttl_s:
+                idle = _idle_threads(conn, (now or time.time()) - idle_ttl_s)
+                for thread_id in idle:
+                    report["checkpoints_deleted"] += conn.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                    ).rowcount
+                report["threads_dropped"] = len(idle)
+
+            if keep_last > 0:
+                report["checkpoints_deleted"] += conn.execute(
+                    _PRUNE_CHECKPOINTS, (keep_last,)
+                ).rowcount
+            report["writes_deleted"] = conn.execute(_PRUNE_ORPHAN_WRITES).rowcount
+
+        report["full_vacuum"] = convert and enable_incremental_vacuum(conn)
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.info(
+                "Checkpoint database is not in incremental auto_vacuum mode; "
+                "run app.scripts.compact_checkpoints once to reclaim free pages"
+            )
+        elif vacuum_pages:
+            conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+        else:
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+        # Move the shrunken pages out of the WAL so the file itself shrinks
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    report["bytes_after"] = _db_bytes(conn)
+    report["bytes_reclaimed"] = bytes_before - report["bytes_after"]
+    report["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def compact_database(path: str, **kwargs) -> Dict[str, Any]:
+    """Open path with the standard pragmas and compact it."""
+    conn = connect(path)
+    try:
+        report = compact(conn, **kwargs)
+    finally:
+        conn.close()
+    logger.info(
+        "Compacted %s: %d checkpoints, %d threads dropped, %d bytes reclaimed",
+        path,
+        report["checkpoints_deleted"],
+        report["threads_dropped"],
+        report["bytes_reclaimed"],
+    )
+    return report
+
+
+async def compact_periodically(path: str, interval_s: float, **kwargs):
+    """Compact path every interval_s seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await asyncio.to_thread(compact_database, path, **kwargs)
+        except Exception as e:
+            logger.warning("Checkpoint compaction of %s failed: %s", path, e)
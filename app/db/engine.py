@@ -0,0 +1,152 @@
+"""
+Central SQLite engine and connection factory.
+
+Every connection to the expenses database (SQLAlchemy sessions and raw
+sqlite3 access alike) comes from here, so all of them get the same pragmas:
+
+- journal_mode=WAL: readers don't block the writer or each other
+- synchronous=NORMAL: durable at checkpoints, far fewer fsyncs than FULL
+- busy_timeout: writers wait for the lock instead of "database is locked"
+- mmap_size / cache_size: hot pages served from memory
+
+Engines are created once per database URL and pool their connections.
+Statements run through an engine are timed per statement for /metrics;
+raw sqlite3 work through connection() is timed per borrow.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from app.core.config import (
+    DB_PATH,
+    DB_URL,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_POOL_MAX_OVERFLOW,
+    SQLITE_POOL_SIZE,
+    SQLITE_POOL_TIMEOUT_S,
+)
+from app.core.metrics import DB_CONNECTION_SECONDS, DB_QUERY_SECONDS
+
+
+def pragma_statements() -> List[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        # Negative values are KiB rather than pages
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+    ]
+
+
+def apply_pragmas(conn):
+    """Apply the standard pragmas to a DB-API (sqlite3) connection."""
+    cursor = conn.cursor()
+    try:
+        for statement in pragma_statements():
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+def connect(path: str = DB_PATH, **kwargs) -> sqlite3.Connection:
+    """
+    Open a dedicated (unpooled) sqlite3 connection with the standard pragmas,
+    for long-lived holders like the checkpointer or maintenance scripts.
+    """
+    kwargs.setdefault("timeout", SQLITE_BUSY_TIMEOUT_MS / 1000)
+    conn = sqlite3.connect(path, **kwargs)
+    apply_pragmas(conn)
+    return conn
+
+
+_STATEMENTS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is not None:
+        verb = statement.lstrip()[:6].upper()
+        DB_QUERY_SECONDS.observe(
+            time.perf_counter() - start, verb if verb in _STATEMENTS else "OTHER"
+        )
+
+
+_engines: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(
+        url,
+        connect_args={
+            # Pooled connections move between request threads
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=SQLITE_POOL_MAX_OVERFLOW,
+        pool_timeout=SQLITE_POOL_TIMEOUT_S,
+    )
+    event.listen(engine, "connect", lambda conn, _: apply_pragmas(conn))
+    event.listen(engine, "before_cursor_execute", _start_query)
+    event.listen(engine, "after_cursor_execute", _end_query)
+    return engine
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Return the shared pooled engine for url (default: DB_URL)."""
+    url = url or DB_URL
+    engine = _engines.get(url)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = _engines[url] = _create_engine(url)
+    return engine
+
+
+def engine_for_path(path: str) -> Engine:
+    return get_engine(f"sqlite:///{path}")
+
+
+@contextmanager
+def connection(path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled sqlite3 connection to path. Commits on success, rolls
+    back on error, and always returns the connection to the pool.
+    """
+    pooled = engine_for_path(path).raw_connection()
+    start = time.perf_counter()
+    try:
+        yield pooled.driver_connection
+        pooled.commit()
+    except BaseException:
+        pooled.rollback()
+        raise
+    finally:
+        pooled.close()
+        DB_CONNECTION_SECONDS.observe(time.perf_counter() - start)
+
+
+def dispose(url: Optional[str] = None):
+    """Close pooled connections for url, or for every engine when url is None."""
+    with _lock:
+        urls = [url] if url else list(_engines)
+        for key in urls:
+            engine = _engines.pop(key, None)
+            if engine is not None:
+                engine.dispose()
@@ -1,6 +1,7 @@
-import sqlite3
 import os
 from app.core.config import DB_PATH, DB_URL
+from app.db.engine import connection, get_engine
+from app.db.migrations import migrate
 
 
 def init_sqlite_db():
@@ -13,11 +14,9 @@ def init_sqlite_db():
     schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
 
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with connection(DB_PATH) as conn:
             with open(schema_path, "r", encoding="utf-8") as f:
-                sql_script = f.read()
-                conn.executescript(sql_script)
-                conn.commit()
+                migrate(conn, f.read())
         return True
     except Exception as e:
         print(f"Error initializing database: {e}")
@@ -28,14 +27,12 @@ def init_sqlalchemy_db():
     """Initialize SQLAlchemy engine and create tables."""
     try:
         from app.models.entities import Base
-        from sqlalchemy import create_engine
 
         # For SQLite, we need to extract the file path from the URL
         db_path = DB_URL.replace("sqlite:///", "")
         os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
 
-        engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine(DB_URL))
         return True
     except Exception as e:
         print(f"Error creating SQLAlchemy tables: {e}")
@@ -45,17 +42,12 @@ def init_sqlalchemy_db():
 def verify_database():
     """Verify database is initialized and ready."""
     try:
-        import sqlite3
-
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Check if expenses table exists
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='expenses'"
-        )
-        exists = cursor.fetchone() is not None
-        conn.close()
+        with connection(DB_PATH) as conn:
+            # Check if expenses table exists
+            cursor = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='expenses'"
+            )
+            exists = cursor.fetchone() is not None
 
         return exists
     except Exception as e:
@@ -0,0 +1,104 @@
+"""
+In-place migrations for databases created by older versions of schema.sql.
+
+schema.sql only creates missing tables and indexes, so columns added to
+existing tables are brought in here before it runs (its indexes may refer to
+them). Every step checks the current layout first and is safe to run on every
+start-up; init_db goes through migrate().
+"""
+
+import logging
+import sqlite3
+
+from app.db.search import FTS_DDL, FTS_TABLE, fts_available
+from app.db.timestamps import local_day, to_epoch
+
+logger = logging.getLogger(__name__)
+
+_BACKFILL_CHUNK = 5000
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        is not None
+    )
+
+
+def add_expense_time_columns(conn: sqlite3.Connection):
+    """Add and backfill expenses.ts_epoch / expenses.local_day (indexed by schema.sql)."""
+    if not _has_table(conn, "expenses"):
+        return
+    columns = _columns(conn, "expenses")
+    with conn:
+        if "ts_epoch" not in columns:
+            conn.execute("ALTER TABLE expenses ADD COLUMN ts_epoch INTEGER")
+        if "local_day" not in columns:
+            conn.execute("ALTER TABLE expenses ADD COLUMN local_day TEXT")
+
+    backfilled = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, ts FROM expenses WHERE local_day IS NULL LIMIT ?",
+            (_BACKFILL_CHUNK,),
+        ).fetchall()
+        if not rows:
+            break
+        with conn:
+            conn.executemany(
+                "UPDATE expenses SET ts_epoch = ?, local_day = ? WHERE id = ?",
+                [(to_epoch(ts), local_day(ts), row_id) for row_id, ts in rows],
+            )
+        backfilled += len(rows)
+    if backfilled:
+        logger.info("Backfilled ts_epoch/local_day for %d expenses", backfilled)
+
+
+def add_expense_merchant_id(conn: sqlite3.Connection):
+    """Add expenses.merchant_id (indexed by schema.sql, backfilled by init_db)."""
+    if _has_table(conn, "expenses") and "merchant_id" not in _columns(conn, "expenses"):
+        with conn:
+            conn.execute("ALTER TABLE expenses ADD COLUMN merchant_id INTEGER")
+
+
+def drop_superseded_indexes(conn: sqlite3.Connection):
+    """Drop indexes replaced by wider ones in schema.sql."""
+    with conn:
+        # Replaced by idx_expenses_user_day_epoch
+        conn.execute("DROP INDEX IF EXISTS idx_expenses_user_day")
+
+
+def add_expense_fts(conn: sqlite3.Connection):
+    """Create the expenses_fts index and its triggers, indexing existing rows."""
+    if fts_available(conn):
+        return
+    try:
+        with conn:
+            for statement in FTS_DDL:
+                conn.execute(statement)
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5/trigram: find_expenses keeps using LIKE
+        logger.warning("Full-text index unavailable: %s", e)
+
+
+# Steps that alter tables schema.sql won't touch once they exist
+BEFORE_SCHEMA = [add_expense_time_columns, add_expense_merchant_id]
+# Steps that need schema.sql's tables
+AFTER_SCHEMA = [drop_superseded_indexes, add_expense_fts]
+
+
+def migrate(conn: sqlite3.Connection, schema_sql: str):
+    """Bring a database of any age up to date with schema_sql (idempotent)."""
+    for step in BEFORE_SCHEMA:
+        step(conn)
+    conn.executescript(schema_sql)
+    conn.commit()
+    for step in AFTER_SCHEMA:
+        step(conn)
@@ -0,0 +1,137 @@
+"""
+Per-user daily x category spending rollups.
+
+expense_daily_rollups holds (total, count, max_amount) for every
+(user_id, day, category) with at least one expense. The store tools keep
+it in step with expenses inside the same transaction as the write, so
+reports can aggregate a handful of rollup rows instead of raw expenses.
+"""
+
+import sqlite3
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import text
+
+from app.db.timestamps import local_day
+
+_UPSERT = text("""
+    INSERT INTO expense_daily_rollups (user_id, day, category, total, count, max_amount)
+    VALUES (:user_id, :day, :category, :total, :count, :max_amount)
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + excluded.count,
+        max_amount = MAX(max_amount, excluded.max_amount)
+    """)
+
+# Runs after the removed row is flushed, so MAX() only sees remaining rows
+_SUBTRACT = text("""
+    UPDATE expense_daily_rollups SET
+        total = total - :amount,
+        count = count - 1,
+        max_amount = COALESCE((
+            SELECT MAX(amount) FROM expenses
+            WHERE user_id = :user_id AND local_day = :day AND category = :category
+        ), 0)
+    WHERE user_id = :user_id AND day = :day AND category = :category
+    """)
+
+_PRUNE = text("""
+    DELETE FROM expense_daily_rollups
+    WHERE user_id = :user_id AND day = :day AND category = :category AND count <= 0
+    """)
+
+_AGGREGATE_EXPENSES = """
+    SELECT user_id, local_day AS day, category,
+           SUM(amount) AS total, COUNT(*) AS count, MAX(amount) AS max_amount
+    FROM expenses
+    GROUP BY user_id, day, category
+"""
+
+
+def add_expenses(db, rows: Iterable[Any]):
+    """Add expense rows (objects with user_id, ts, category, amount) to the rollups."""
+    groups: Dict[tuple, Dict[str, Any]] = defaultdict(
+        lambda: {"total": 0.0, "count": 0, "max_amount": 0.0}
+    )
+    for row in rows:
+        key = (row.user_id, local_day(row.ts), row.category)
+        group = groups[key]
+        group["total"] += float(row.amount)
+        group["count"] += 1
+        group["max_amount"] = max(group["max_amount"], float(row.amount))
+
+    if groups:
+        db.execute(
+            _UPSERT,
+            [
+                {"user_id": u, "day": d, "category": c, **agg}
+                for (u, d, c), agg in groups.items()
+            ],
+        )
+
+
+def remove_expense(db, user_id: str, ts: str, category: str, amount: float):
+    """Subtract one (already flushed) deleted/changed expense from the rollups."""
+    params = {
+        "user_id": user_id,
+        "day": local_day(ts),
+        "category": category,
+        "amount": float(amount),
+    }
+    db.execute(_SUBTRACT, params)
+    db.execute(_PRUNE, params)
+
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """Recompute all rollups from the expenses table. Returns rows written."""
+    with conn:
+        conn.execute("DELETE FROM expense_daily_rollups")
+        conn.execute(f"""INSERT INTO expense_daily_rollups
+            (user_id, day, category, total, count, max_amount)
+            {_AGGREGATE_EXPENSES}""")
+    return conn.execute("SELECT COUNT(*) FROM expense_daily_rollups").fetchone()[0]
+
+
+def verify(conn: sqlite3.Connection, tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+    """
+    Compare rollups against a fresh aggregation of expenses.
+    Returns one entry per mismatching (user_id, day, category); empty if in sync.
+    """
+    expected = {(r[0], r[1], r[2]): r[3:] for r in conn.execute(_AGGREGATE_EXPENSES)}
+    actual = {
+        (r[0], r[1], r[2]): r[3:]
+        for r in conn.execute(
+            "SELECT user_id, day, category, total, count, max_amount "
+            "FROM expense_daily_rollups"
+        )
+    }
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        exp, act = expected.get(key), actual.get(key)
+        if (
+            exp is None
+            or act is None
+            or abs(exp[0] - act[0]) > tolerance
+            or exp[1] != act[1]
+            or abs(exp[2] - act[2]) > tolerance
+        ):
+            mismatches.append(
+                {
+                    "user_id": key[0],
+                    "day": key[1],
+                    "category": key[2],
+                    "expected": exp,
+                    "actual": act,
+                }
+            )
+    return mismatches
+
+
+def backfill_if_empty(conn: sqlite3.Connection):
+    """Populate rollups for databases created before the rollup table existed."""
+    has_rollups = conn.execute("SELECT 1 FROM expense_daily_rollups LIMIT 1").fetchone()
+    has_expenses = conn.execute("SELECT 1 FROM expenses LIMIT 1").fetchone()
+    if has_expenses and not has_rollups:
+        rebuild(conn)
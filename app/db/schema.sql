@@ -9,7 +9,58 @@ Create Table if not exists expenses (
     description text,
     merchant text,
     raw_text text,
-    created_at text not null
+    created_at text not null,
+    ts_epoch integer,
+    local_day text,
+    merchant_id integer
 );
 
-create index if not exists idx_expenses_user_ts on expenses(user_id, ts);
\ No newline at end of file
+create index if not exists idx_expenses_user_ts on expenses(user_id, ts);
+create index if not exists idx_expenses_user_epoch on expenses(user_id, ts_epoch);
+-- Day lookups filter on local_day and sort by ts_epoch; with both in the
+-- index they need neither a scan of the user's rows nor a sort step
+create index if not exists idx_expenses_user_day_epoch on expenses(user_id, local_day, ts_epoch);
+-- Merchant lookups (find_expenses) filter on merchant_id, newest first
+create index if not exists idx_expenses_user_merchant_epoch on expenses(user_id, merchant_id, ts_epoch);
+
+create table if not exists merchants (
+    id integer primary key autoincrement,
+    name text not null
+);
+
+-- Normalized spellings of each merchant (see app/tools/merchants.py);
+-- prefix = 1 also matches names that start with the alias
+create table if not exists merchant_aliases (
+    alias text primary key,
+    merchant_id integer not null references merchants(id),
+    prefix integer not null default 0
+);
+
+create table if not exists expense_daily_rollups (
+    user_id text not null,
+    day text not null,
+    category text not null,
+    total real not null default 0,
+    count integer not null default 0,
+    max_amount real not null default 0,
+    primary key (user_id, day, category)
+);
+
+create table if not exists user_data_versions (
+    user_id text primary key,
+    version integer not null default 0
+);
+
+-- LLM calls and tokens per user, day, thread and graph node (see app/db/usage.py)
+create table if not exists llm_usage (
+    user_id text not null,
+    day text not null,
+    thread_id text not null default '',
+    node text not null,
+    calls integer not null default 0,
+    input_tokens integer not null default 0,
+    output_tokens integer not null default 0,
+    total_tokens integer not null default 0,
+    primary key (user_id, day, thread_id, node)
+);
+create index if not exists idx_llm_usage_day on llm_usage(day);
@@ -0,0 +1,82 @@
+"""
+Full-text search over expenses.
+
+expenses_fts is an external-content FTS5 table over description, merchant
+and raw_text using the trigram tokenizer, so any substring of 3+ characters
+is an index lookup (case-insensitive, like the ILIKE it replaces). Triggers
+created by app/db/migrations.py keep it in step with expenses.
+"""
+
+import sqlite3
+from typing import Iterable, Optional
+
+from sqlalchemy import column, text
+
+FTS_TABLE = "expenses_fts"
+MIN_TERM_LENGTH = 3  # shortest substring the trigram tokenizer can match
+# Latest rows per user searched with LIKE before falling back to the index
+RECENT_ROWS = 1000
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, merchant, raw_text,
+        content='expenses', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, merchant, raw_text)
+        VALUES (new.id, new.description, new.merchant, new.raw_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, merchant, raw_text)
+        VALUES ('delete', old.id, old.description, old.merchant, old.raw_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS expenses_fts_au
+    AFTER UPDATE OF description, merchant, raw_text ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, merchant, raw_text)
+        VALUES ('delete', old.id, old.description, old.merchant, old.raw_text);
+        INSERT INTO {FTS_TABLE}(rowid, description, merchant, raw_text)
+        VALUES (new.id, new.description, new.merchant, new.raw_text);
+    END""",
+]
+
+_EXISTS_SQL = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+
+
+def fts_available(db) -> bool:
+    """True if the FTS table exists (db is a SQLAlchemy session or sqlite3 conn)."""
+    if isinstance(db, sqlite3.Connection):
+        return db.execute(_EXISTS_SQL, (FTS_TABLE,)).fetchone() is not None
+    row = db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    return row is not None
+
+
+def match_expression(columns: Iterable[str], term: str) -> Optional[str]:
+    """
+    FTS5 query matching term as a substring of any of columns, or None if the
+    term is too short for trigrams (callers fall back to LIKE).
+    """
+    term = term.strip()
+    if len(term) < MIN_TERM_LENGTH:
+        return None
+    phrase = '"' + term.replace('"', '""') + '"'
+    return "{" + " ".join(columns) + "} : " + phrase
+
+
+def matching_ids(user_id: str, expression: str):
+    """
+    Select of the ids of user_id's expenses matching expression. CROSS JOIN
+    makes SQLite start from the FTS index rather than walking the user's rows
+    and probing it once per row.
+    """
+    return (
+        text(
+            f"SELECT e.id FROM {FTS_TABLE} CROSS JOIN expenses e "
+            f"ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :fts_match AND e.user_id = :fts_user"
+        )
+        .bindparams(fts_match=expression, fts_user=user_id)
+        .columns(column("id"))
+    )
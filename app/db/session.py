@@ -1,8 +1,7 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import DB_URL
+from app.db.engine import get_engine
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+engine = get_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -0,0 +1,30 @@
+"""
+Derived columns for expense timestamps.
+
+expenses.ts keeps the ISO string as logged (with the user's offset at the
+time). ts_epoch is the same instant as integer UTC seconds, for range scans
+that are correct across offsets; local_day is the calendar day in the offset
+the expense was logged with, for grouping by day.
+"""
+
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.core.config import APP_TZ
+
+
+def to_epoch(ts: str, default_tz: str = APP_TZ) -> Optional[int]:
+    """UTC epoch seconds for an ISO timestamp; naive values are read in default_tz."""
+    try:
+        dt = datetime.fromisoformat(str(ts))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(default_tz))
+    return int(dt.timestamp())
+
+
+def local_day(ts: str) -> str:
+    """Local calendar day of an ISO timestamp (in the offset it was logged with)."""
+    return str(ts)[:10]
@@ -0,0 +1,204 @@
+"""
+LLM token usage per user, thread, graph node and day.
+
+llm_usage holds one row per (user_id, day, thread_id, node) with call and
+token counts. Calls are aggregated in memory by UsageRecorder and upserted
+with one executemany per flush (periodically, before usage reports and at
+shutdown), so the request path never waits on SQLite.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import (
+    DB_PATH,
+    LLM_INPUT_COST_PER_MTOK,
+    LLM_OUTPUT_COST_PER_MTOK,
+    USAGE_TRACKING_ENABLED,
+)
+from app.db.engine import connection
+
+logger = logging.getLogger(__name__)
+
+GROUP_COLUMNS = ("user_id", "thread_id", "node", "day")
+_COUNTS = ("calls", "input_tokens", "output_tokens", "total_tokens")
+
+_UPSERT = """
+    INSERT INTO llm_usage
+        (user_id, day, thread_id, node, calls, input_tokens, output_tokens, total_tokens)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, day, thread_id, node) DO UPDATE SET
+        calls = calls + excluded.calls,
+        input_tokens = input_tokens + excluded.input_tokens,
+        output_tokens = output_tokens + excluded.output_tokens,
+        total_tokens = total_tokens + excluded.total_tokens
+"""
+
+
+def cost_usd(input_tokens: int, output_tokens: int) -> float:
+    """Estimated cost at the configured per-million-token prices."""
+    return round(
+        (
+            input_tokens * LLM_INPUT_COST_PER_MTOK
+            + output_tokens * LLM_OUTPUT_COST_PER_MTOK
+        )
+        / 1_000_000,
+        6,
+    )
+
+
+class UsageRecorder:
+    """Aggregates per-call usage in memory until flush() writes it out."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._pending: Dict[tuple, List[int]] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.flushes = 0
+
+    def record(
+        self,
+        user_id: str,
+        thread_id: str,
+        node: str,
+        day: str,
+        usage: Dict[str, Any],
+    ):
+        """Add one LLM call's usage_metadata (input/output/total tokens)."""
+        input_tokens = int(usage.get("input_tokens") or 0)
+        output_tokens = int(usage.get("output_tokens") or 0)
+        total_tokens = int(usage.get("total_tokens") or input_tokens + output_tokens)
+        key = (user_id, day, thread_id, node)
+        with self._lock:
+            counts = self._pending.setdefault(key, [0, 0, 0, 0])
+            counts[0] += 1
+            counts[1] += input_tokens
+            counts[2] += output_tokens
+            counts[3] += total_tokens
+            self.recorded += 1
+
+    def flush(self) -> int:
+        """Upsert the pending rows. Returns how many rows were written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with connection(self.db_path or DB_PATH) as conn:
+                conn.executemany(
+                    _UPSERT, [(*key, *counts) for key, counts in pending.items()]
+                )
+        except Exception:
+            # Keep the counts for the next flush rather than losing them
+            with self._lock:
+                for key, counts in pending.items():
+                    merged = self._pending.setdefault(key, [0, 0, 0, 0])
+                    for i, n in enumerate(counts):
+                        merged[i] += n
+            raise
+        self.flushes += 1
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "recorded_calls": self.recorded,
+            "pending_rows": pending,
+            "flushes": self.flushes,
+        }
+
+
+def usage_report(
+    conn: sqlite3.Connection,
+    start: date,
+    end: date,
+    group_by: Sequence[str] = ("thread_id",),
+    user_id: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Usage between start and end (inclusive) grouped by any of GROUP_COLUMNS,
+    heaviest groups first, with totals and estimated cost.
+    """
+    columns = [c for c in GROUP_COLUMNS if c in group_by]
+    if len(columns) != len(set(group_by)):
+        raise ValueError(f"group_by must be among {GROUP_COLUMNS}")
+
+    where = "day BETWEEN ? AND ?"
+    params: List[Any] = [start.isoformat(), end.isoformat()]
+    if user_id is not None:
+        where += " AND user_id = ?"
+        params.append(user_id)
+    sums = ", ".join(f"SUM({c}) AS {c}" for c in _COUNTS)
+    keys = ", ".join(columns)
+
+    rows = conn.execute(
+        f"SELECT {keys + ', ' if keys else ''}{sums} FROM llm_usage WHERE {where}"
+        f"{' GROUP BY ' + keys if keys else ''} ORDER BY total_tokens DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    totals = conn.execute(
+        f"SELECT {sums} FROM llm_usage WHERE {where}", params
+    ).fetchone()
+
+    def entry(values: Sequence[Any]) -> Dict[str, Any]:
+        counts = dict(zip(_COUNTS, (int(v or 0) for v in values)))
+        counts["cost_usd"] = cost_usd(counts["input_tokens"], counts["output_tokens"])
+        return counts
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": columns,
+        "totals": entry(totals),
+        "rows": [
+            {**dict(zip(columns, row[: len(columns)])), **entry(row[len(columns) :])}
+            for row in rows
+            if row[len(columns)] is not None
+        ],
+    }
+
+
+async def flush_periodically(interval_s: float):
+    """Flush the process-wide recorder every interval_s seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        recorder = get_usage_recorder()
+        if recorder is None:
+            return
+        try:
+            await asyncio.to_thread(recorder.flush)
+        except Exception as e:
+            logger.warning("LLM usage flush failed, will retry: %s", e)
+
+
+_recorder: Optional[UsageRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_usage_recorder() -> Optional[UsageRecorder]:
+    """Return the process-wide usage recorder, or None when disabled."""
+    global _recorder
+    if not USAGE_TRACKING_ENABLED:
+        return None
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = UsageRecorder()
+    return _recorder
+
+
+def shutdown():
+    """Write out whatever is still pending (lifespan shutdown)."""
+    recorder = _recorder
+    if recorder is not None:
+        try:
+            recorder.flush()
+        except Exception as e:
+            logger.error("Final LLM usage flush failed: %s", e)
@@ -0,0 +1,31 @@
+"""
+Per-user data version counters.
+
+Every write to a user's expenses bumps user_data_versions.version in the same
+transaction, so anything derived from that data (cached reports, ETags) can
+be validated with a single primary-key lookup.
+"""
+
+import sqlite3
+
+from sqlalchemy import text
+
+_BUMP = text("""
+    INSERT INTO user_data_versions (user_id, version) VALUES (:user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+    """)
+
+
+def bump(db, *user_ids: str):
+    """Increment the version of each distinct user id (within db's transaction)."""
+    params = [{"user_id": user_id} for user_id in dict.fromkeys(user_ids)]
+    if params:
+        db.execute(_BUMP, params)
+
+
+def get_version(conn: sqlite3.Connection, user_id: str) -> int:
+    """Current data version for user_id (0 if they never wrote anything)."""
+    row = conn.execute(
+        "SELECT version FROM user_data_versions WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    return row[0] if row else 0
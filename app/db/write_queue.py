@@ -0,0 +1,210 @@
+"""
+Group-commit write queue.
+
+Write operations are callables taking a SQLAlchemy session. A single writer
+thread takes whatever arrives within max_wait_ms (up to max_batch ops), runs
+it in one transaction and commits once, so concurrent writers share one
+fsync instead of queueing on SQLite's lock one transaction at a time.
+Callers block on a Future and get their op's return value after the commit.
+
+If any op in a batch raises, the batch is rolled back and each op is re-run
+in its own transaction, so one bad write can't fail its neighbours.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import (
+    WRITE_QUEUE_ENABLED,
+    WRITE_QUEUE_MAX_BATCH,
+    WRITE_QUEUE_MAX_WAIT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[Any], Any]
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        max_batch: int = 256,
+        max_wait_ms: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "submitted": 0,
+            "committed": 0,
+            "failed": 0,
+            "batches": 0,
+            "retried_batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "commit_ms_total": 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="expense-writer", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Finish everything already queued, then stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, op: WriteOp) -> Future:
+        """Queue op for the next batch; the Future resolves after its commit."""
+        future: Future = Future()
+        with self._metrics_lock:
+            self._metrics["submitted"] += 1
+        self._queue.put((op, future))
+        if self._thread is None:
+            self.start()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        commit_ms_total = stats.pop("commit_ms_total")
+        stats["depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = (
+            stats["committed"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["avg_commit_ms"] = (
+            commit_ms_total / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+    def _run(self):
+        while True:
+            batch, stopping = self._collect()
+            if batch:
+                self._commit(batch)
+            if stopping:
+                return
+
+    def _collect(self) -> Tuple[List[Tuple[WriteOp, Future]], bool]:
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: List[Tuple[WriteOp, Future]]):
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            results = [op(db) for op, _ in batch]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(
+                "Write batch of %d failed (%s), retrying one by one", len(batch), e
+            )
+            self._retry_individually(batch)
+            return
+        finally:
+            db.close()
+
+        self._record(len(batch), len(batch), 0, time.perf_counter() - start)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _retry_individually(self, batch: List[Tuple[WriteOp, Future]]):
+        committed = failed = 0
+        start = time.perf_counter()
+        for op, future in batch:
+            db = self.session_factory()
+            try:
+                result = op(db)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                future.set_exception(e)
+                continue
+            finally:
+                db.close()
+            committed += 1
+            future.set_result(result)
+        self._record(len(batch), committed, failed, time.perf_counter() - start)
+        with self._metrics_lock:
+            self._metrics["retried_batches"] += 1
+
+    def _record(self, size: int, committed: int, failed: int, elapsed_s: float):
+        with self._metrics_lock:
+            m = self._metrics
+            m["batches"] += 1
+            m["committed"] += committed
+            m["failed"] += failed
+            m["last_batch_size"] = size
+            m["max_batch_size"] = max(m["max_batch_size"], size)
+            m["commit_ms_total"] += elapsed_s * 1000
+
+
+_write_queue: Optional[WriteQueue] = None
+_singleton_lock = threading.Lock()
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """Return the process-wide write queue, or None when disabled."""
+    global _write_queue
+    if not WRITE_QUEUE_ENABLED:
+        return None
+    if _write_queue is None:
+        with _singleton_lock:
+            if _write_queue is None:
+                from app.db.session import SessionLocal
+
+                _write_queue = WriteQueue(
+                    SessionLocal,
+                    max_batch=WRITE_QUEUE_MAX_BATCH,
+                    max_wait_ms=WRITE_QUEUE_MAX_WAIT_MS,
+                )
+                _write_queue.start()
+    return _write_queue
+
+
+def shutdown():
+    """Drain and stop the process-wide queue (lifespan shutdown)."""
+    global _write_queue
+    with _singleton_lock:
+        write_queue, _write_queue = _write_queue, None
+    if write_queue is not None:
+        write_queue.stop()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from sqlalchemy import ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import JSON
@@ -18,6 +19,68 @@ class Expense(Base):
     merchant = Column(String)
     raw_text = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Derived from ts (see app/db/timestamps.py)
+    ts_epoch = Column(Integer)
+    local_day = Column(String)
+    # Canonical merchant (see app/tools/merchants.py)
+    merchant_id = Column(Integer, ForeignKey("merchants.id"))
+
+    __table_args__ = (
+        Index("idx_expenses_user_epoch", "user_id", "ts_epoch"),
+        Index("idx_expenses_user_day_epoch", "user_id", "local_day", "ts_epoch"),
+        Index("idx_expenses_user_merchant_epoch", "user_id", "merchant_id", "ts_epoch"),
+    )
+
+
+class Merchant(Base):
+    __tablename__ = "merchants"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+
+
+class MerchantAlias(Base):
+    """Normalized merchant spelling; prefix aliases also match longer names"""
+
+    __tablename__ = "merchant_aliases"
+    alias = Column(String, primary_key=True)
+    merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=False)
+    prefix = Column(Integer, nullable=False, default=0)
+
+
+class ExpenseDailyRollup(Base):
+    """Pre-aggregated spend per user, local day and category (see app/db/rollups.py)"""
+
+    __tablename__ = "expense_daily_rollups"
+    user_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    max_amount = Column(Float, nullable=False, default=0)
+
+
+class UserDataVersion(Base):
+    """Counter bumped by every expense write for the user (see app/db/versions.py)"""
+
+    __tablename__ = "user_data_versions"
+    user_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class LLMUsage(Base):
+    """LLM calls and tokens per user, local day, thread and node (see app/db/usage.py)"""
+
+    __tablename__ = "llm_usage"
+    user_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)
+    thread_id = Column(String, primary_key=True, default="")
+    node = Column(String, primary_key=True)
+    calls = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("idx_llm_usage_day", "day"),)
 
 
 class GraphState(Base):
@@ -99,6 +99,182 @@ class WeeklyReportResponseSchema(BaseModel):
         }
 
 
+class PeriodComparisonSchema(BaseModel):
+    """Totals for the previous period of the same length"""
+
+    start: str = Field(..., description="Start date of the previous period")
+    end: str = Field(..., description="End date of the previous period")
+    total: float = Field(..., description="Total spending in the previous period")
+    by_category: Dict[str, float] = Field(
+        ..., description="Previous period spending by category"
+    )
+    change: float = Field(..., description="Current total minus previous total")
+    change_pct: Optional[float] = Field(
+        None, description="Change as a percentage (null if previous total is 0)"
+    )
+    by_category_change: Dict[str, float] = Field(
+        ..., description="Per-category change vs the previous period"
+    )
+
+
+class PeriodReportResponseSchema(WeeklyReportResponseSchema):
+    """Expense report for an arbitrary period (week_start/week_end hold its bounds)"""
+
+    granularity: str = Field(..., description="Bucket size: day, week or month")
+    by_bucket: Dict[str, float] = Field(
+        ..., description="Totals per bucket (day, week's Monday, or YYYY-MM)"
+    )
+    comparison: Optional[PeriodComparisonSchema] = Field(
+        None, description="Previous period totals, when requested"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "week_start": "2026-01-01",
+                "week_end": "2026-02-28",
+                "total": 42000.0,
+                "by_category": {"Groceries": 18000.0, "Transport": 9000.0},
+                "by_day": {"2026-01-02": 500.0, "2026-02-14": 2200.0},
+                "top_items": [],
+                "insights": ["Spending up 8.3% vs the previous 59 days"],
+                "granularity": "month",
+                "by_bucket": {"2026-01": 20000.0, "2026-02": 22000.0},
+                "comparison": {
+                    "start": "2025-11-03",
+                    "end": "2025-12-31",
+                    "total": 38769.0,
+                    "by_category": {"Groceries": 17000.0},
+                    "change": 3231.0,
+                    "change_pct": 8.3,
+                    "by_category_change": {"Groceries": 1000.0},
+                },
+            }
+        }
+
+
+class UsageCountsSchema(BaseModel):
+    """LLM calls, tokens and estimated cost"""
+
+    calls: int = Field(..., description="Number of LLM calls")
+    input_tokens: int = Field(..., description="Prompt tokens")
+    output_tokens: int = Field(..., description="Completion tokens")
+    total_tokens: int = Field(..., description="Total tokens")
+    cost_usd: float = Field(..., description="Estimated cost at the configured prices")
+
+
+class UsageRowSchema(UsageCountsSchema):
+    """Usage for one group; only the grouped-by fields are set"""
+
+    user_id: Optional[str] = None
+    thread_id: Optional[str] = None
+    node: Optional[str] = None
+    day: Optional[str] = None
+
+
+class UsageReportResponseSchema(BaseModel):
+    """LLM usage over a date range, heaviest groups first"""
+
+    start: str = Field(..., description="First day (YYYY-MM-DD)")
+    end: str = Field(..., description="Last day (YYYY-MM-DD)")
+    group_by: List[str] = Field(..., description="Grouping columns")
+    totals: UsageCountsSchema = Field(..., description="Usage over the whole range")
+    rows: List[UsageRowSchema] = Field(..., description="Usage per group")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "start": "2026-02-01",
+                "end": "2026-02-07",
+                "group_by": ["user_id", "thread_id"],
+                "totals": {
+                    "calls": 120,
+                    "input_tokens": 240000,
+                    "output_tokens": 18000,
+                    "total_tokens": 258000,
+                    "cost_usd": 0.48,
+                },
+                "rows": [
+                    {
+                        "user_id": "user123",
+                        "thread_id": "t-42",
+                        "calls": 80,
+                        "input_tokens": 200000,
+                        "output_tokens": 12000,
+                        "total_tokens": 212000,
+                        "cost_usd": 0.37,
+                    }
+                ],
+            }
+        }
+
+
+class BulkExpenseSchema(BaseModel):
+    """Bulk ingestion request: raw expense texts to extract and log"""
+
+    user_id: str = Field(..., description="Unique user identifier")
+    texts: List[str] = Field(..., min_length=1, description="Raw expense messages")
+    tz: Optional[str] = Field(None, description="User's timezone (e.g., Asia/Kolkata)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_id": "user123",
+                "texts": ["spent 500 on petrol yesterday", "coffee 150"],
+                "tz": "Asia/Kolkata",
+            }
+        }
+
+
+class BulkItemResultSchema(BaseModel):
+    """Outcome for a single text in a bulk request"""
+
+    index: int = Field(..., description="Position of the text in the request")
+    text: str
+    expense_id: Optional[int] = Field(
+        None, description="Id of the (first) logged expense"
+    )
+    expense_ids: List[int] = Field(
+        default_factory=list,
+        description="Ids of every expense logged from the text, in order",
+    )
+    is_ambiguous: bool = False
+    clarification_question: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkStatsSchema(BaseModel):
+    """Throughput statistics for a bulk request"""
+
+    received: int
+    logged: int = Field(..., description="Expenses inserted")
+    ambiguous: int
+    failed: int
+    batches: int = Field(..., description="Insert transactions used")
+    elapsed_s: float
+    items_per_s: float
+
+
+class BulkExpenseResponseSchema(BaseModel):
+    """Bulk ingestion response"""
+
+    user_id: str
+    items: List[BulkItemResultSchema]
+    stats: BulkStatsSchema
+
+
+class StatementImportResponseSchema(BaseModel):
+    """Bank statement import response"""
+
+    user_id: str
+    imported: int = Field(..., description="Expenses inserted")
+    skipped: int = Field(..., description="Debits not in INR, left out")
+    categorized: int = Field(..., description="Expenses categorized locally")
+    batches: int = Field(..., description="Insert transactions used")
+    elapsed_s: float
+    rows_per_s: float
+
+
 class HealthCheckSchema(BaseModel):
     """Health check response"""
 
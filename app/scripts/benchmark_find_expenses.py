@@ -0,0 +1,153 @@
+"""
+Compare find_expenses' LIKE scan with the FTS5 trigram lookup.
+
+Builds a throwaway database with --rows synthetic expenses spread over
+--users users, then times both query shapes for a few search terms.
+
+    python -m app.scripts.benchmark_find_expenses --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from app.db.engine import connect
+from app.db.migrations import migrate
+from app.db.search import RECENT_ROWS, match_expression
+
+WORDS = [
+    "groceries",
+    "vegetables",
+    "dinner",
+    "lunch",
+    "coffee",
+    "petrol",
+    "uber ride",
+    "electricity bill",
+    "movie tickets",
+    "medicines",
+    "gym membership",
+    "birthday gift",
+]
+MERCHANTS = ["Swiggy", "Zomato", "Amazon", "Flipkart", "BigBasket", "Uber", None]
+
+LIKE_SQL = """
+    SELECT id FROM expenses
+    WHERE user_id = ? AND (description LIKE ? OR merchant LIKE ?)
+    ORDER BY ts_epoch DESC, id DESC LIMIT 5
+"""
+
+# Same shape as find_expenses: LIKE over the latest RECENT_ROWS rows, then
+# the trigram index when that finds fewer than 5
+RECENT_SQL = f"""
+    SELECT id FROM expenses
+    WHERE id IN (
+        SELECT id FROM expenses WHERE user_id = ?
+        ORDER BY ts_epoch DESC, id DESC LIMIT {RECENT_ROWS}
+    ) AND (description LIKE ? OR merchant LIKE ? OR raw_text LIKE ?)
+    ORDER BY ts_epoch DESC, id DESC LIMIT 5
+"""
+INDEX_SQL = """
+    SELECT id FROM expenses
+    WHERE id IN (
+        SELECT e.id FROM expenses_fts CROSS JOIN expenses e
+        ON e.id = expenses_fts.rowid
+        WHERE expenses_fts MATCH ? AND e.user_id = ?
+    )
+    ORDER BY ts_epoch DESC, id DESC LIMIT 5
+"""
+
+
+def fts_lookup(conn: sqlite3.Connection, user_id: str, term: str):
+    like = f"%{term}%"
+    rows = conn.execute(RECENT_SQL, (user_id, like, like, like)).fetchall()
+    if len(rows) == 5:
+        return rows
+    expr = match_expression(["description", "merchant", "raw_text"], term)
+    return conn.execute(INDEX_SQL, (expr, user_id)).fetchall()
+
+
+def build(path: str, rows: int, users: int, seed: int = 1):
+    schema_path = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+    rng = random.Random(seed)
+    with connect(path) as conn:
+        with open(schema_path, "r", encoding="utf-8") as f:
+            migrate(conn, f.read())
+
+        start = time.perf_counter()
+        batch = []
+        for i in range(rows):
+            description = f"{rng.choice(WORDS)} {rng.randint(1, 999)}"
+            epoch = 1767225600 + i * 30
+            day = time.strftime("%Y-%m-%d", time.gmtime(epoch))
+            batch.append(
+                (
+                    f"user{i % users}",
+                    f"{day}T12:00:00+00:00",
+                    float(rng.randint(10, 5000)),
+                    "INR",
+                    "Other",
+                    description,
+                    rng.choice(MERCHANTS),
+                    description,
+                    f"{day}T12:00:00",
+                    epoch,
+                    day,
+                )
+            )
+            if len(batch) == 50_000:
+                _insert(conn, batch)
+                batch.clear()
+        _insert(conn, batch)
+        print(f"Inserted {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+def _insert(conn: sqlite3.Connection, batch):
+    with conn:
+        conn.executemany(
+            "INSERT INTO expenses (user_id, ts, amount, currency, category, "
+            "description, merchant, raw_text, created_at, ts_epoch, local_day) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+
+
+def _time(run, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="Reuse/keep this database file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "bench.db")
+        if not os.path.exists(path):
+            build(path, args.rows, args.users)
+
+        with connect(path) as conn:
+            print(f"{'term':<14}{'LIKE ms':>10}{'FTS ms':>10}{'speedup':>10}")
+            for term in ["coffee", "zomato", "gift 12", "petrol 999", "netflix"]:
+                params = ("user0", f"%{term}%", f"%{term}%")
+                like = _time(
+                    lambda: conn.execute(LIKE_SQL, params).fetchall(), args.repeat
+                )
+                fts = _time(lambda: fts_lookup(conn, "user0", term), args.repeat)
+                print(f"{term:<14}{like:>10.2f}{fts:>10.2f}{like / fts:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
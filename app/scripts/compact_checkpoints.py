@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from app.core.config import (
+    CHECKPOINT_KEEP_LAST,
+    CHECKPOINT_THREAD_TTL_S,
+    CHECKPOINT_VACUUM_PAGES,
+    GRAPH_STATE_DB,
+)
+from app.db.checkpoint_retention import compact_database
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prune old LangGraph checkpoints and reclaim the freed space"
+    )
+    parser.add_argument("--db", default=GRAPH_STATE_DB, help="Checkpoint database")
+    parser.add_argument(
+        "--keep-last",
+        type=int,
+        default=CHECKPOINT_KEEP_LAST,
+        help="Checkpoints kept per thread (0 keeps all)",
+    )
+    parser.add_argument(
+        "--ttl-days",
+        type=float,
+        default=CHECKPOINT_THREAD_TTL_S / 86400,
+        help="Delete threads idle for longer than this (0 keeps them)",
+    )
+    parser.add_argument(
+        "--vacuum-pages",
+        type=int,
+        default=CHECKPOINT_VACUUM_PAGES,
+        help="Most free pages to reclaim (0 = all)",
+    )
+    args = parser.parse_args()
+
+    report = compact_database(
+        args.db,
+        keep_last=args.keep_last,
+        idle_ttl_s=args.ttl_days * 86400,
+        vacuum_pages=args.vacuum_pages,
+        convert=True,
+    )
+
+    print(
+        f"Deleted {report['checkpoints_deleted']} checkpoint(s) and "
+        f"{report['writes_deleted']} pending write(s), "
+        f"dropped {report['threads_dropped']} idle thread(s)"
+    )
+    if report.get("full_vacuum"):
+        print("Switched to incremental auto_vacuum (one-time full VACUUM)")
+    print(
+        f"{report['bytes_before']:,} -> {report['bytes_after']:,} bytes "
+        f"({report['bytes_reclaimed']:,} reclaimed in {report['elapsed_s']}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from app.core.config import APP_TZ, DEFAULT_USER_ID, STATEMENT_IMPORT_BATCH_SIZE
+from app.tools.statement_import import (
+    StatementFormatError,
+    detect_format,
+    import_statement,
+)
+from app.tools.store import init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import a bank statement (CSV/OFX) without the LLM"
+    )
+    parser.add_argument("path", help="Statement file (.csv, .ofx or .qfx)")
+    parser.add_argument("--user-id", default=DEFAULT_USER_ID)
+    parser.add_argument("--tz", default=APP_TZ)
+    parser.add_argument(
+        "--format", choices=["csv", "ofx"], help="Default: by extension"
+    )
+    parser.add_argument("--batch-size", type=int, default=STATEMENT_IMPORT_BATCH_SIZE)
+    parser.add_argument("--date-format", help="strptime format, e.g. %%d/%%m/%%Y")
+    parser.add_argument(
+        "--positive-debits",
+        action="store_true",
+        help="Treat positive amounts as expenses (default: only negatives)",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    fmt = args.format or detect_format(args.path)
+
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            stats = import_statement(
+                args.user_id,
+                f,
+                fmt=fmt,
+                tz=args.tz,
+                batch_size=args.batch_size,
+                date_format=args.date_format,
+                positive_debits=args.positive_debits,
+            )
+    except StatementFormatError as e:
+        print(f"Import failed: {e}")
+        return 1
+
+    print(
+        f"Imported {stats['imported']} expenses "
+        f"({stats['categorized']} categorized locally) "
+        f"and skipped {stats['skipped']} non-INR rows "
+        f"in {stats['batches']} transaction(s), {stats['elapsed_s']}s "
+        f"({stats['rows_per_s']} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import argparse
+import sys
+
+from app.core.config import DB_PATH
+from app.db import rollups
+from app.db.engine import connection
+from app.tools.store import init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recompute daily spending rollups and check them against expenses"
+    )
+    parser.add_argument(
+        "--verify-only",
+        action="store_true",
+        help="Only compare rollups with the raw rows, don't rebuild",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    with connection(DB_PATH) as conn:
+        if not args.verify_only:
+            written = rollups.rebuild(conn)
+            print(f"Rebuilt {written} rollup row(s) from expenses")
+
+        mismatches = rollups.verify(conn)
+
+    if mismatches:
+        print(f"{len(mismatches)} rollup row(s) out of sync:")
+        for m in mismatches[:20]:
+            print(
+                f"   - {m['user_id']} {m['day']} {m['category']}: "
+                f"expected {m['expected']}, found {m['actual']}"
+            )
+        return 1
+
+    print("Rollups match expenses")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
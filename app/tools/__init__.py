@@ -1,13 +1,25 @@
 from app.tools.processor import process_expense
-from app.tools.store import log_expense, update_expense, delete_expense, find_expenses
+from app.tools.store import (
+    log_expense,
+    log_expenses,
+    update_expense,
+    delete_expense,
+    find_expenses,
+)
 from app.tools.analytics import weekly_report
+from app.tools.utils import timed_tool
 
 # Merged tool that handles extraction + categorization
 ALL_TOOLS = [
     process_expense,
     log_expense,
+    log_expenses,
     update_expense,
     delete_expense,
     find_expenses,
     weekly_report,
 ]
+
+# Per-tool latency for /metrics, however the tool is called (agent, router, ...)
+for _tool in ALL_TOOLS:
+    timed_tool(_tool)
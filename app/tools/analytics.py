@@ -1,12 +1,59 @@
 import sqlite3
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-import pandas as pd
 from langchain_core.tools import tool
 
 from app.core.config import DB_PATH
+from app.db.engine import connection
+from app.db.versions import get_version
+from app.tools.utils import async_in_thread
+
+# Daily x category rollups: at most 7 * len(CATEGORIES) rows per week
+_BY_CATEGORY_SQL = """
+    SELECT category, SUM(total) AS total
+    FROM expense_daily_rollups
+    WHERE user_id = ? AND day >= ? AND day < ?
+    GROUP BY category
+    ORDER BY total DESC, category
+"""
+
+_BY_DAY_SQL = """
+    SELECT day, SUM(total) AS total
+    FROM expense_daily_rollups
+    WHERE user_id = ? AND day >= ? AND day < ?
+    GROUP BY day
+    ORDER BY day
+"""
+
+# One scan over the rollups for the whole range (and the previous period
+# when comparing); buckets and periods are folded in Python.
+_DAY_CATEGORY_SQL = """
+    SELECT day, category, SUM(total) AS total
+    FROM expense_daily_rollups
+    WHERE user_id = ? AND day >= ? AND day <= ?
+    GROUP BY day, category
+"""
+
+GRANULARITIES = ("day", "week", "month")
+
+# Same local_day range as the rollups, so top items agree with the totals
+# whatever offset each expense was logged in (idx_expenses_user_day_epoch)
+_TOP_ITEMS_SQL = """
+    SELECT amount, category, description, merchant, local_day AS day
+    FROM expenses
+    WHERE user_id = ? AND local_day >= ? AND local_day < ?
+    ORDER BY amount DESC, id
+    LIMIT 5
+"""
+
+
+def data_version(user_id: str) -> int:
+    """The user's data version; reports computed at the same version are equal."""
+    with connection(DB_PATH) as conn:
+        return get_version(conn, user_id)
 
 
 def _week_bounds(now_local: datetime):
@@ -17,45 +64,241 @@ def _week_bounds(now_local: datetime):
     return start, end
 
 
-@tool
-def weekly_report(user_id: str, tz: str = "Asia/Kolkata") -> Dict[str, Any]:
+def _report(
+    start: datetime,
+    end: datetime,
+    by_category: Dict[str, float],
+    by_day: Dict[str, float],
+    top_items: List[Dict[str, Any]],
+    empty_insight: str = "No expenses logged this week yet.",
+) -> Dict[str, Any]:
+    week = {
+        "week_start": start.date().isoformat(),
+        "week_end": (end.date() - timedelta(days=1)).isoformat(),
+    }
+    if not by_day:
+        return {
+            **week,
+            "total": 0.0,
+            "by_category": {},
+            "by_day": {},
+            "top_items": [],
+            "insights": [empty_insight],
+        }
+
+    total = float(sum(by_day.values()))
+    biggest_cat, biggest_val = max(by_category.items(), key=lambda x: x[1])
+    insights = [
+        f"Highest spend category: {biggest_cat} (amount {biggest_val})",
+        f"Avg per active day: {total / max(len(by_day), 1):.0f}",
+    ]
+
+    return {
+        **week,
+        "total": total,
+        "by_category": by_category,
+        "by_day": by_day,
+        "top_items": top_items,
+        "insights": insights,
+    }
+
+
+def current_week_start(tz: str = "Asia/Kolkata") -> str:
+    start, _ = _week_bounds(datetime.now(ZoneInfo(tz)))
+    return start.date().isoformat()
+
+
+def compute_weekly_report(
+    user_id: str, tz: str = "Asia/Kolkata", now: Optional[datetime] = None
+) -> Dict[str, Any]:
     """
-    Compute weekly totals, category split, daily totals and a few insights.
+    Build the weekly report with GROUP BY / ORDER BY ... LIMIT queries
+    over one connection (rollups for the aggregates, expenses for the top 5).
+    """
+    now_local = now or datetime.now(ZoneInfo(tz))
+    start, end = _week_bounds(now_local)
+    day_params = (user_id, start.date().isoformat(), end.date().isoformat())
+
+    with connection(DB_PATH) as conn:
+        by_category = {
+            c: float(t) for c, t in conn.execute(_BY_CATEGORY_SQL, day_params)
+        }
+        by_day = {d: float(t) for d, t in conn.execute(_BY_DAY_SQL, day_params)}
+        top_items = _top_items(conn, user_id, start, end)
+
+    return _report(start, end, by_category, by_day, top_items)
+
+
+def _top_items(
+    conn: sqlite3.Connection, user_id: str, start: datetime, end: datetime
+) -> List[Dict[str, Any]]:
+    return [
+        {
+            "amount": float(amount),
+            "category": category,
+            "description": description,
+            "merchant": merchant,
+            "day": day,
+        }
+        for amount, category, description, merchant, day in conn.execute(
+            _TOP_ITEMS_SQL,
+            (user_id, start.date().isoformat(), end.date().isoformat()),
+        )
+    ]
+
+
+def bucket_key(day: date, granularity: str) -> str:
+    """Bucket label for a day: the day, the Monday of its week, or YYYY-MM."""
+    if granularity == "day":
+        return day.isoformat()
+    if granularity == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if granularity == "month":
+        return day.strftime("%Y-%m")
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def _sorted_totals(totals: Dict[str, float]) -> Dict[str, float]:
+    return dict(sorted(totals.items(), key=lambda x: (-x[1], x[0])))
+
+
+def _comparison(
+    current: Dict[str, Any],
+    previous_by_category: Dict[str, float],
+    prev_start: date,
+    prev_end: date,
+) -> Dict[str, Any]:
+    previous_total = float(sum(previous_by_category.values()))
+    change = current["total"] - previous_total
+    categories = current["by_category"].keys() | previous_by_category.keys()
+    return {
+        "start": prev_start.isoformat(),
+        "end": prev_end.isoformat(),
+        "total": previous_total,
+        "by_category": _sorted_totals(previous_by_category),
+        "change": change,
+        "change_pct": (
+            round(change / previous_total * 100, 1) if previous_total else None
+        ),
+        "by_category_change": _sorted_totals(
+            {
+                c: current["by_category"].get(c, 0.0) - previous_by_category.get(c, 0.0)
+                for c in categories
+            }
+        ),
+    }
+
+
+def compute_period_report(
+    user_id: str,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    compare: bool = False,
+    tz: str = "Asia/Kolkata",
+) -> Dict[str, Any]:
+    """
+    Report for the days start..end (inclusive), bucketed by day/week/month.
+
+    With compare, the same-length period ending the day before start is
+    aggregated by the same query and returned under "comparison".
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    length = end - start + timedelta(days=1)
+    prev_start, prev_end = start - length, start - timedelta(days=1)
+    zone = ZoneInfo(tz)
+    start_dt = datetime.combine(start, time(), tzinfo=zone)
+    end_dt = datetime.combine(end + timedelta(days=1), time(), tzinfo=zone)
+
+    scan_from = prev_start if compare else start
+    with connection(DB_PATH) as conn:
+        rows = conn.execute(
+            _DAY_CATEGORY_SQL, (user_id, scan_from.isoformat(), end.isoformat())
+        ).fetchall()
+        top_items = _top_items(conn, user_id, start_dt, end_dt)
+
+    by_category: Dict[str, float] = defaultdict(float)
+    by_day: Dict[str, float] = defaultdict(float)
+    by_bucket: Dict[str, float] = defaultdict(float)
+    previous_by_category: Dict[str, float] = defaultdict(float)
+    start_key = start.isoformat()
+    for day, category, total in rows:
+        if day < start_key:
+            previous_by_category[category] += total
+            continue
+        by_category[category] += total
+        by_day[day] += total
+        by_bucket[bucket_key(date.fromisoformat(day), granularity)] += total
+
+    report = _report(
+        start_dt,
+        end_dt,
+        _sorted_totals(by_category),
+        dict(sorted(by_day.items())),
+        top_items,
+        empty_insight="No expenses logged in this period.",
+    )
+    report.update(
+        {
+            "granularity": granularity,
+            "by_bucket": dict(sorted(by_bucket.items())),
+            "comparison": None,
+        }
+    )
+
+    if compare:
+        comparison = _comparison(report, previous_by_category, prev_start, prev_end)
+        report["comparison"] = comparison
+        if comparison["change_pct"] is not None:
+            direction = "up" if comparison["change"] >= 0 else "down"
+            report["insights"].append(
+                f"Spending {direction} {abs(comparison['change_pct'])}% "
+                f"vs the previous {length.days} days"
+            )
+
+    return report
+
+
+def weekly_report_pandas(
+    user_id: str, tz: str = "Asia/Kolkata", now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Reference implementation: aggregate the raw expense rows with pandas.
+    Not used when serving requests; tests check compute_weekly_report against it.
     """
-    now_local = datetime.now(ZoneInfo(tz))
+    import pandas as pd
+
+    now_local = now or datetime.now(ZoneInfo(tz))
     start, end = _week_bounds(now_local)
 
-    with sqlite3.connect(DB_PATH) as conn:
+    with connection(DB_PATH) as conn:
         df = pd.read_sql_query(
-            """SELECT ts, amount, currency, category, description, merchant
+            """SELECT local_day AS day, amount, currency, category,
+                description, merchant
             FROM expenses
-            WHERE user_id = ? AND ts >= ? AND ts < ?
+            WHERE user_id = ? AND local_day >= ? AND local_day < ?
+            ORDER BY id
             """,
             conn,
-            params=(user_id, start.isoformat(), end.isoformat()),
+            params=(user_id, start.date().isoformat(), end.date().isoformat()),
         )
 
     if df.empty:
-        return {
-            "week_start": start.date().isoformat(),
-            "week_end": (end.date() - timedelta(days=1)).isoformat(),
-            "total": 0.0,
-            "by_category": {},
-            "by_day": {},
-            "top_items": [],
-            "insights": ["No expenses logged this week yet."],
-        }
+        return _report(start, end, {}, {}, [])
 
-    df["ts"] = pd.to_datetime(df["ts"])
-    df["day"] = df["ts"].dt.date.astype(str)
-
-    total = float(df["amount"].sum())
     by_category = (
-        df.groupby("category")["amount"].sum().sort_values(ascending=False).to_dict()
+        df.groupby("category")["amount"]
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+        .to_dict()
     )
     by_day = df.groupby("day")["amount"].sum().sort_index().to_dict()
 
-    top = df.sort_values("amount", ascending=False).head(5)
+    top = df.sort_values("amount", ascending=False, kind="stable").head(5)
 
     top_items = [
         {
@@ -68,18 +311,13 @@ def weekly_report(user_id: str, tz: str = "Asia/Kolkata") -> Dict[str, Any]:
         for r in top.itertuples()
     ]
 
-    biggest_cat, biggest_val = max(by_category.items(), key=lambda x: x[1])
-    insights = [
-        f"Highest spend category: {biggest_cat} (amount {biggest_val})",
-        f"Avg per active day: {total / max(len(by_day), 1):.0f}",
-    ]
+    return _report(start, end, by_category, by_day, top_items)
 
-    return {
-        "week_start": start.date().isoformat(),
-        "week_end": (end.date() - timedelta(days=1)).isoformat(),
-        "total": total,
-        "by_category": by_category,
-        "by_day": by_day,
-        "top_items": top_items,
-        "insights": insights,
-    }
+
+@async_in_thread
+@tool
+def weekly_report(user_id: str, tz: str = "Asia/Kolkata") -> Dict[str, Any]:
+    """
+    Compute weekly totals, category split, daily totals and a few insights.
+    """
+    return compute_weekly_report(user_id, tz)
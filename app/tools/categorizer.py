@@ -0,0 +1,297 @@
+"""
+Per-user categorizer learned from the user's own expenses.
+
+Two local predictors, tried in order:
+
+- merchant lookup: the category the user's past expenses at this merchant
+  were filed under ("HP" -> Fuel)
+- kNN over TF-IDF weighted description/merchant tokens: the categories of
+  the most similar past expenses
+
+Confidence is the winning category's share of the evidence, scaled by how
+much evidence there is (n / (n + 0.5)), so one past row is never enough on
+its own but three consistent ones are. Models are trained lazily from the
+expenses table on first use, take new rows once the store commits them, and
+are dropped (retrained on next use) when a row is updated or deleted.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    CATEGORIZER_ENABLED,
+    CATEGORIZER_MAX_ROWS,
+    CATEGORIZER_MAX_USERS,
+    CATEGORIZER_MIN_CONFIDENCE,
+    DB_PATH,
+)
+from app.db.engine import connection
+
+_TOKEN_RE = re.compile(r"[a-z][a-z&'-]+")
+_STOPWORDS = {
+    "spent",
+    "spend",
+    "paid",
+    "pay",
+    "bought",
+    "got",
+    "on",
+    "for",
+    "of",
+    "an",
+    "the",
+    "my",
+    "at",
+    "from",
+    "rs",
+    "inr",
+    "rupees",
+    "bucks",
+    "was",
+    "it",
+    "and",
+    "today",
+    "yesterday",
+}
+# "Other" says nothing about a description, so it's neither learned nor predicted
+_UNINFORMATIVE = "Other"
+NEIGHBORS = 5
+_MAX_CACHED_QUERIES = 4096
+
+_LOAD_SQL = """
+    SELECT id, description, merchant, category FROM expenses
+    WHERE user_id = ? ORDER BY id DESC LIMIT ?
+"""
+
+
+def _merchant_key(merchant: Optional[str]) -> Optional[str]:
+    key = " ".join((merchant or "").lower().split())
+    return key or None
+
+
+def features(description: Optional[str], merchant: Optional[str]) -> FrozenSet[str]:
+    tokens = {
+        t for t in _TOKEN_RE.findall((description or "").lower()) if t not in _STOPWORDS
+    }
+    key = _merchant_key(merchant)
+    if key:
+        # The whole name is a strong feature; its words also match descriptions
+        tokens.add(f"m:{key}")
+        tokens.update(t for t in _TOKEN_RE.findall(key) if t not in _STOPWORDS)
+    return frozenset(tokens)
+
+
+def _support(n: float) -> float:
+    return n / (n + 0.5)
+
+
+class UserCategorizer:
+    """One user's merchant counts and deduplicated token documents."""
+
+    def __init__(self):
+        self.last_id = 0
+        self.rows = 0
+        self.merchants: Dict[str, Counter] = defaultdict(Counter)
+        # Identical token sets share one document with per-category counts
+        self.docs: Dict[FrozenSet[str], Counter] = {}
+        self.postings: Dict[str, set] = defaultdict(set)
+        # idf weights and document norms, valid until the next new document
+        self._idf_cache: Dict[str, float] = {}
+        self._norms: Dict[FrozenSet[str], float] = {}
+        # kNN results by query token set, valid until the next added row.
+        # Statement narrations differ mostly in reference numbers, which
+        # aren't tokens, so an import repeats a few hundred token sets
+        self._neighbors: Dict[FrozenSet[str], Optional[Tuple[str, float]]] = {}
+
+    def add(
+        self,
+        description: Optional[str],
+        merchant: Optional[str],
+        category: str,
+        row_id: int = 0,
+    ):
+        if row_id:
+            if row_id <= self.last_id:
+                return
+            self.last_id = row_id
+        if not category or category == _UNINFORMATIVE:
+            return
+        self._neighbors.clear()
+
+        key = _merchant_key(merchant)
+        if key:
+            self.merchants[key][category] += 1
+
+        feats = features(description, merchant)
+        if not feats:
+            return
+        doc = self.docs.get(feats)
+        if doc is None:
+            doc = self.docs[feats] = Counter()
+            for token in feats:
+                self.postings[token].add(feats)
+            self._idf_cache.clear()
+            self._norms.clear()
+        doc[category] += 1
+        self.rows += 1
+
+    def _idf(self, token: str) -> float:
+        idf = self._idf_cache.get(token)
+        if idf is None:
+            df = len(self.postings.get(token, ()))
+            idf = self._idf_cache[token] = math.log((1 + len(self.docs)) / (1 + df)) + 1
+        return idf
+
+    def _norm(self, feats: FrozenSet[str]) -> float:
+        norm = self._norms.get(feats)
+        if norm is None:
+            norm = self._norms[feats] = math.sqrt(sum(self._idf(t) ** 2 for t in feats))
+        return norm
+
+    def by_merchant(self, merchant: Optional[str]) -> Optional[Tuple[str, float]]:
+        counts = self.merchants.get(_merchant_key(merchant) or "")
+        if not counts:
+            return None
+        n = sum(counts.values())
+        category, hits = counts.most_common(1)[0]
+        return category, hits / n * _support(n)
+
+    def by_neighbors(
+        self, description: Optional[str], merchant: Optional[str]
+    ) -> Optional[Tuple[str, float]]:
+        feats = features(description, merchant)
+        if feats in self._neighbors:
+            return self._neighbors[feats]
+        if len(self._neighbors) >= _MAX_CACHED_QUERIES:
+            self._neighbors.clear()
+        guess = self._neighbors[feats] = self._vote(feats)
+        return guess
+
+    def _vote(self, feats: FrozenSet[str]) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for token in feats:
+            candidates |= self.postings.get(token, set())
+        if not candidates:
+            return None
+
+        query_norm = self._norm(feats)
+        scored = []
+        for doc in candidates:
+            overlap = sum(self._idf(t) ** 2 for t in feats & doc)
+            scored.append((overlap / (query_norm * self._norm(doc)), doc))
+        scored.sort(key=lambda x: x[0], reverse=True)
+
+        votes: Counter = Counter()
+        evidence = 0
+        for similarity, doc in scored[:NEIGHBORS]:
+            for category, count in self.docs[doc].items():
+                votes[category] += similarity * count
+                evidence += count
+        category, score = votes.most_common(1)[0]
+        share = score / sum(votes.values())
+        return category, share * scored[0][0] * _support(evidence)
+
+    def predict(
+        self, description: Optional[str], merchant: Optional[str]
+    ) -> Optional[Tuple[str, float]]:
+        """Best (category, confidence) of the merchant lookup and kNN."""
+        # Without a recognized merchant the description may still be one ("hp 500")
+        guesses = [
+            self.by_merchant(merchant or description),
+            self.by_neighbors(description, merchant),
+        ]
+        guesses = [g for g in guesses if g is not None]
+        return max(guesses, key=lambda g: g[1]) if guesses else None
+
+
+class Categorizer:
+    """Lazily trained UserCategorizer per user, LRU-bounded."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_rows: int = CATEGORIZER_MAX_ROWS,
+        max_users: int = CATEGORIZER_MAX_USERS,
+        min_confidence: float = CATEGORIZER_MIN_CONFIDENCE,
+    ):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.min_confidence = min_confidence
+        self._models = TTLCache(maxsize=max_users)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _train(self, user_id: str) -> UserCategorizer:
+        model = UserCategorizer()
+        with connection(self.db_path or DB_PATH) as conn:
+            rows = conn.execute(_LOAD_SQL, (user_id, self.max_rows)).fetchall()
+        for row_id, description, merchant, category in reversed(rows):
+            model.add(description, merchant, category, row_id)
+        return model
+
+    def _model(self, user_id: str) -> UserCategorizer:
+        model = self._models.get(user_id)
+        if model is None:
+            model = self._train(user_id)
+            self._models.set(user_id, model, size=1)
+        return model
+
+    def predict(
+        self, user_id: str, description: Optional[str], merchant: Optional[str]
+    ) -> Optional[Tuple[str, float]]:
+        """(category, confidence) when confident enough, otherwise None."""
+        with self._lock:
+            guess = self._model(user_id).predict(description, merchant)
+            if guess is None or guess[1] < self.min_confidence:
+                self.misses += 1
+                return None
+            self.hits += 1
+        category, confidence = guess
+        return category, round(confidence, 3)
+
+    def observe(self, user_id: str, rows: Iterable[Tuple[int, Any, Any, str]]):
+        """
+        Learn from newly committed (id, description, merchant, category) rows.
+        Users without a loaded model pick them up when trained.
+        """
+        with self._lock:
+            model = self._models.get(user_id)
+            if model is None:
+                return
+            for row_id, description, merchant, category in rows:
+                model.add(description, merchant, category, row_id)
+
+    def forget(self, user_id: str):
+        """Drop a user's model after an update/delete; it is retrained on next use."""
+        with self._lock:
+            self._models.pop(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "users": len(self._models),
+        }
+
+
+_categorizer: Optional[Categorizer] = None
+_categorizer_lock = threading.Lock()
+
+
+def get_categorizer() -> Optional[Categorizer]:
+    """Return the process-wide categorizer, or None when disabled."""
+    global _categorizer
+    if not CATEGORIZER_ENABLED:
+        return None
+    if _categorizer is None:
+        with _categorizer_lock:
+            if _categorizer is None:
+                _categorizer = Categorizer()
+    return _categorizer
@@ -0,0 +1,192 @@
+import json
+import re
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Any, Dict, List, Optional, Union
+
+from app.core.cache import TTLCache
+from app.db.engine import connection
+from app.core.config import (
+    EXTRACTION_CACHE_DB,
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_SIZE,
+    EXTRACTION_CACHE_TTL_S,
+)
+
+DATE_FIELDS = ("ts", "created_at")
+
+# One extracted expense, or every expense found in a message
+Extraction = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+# Date phrases whose meaning depends on the calendar day the message was sent
+# (weekdays, month names, explicit dates). Texts containing them are keyed on
+# the reference date; purely relative texts ("yesterday") are not.
+_ANCHORED_DATE_RE = re.compile(
+    r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|may|june?|july?|aug(ust)?|"
+    r"sep(t|tember)?|oct(ober)?|nov(ember)?|dec(ember)?|week|month|"
+    r"\d{1,2}(st|nd|rd|th))\b|\d{1,4}[-/]\d{1,2}([-/]\d{1,4})?",
+    re.IGNORECASE,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, collapse whitespace and trim punctuation around the message."""
+    text = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    return text.strip(" .!,;")
+
+
+def _reference_anchor(norm_text: str, today: date) -> str:
+    return today.isoformat() if _ANCHORED_DATE_RE.search(norm_text) else ""
+
+
+def _to_relative(value: Dict[str, Any], today: date) -> Dict[str, Any]:
+    """Replace absolute date fields with (day offset, local time) pairs."""
+    out = dict(value)
+    for field in DATE_FIELDS:
+        raw = out.get(field)
+        if raw is None:
+            continue
+        dt = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw))
+        out[field] = {
+            "days": (dt.date() - today).days,
+            "time": dt.time().replace(tzinfo=None).isoformat(),
+        }
+    return out
+
+
+def _to_absolute(value: Dict[str, Any], today: date, tz: str) -> Dict[str, Any]:
+    """Re-resolve relative date fields against today's reference date."""
+    out = dict(value)
+    for field in DATE_FIELDS:
+        rel = out.get(field)
+        if not isinstance(rel, dict):
+            continue
+        day = today + timedelta(days=rel["days"])
+        resolved = datetime.combine(
+            day, dtime.fromisoformat(rel["time"]), tzinfo=ZoneInfo(tz)
+        )
+        out[field] = resolved.isoformat()
+    return out
+
+
+class ExtractionCache:
+    """
+    Cache of process_expense extraction results keyed on normalized text,
+    timezone and reference date, with optional SQLite persistence.
+
+    Date fields are stored relative to the day of extraction and re-resolved
+    on every hit, so "coffee 150 yesterday" stays correct across days.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        ttl: Optional[float] = None,
+        db_path: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._db_lock = threading.Lock()
+        self.persistent_hits = 0
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        with self._db_lock, connection(self.db_path) as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS extraction_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                )""")
+            conn.execute(
+                "DELETE FROM extraction_cache WHERE expires_at IS NOT NULL "
+                "AND expires_at <= ?",
+                (time.time(),),
+            )
+
+    def _key(self, text: str, tz: str, today: date) -> str:
+        norm = normalize_text(text)
+        return f"{tz}|{_reference_anchor(norm, today)}|{norm}"
+
+    def get(self, text: str, tz: str) -> Optional[Extraction]:
+        today = datetime.now(ZoneInfo(tz)).date()
+        key = self._key(text, tz, today)
+
+        value = self._memory.get(key)
+        if value is None and self.db_path:
+            value = self._load(key)
+            if value is not None:
+                self.persistent_hits += 1
+                self._memory.set(key, value, size=len(json.dumps(value)))
+
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return [_to_absolute(item, today, tz) for item in value]
+        return _to_absolute(value, today, tz)
+
+    def set(self, text: str, tz: str, result: Extraction):
+        today = datetime.now(ZoneInfo(tz)).date()
+        key = self._key(text, tz, today)
+        if isinstance(result, list):
+            value = [_to_relative(item, today) for item in result]
+        else:
+            value = _to_relative(result, today)
+        payload = json.dumps(value, default=str)
+
+        self._memory.set(key, value, size=len(payload))
+        if self.db_path:
+            expires_at = time.time() + self.ttl if self.ttl else None
+            with self._db_lock, connection(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (key, value, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, payload, expires_at),
+                )
+
+    def _load(self, key: str) -> Optional[Extraction]:
+        with self._db_lock, connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM extraction_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def clear(self):
+        self._memory.clear()
+        if self.db_path:
+            with self._db_lock, connection(self.db_path) as conn:
+                conn.execute("DELETE FROM extraction_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._memory.stats()
+        # Misses in memory that were served from SQLite still count as hits
+        stats["hits"] += self.persistent_hits
+        stats["misses"] -= self.persistent_hits
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["persistent"] = bool(self.db_path)
+        return stats
+
+
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Return the process-wide extraction cache, or None when disabled."""
+    global _cache
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ExtractionCache(
+            maxsize=EXTRACTION_CACHE_SIZE,
+            ttl=EXTRACTION_CACHE_TTL_S or None,
+            db_path=EXTRACTION_CACHE_DB or None,
+        )
+    return _cache
@@ -0,0 +1,403 @@
+import re
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import FAST_PARSER_MIN_CONFIDENCE
+
+# Keyword -> category map used by the rule-based extractor.
+# Multi-word keywords are matched as phrases, single words on word boundaries.
+CATEGORY_KEYWORDS = {
+    "Fuel": [
+        "petrol",
+        "diesel",
+        "fuel",
+        "cng",
+        "petrol pump",
+        "indian oil",
+        "bharat petroleum",
+    ],
+    "Groceries": [
+        "grocery",
+        "groceries",
+        "vegetables",
+        "veggies",
+        "fruits",
+        "milk",
+        "supermarket",
+        "bigbasket",
+        "blinkit",
+        "zepto",
+        "dmart",
+    ],
+    "Food & Dining": [
+        "breakfast",
+        "lunch",
+        "dinner",
+        "coffee",
+        "tea",
+        "snacks",
+        "restaurant",
+        "cafe",
+        "pizza",
+        "burger",
+        "swiggy",
+        "zomato",
+        "starbucks",
+    ],
+    "Transport": [
+        "uber",
+        "ola",
+        "rapido",
+        "auto",
+        "taxi",
+        "cab",
+        "metro",
+        "bus",
+        "parking",
+        "toll",
+    ],
+    "Shopping": [
+        "amazon",
+        "flipkart",
+        "myntra",
+        "clothes",
+        "shoes",
+        "shopping",
+    ],
+    "Bills": [
+        "electricity",
+        "electricity bill",
+        "water bill",
+        "internet",
+        "wifi",
+        "broadband",
+        "recharge",
+        "phone bill",
+        "dth",
+    ],
+    "Rent": ["rent", "house rent"],
+    "Health": [
+        "medicine",
+        "medicines",
+        "pharmacy",
+        "doctor",
+        "hospital",
+        "clinic",
+        "gym",
+    ],
+    "Travel": ["flight", "hotel", "train", "irctc", "airbnb", "makemytrip"],
+}
+
+# Well-known merchants that may appear without an "at"/"from" marker.
+KNOWN_MERCHANTS = {
+    "hp": "HP",
+    "indian oil": "Indian Oil",
+    "bharat petroleum": "Bharat Petroleum",
+    "bigbasket": "BigBasket",
+    "blinkit": "Blinkit",
+    "zepto": "Zepto",
+    "dmart": "DMart",
+    "swiggy": "Swiggy",
+    "zomato": "Zomato",
+    "starbucks": "Starbucks",
+    "uber": "Uber",
+    "ola": "Ola",
+    "rapido": "Rapido",
+    "amazon": "Amazon",
+    "flipkart": "Flipkart",
+    "myntra": "Myntra",
+    "irctc": "IRCTC",
+    "airbnb": "Airbnb",
+    "makemytrip": "MakeMyTrip",
+}
+
+WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+# Messages with these words are edits, questions or non-INR amounts: leave to the LLM.
+_REJECT_RE = re.compile(
+    r"\b(update|change|edit|delete|remove|undo|refund|cancel|not|didn't|report|"
+    r"how|what|why|usd|eur|gbp|dollars?|euros?|pounds?|month|week|"
+    r"jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)\b|[$€£?]",
+    re.IGNORECASE,
+)
+
+_AMOUNT_RE = re.compile(
+    r"(?:(?:₹|rs\.?|inr)\s*)?(?<![\w.])(\d{1,3}(?:,\d{2,3})+|\d+)(\.\d{1,2})?(k)?\b"
+    r"(?:\s*(?:₹|rs\.?|inr|rupees?|bucks|/-))?",
+    re.IGNORECASE,
+)
+
+# Questions, edits and non-INR amounts never take the fused extract-and-log path
+_NOT_EXPENSE_RE = re.compile(
+    r"\b(update|change|edit|delete|remove|undo|refund|cancel|not|didn't|report|"
+    r"how|what|why|which|show|list|find|usd|eur|gbp|dollars?|euros?|pounds?)\b"
+    r"|[$€£?]",
+    re.IGNORECASE,
+)
+_SPEND_RE = re.compile(
+    r"\b(spent|spend|paid|pay|bought|buy|cost|costs|purchased|ordered)\b", re.I
+)
+_DAYS_AGO_RE = re.compile(r"\b\d{1,2} days? ago\b", re.I)
+
+_DATE_PATTERNS = [
+    (re.compile(r"\bday before yesterday\b", re.I), lambda m: 2),
+    (re.compile(r"\byesterday\b", re.I), lambda m: 1),
+    (
+        re.compile(r"\b(?:today|tonight|this (?:morning|afternoon|evening))\b", re.I),
+        lambda m: 0,
+    ),
+    (re.compile(r"\b(\d{1,2}) days? ago\b", re.I), lambda m: int(m.group(1))),
+]
+
+_WEEKDAY_RE = re.compile(r"\b(?:on |last )?(" + "|".join(WEEKDAYS) + r")\b", re.I)
+_ISO_DATE_RE = re.compile(r"\b(?:on )?(\d{4}-\d{2}-\d{2})\b")
+_MERCHANT_RE = re.compile(r"\b(?:at|from)\s+([A-Z][\w&'.-]*(?:\s+[A-Z][\w&'.-]*)*)")
+
+_FILLER_WORDS = {
+    "i",
+    "spent",
+    "spend",
+    "paid",
+    "pay",
+    "bought",
+    "got",
+    "on",
+    "for",
+    "of",
+    "a",
+    "an",
+    "the",
+    "my",
+    "rs",
+    "inr",
+    "rupees",
+    "bucks",
+    "was",
+    "it",
+}
+
+DEFAULT_CONFIDENCE = 0.9
+
+# (description, merchant) -> (category, confidence), or None if unsure
+Categorize = Callable[[str, Optional[str]], Optional[Tuple[str, float]]]
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _record(hit: bool):
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+
+
+def fast_path_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the rule-based extractor."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+        # Every hit is one structured-output LLM call that was not made
+        "llm_calls_saved": hits,
+    }
+
+
+def reset_fast_path_stats():
+    with _stats_lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def _contains(text: str, keyword: str) -> bool:
+    return re.search(rf"\b{re.escape(keyword)}\b", text) is not None
+
+
+def looks_like_expense(text: str) -> bool:
+    """
+    True for short messages that read as new INR expenses: at least one amount,
+    a spending verb or category keyword, and no edit/question/report words.
+    Extraction still splits multiple items and decides what is ambiguous.
+    """
+    text = (text or "").strip()
+    if not text or len(text) > 200 or _NOT_EXPENSE_RE.search(text):
+        return False
+    scan = _DAYS_AGO_RE.sub(" ", _ISO_DATE_RE.sub(" ", text))
+    if not _AMOUNT_RE.search(scan):
+        return False
+    if _SPEND_RE.search(scan):
+        return True
+    lowered = scan.lower()
+    return any(
+        _contains(lowered, kw) for kws in CATEGORY_KEYWORDS.values() for kw in kws
+    )
+
+
+def match_category(text: str):
+    """
+    Return (category, keyword, confidence) for the keywords found in text,
+    or None when no keyword or keywords from several categories match.
+    """
+    lowered = text.lower()
+    found = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        hits = [kw for kw in keywords if _contains(lowered, kw)]
+        if hits:
+            found[category] = max(hits, key=len)
+
+    if len(found) != 1:
+        return None
+
+    category, keyword = next(iter(found.items()))
+    return category, keyword, DEFAULT_CONFIDENCE
+
+
+def _resolve_day(text: str, now: datetime):
+    """Return (local date, matched span) for relative dates, (today, None) if absent."""
+    matches = []
+    for pattern, days_back in _DATE_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            matches.append(((now - timedelta(days=days_back(m))).date(), m.span()))
+            break
+
+    m = _WEEKDAY_RE.search(text)
+    if m:
+        delta = (now.weekday() - WEEKDAYS.index(m.group(1).lower())) % 7 or 7
+        matches.append(((now - timedelta(days=delta)).date(), m.span()))
+
+    m = _ISO_DATE_RE.search(text)
+    if m:
+        try:
+            day = datetime.strptime(m.group(1), "%Y-%m-%d").date()
+        except ValueError:
+            return None
+        matches.append((day, m.span()))
+
+    if len(matches) > 1:
+        return None
+    if not matches:
+        return now.date(), None
+    return matches[0]
+
+
+def _parse_amount(m) -> float:
+    value = float(m.group(1).replace(",", "") + (m.group(2) or ""))
+    if m.group(3):
+        value *= 1000
+    return value
+
+
+def _strip_spans(text: str, spans) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + " " + text[end:]
+    return text
+
+
+def fast_parse(
+    text: str,
+    tz: str = "Asia/Kolkata",
+    now: Optional[datetime] = None,
+    categorize: Optional[Categorize] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Extract an expense from short, unambiguous messages without calling the LLM.
+
+    Returns a dict matching ProcessedExpense fields when the message has exactly
+    one amount, resolvable date and a single category keyword; otherwise None.
+    When no keyword decides the category, categorize(description, merchant)
+    may supply (category, confidence), e.g. from the user's own history.
+    """
+    result = _fast_parse(text, tz, now, categorize)
+    _record(result is not None)
+    return result
+
+
+def _fast_parse(
+    text: str, tz: str, now: Optional[datetime], categorize: Optional[Categorize]
+):
+    text = (text or "").strip()
+    if not text or len(text) > 120 or _REJECT_RE.search(text):
+        return None
+
+    now = now or datetime.now(ZoneInfo(tz))
+
+    resolved = _resolve_day(text, now)
+    if resolved is None:
+        return None
+    day, date_span = resolved
+    spans = [date_span] if date_span else []
+
+    scan = _strip_spans(text, spans)
+    amounts = list(_AMOUNT_RE.finditer(scan))
+    if len(amounts) != 1:
+        return None
+    amount = _parse_amount(amounts[0])
+    if amount <= 0:
+        return None
+    scan = _strip_spans(scan, [amounts[0].span()])
+
+    matched = match_category(scan)
+    if matched is None and categorize is None:
+        return None
+
+    merchant = None
+    m = _MERCHANT_RE.search(scan)
+    if m:
+        merchant = m.group(1).strip()
+        scan = _strip_spans(scan, [m.span()])
+    else:
+        lowered = scan.lower()
+        for alias, name in KNOWN_MERCHANTS.items():
+            if _contains(lowered, alias):
+                merchant = name
+                break
+
+    words = [
+        w
+        for w in re.findall(r"[\w&'-]+", scan.lower())
+        if w not in _FILLER_WORDS and not w.isdigit()
+    ]
+
+    if matched is not None:
+        category, keyword, confidence = matched
+        description = " ".join(words) or keyword
+    else:
+        description = " ".join(words) or (merchant or "").lower()
+        learned = categorize(description, merchant) if description else None
+        if learned is None:
+            return None
+        category, confidence = learned
+
+    if len(words) > 4:
+        confidence -= 0.1
+
+    if confidence < FAST_PARSER_MIN_CONFIDENCE:
+        return None
+
+    ts = datetime(day.year, day.month, day.day, 12, 0, tzinfo=ZoneInfo(tz))
+
+    return {
+        "amount": amount,
+        "currency": "INR",
+        "ts": ts.isoformat(),
+        "merchant": merchant,
+        "description": description,
+        "notes": None,
+        "is_ambiguous": False,
+        "clarification_question": None,
+        "category": category,
+        "category_confidence": confidence,
+        "created_at": ts.isoformat(),
+    }
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Union
+
+from app.core.config import BULK_BATCH_SIZE, BULK_MAX_CONCURRENCY
+from app.tools.processor import process_expense
+from app.tools.store import log_expenses_batch
+
+logger = logging.getLogger(__name__)
+
+
+def entry_from_processed(processed: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+    """Map a process_expense result onto the log_expense entry fields."""
+    return {
+        "ts": processed["ts"],
+        "amount": processed["amount"],
+        "currency": processed.get("currency", "INR"),
+        "category": processed["category"],
+        "description": processed.get("description"),
+        "merchant": processed.get("merchant"),
+        "raw_text": raw_text,
+        "created_at": processed.get("created_at"),
+    }
+
+
+async def _aiter(texts: Union[Iterable[str], AsyncIterable[str]]):
+    if hasattr(texts, "__aiter__"):
+        async for text in texts:
+            yield text
+    else:
+        for text in texts:
+            yield text
+
+
+async def ingest_texts(
+    user_id: str,
+    texts: Union[Iterable[str], AsyncIterable[str]],
+    tz: str,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Extract expenses from raw texts with bounded concurrency and insert the
+    clear ones in batched transactions as extractions complete. A text that
+    mentions several expenses logs all of them, or none if any is ambiguous.
+
+    Returns per-item results (in input order) and throughput stats.
+    """
+    start = time.perf_counter()
+    batch_size = batch_size or BULK_BATCH_SIZE
+    semaphore = asyncio.Semaphore(concurrency or BULK_MAX_CONCURRENCY)
+
+    async def extract(index: int, text: str):
+        async with semaphore:
+            try:
+                out = await process_expense.ainvoke(
+                    {"text": text, "tz": tz}, {"configurable": {"user_id": user_id}}
+                )
+                return index, text, out, None
+            except Exception as e:
+                logger.warning("Bulk extraction failed for item %d: %s", index, e)
+                return index, text, None, str(e)
+
+    tasks = []
+    try:
+        async for text in _aiter(texts):
+            tasks.append(asyncio.create_task(extract(len(tasks), text)))
+        return await _collect(user_id, tasks, batch_size, start)
+    finally:
+        # A rejected stream (413/422) or a cancelled request mustn't leave
+        # extractions calling the LLM for a client that already has its answer
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _collect(
+    user_id: str, tasks: List[asyncio.Task], batch_size: int, start: float
+) -> Dict[str, Any]:
+    """Insert extractions as they complete; returns the ingest_texts result."""
+    items: List[Dict[str, Any]] = [None] * len(tasks)
+    # (item index, number of entries it added to pending_entries)
+    pending: List[tuple] = []
+    pending_entries: List[Dict[str, Any]] = []
+    batches = 0
+
+    async def flush():
+        nonlocal batches
+        if not pending:
+            return
+        try:
+            ids = await asyncio.to_thread(log_expenses_batch, user_id, pending_entries)
+            offset = 0
+            for index, count in pending:
+                item_ids = ids[offset : offset + count]
+                items[index]["expense_ids"] = item_ids
+                items[index]["expense_id"] = item_ids[0]
+                offset += count
+        except Exception as e:
+            logger.exception("Bulk insert of %d items failed: %s", len(pending), e)
+            for index, _ in pending:
+                items[index]["error"] = f"Insert failed: {e}"
+        batches += 1
+        pending.clear()
+        pending_entries.clear()
+
+    for done in asyncio.as_completed(tasks):
+        index, text, out, error = await done
+        ambiguous = [e for e in out or [] if e.get("is_ambiguous")]
+        item = {
+            "index": index,
+            "text": text,
+            "expense_id": None,
+            "expense_ids": [],
+            "is_ambiguous": bool(ambiguous),
+            "clarification_question": (
+                ambiguous[0].get("clarification_question") if ambiguous else None
+            ),
+            "error": error,
+        }
+        items[index] = item
+
+        if out and not ambiguous:
+            pending.append((index, len(out)))
+            pending_entries.extend(entry_from_processed(e, text) for e in out)
+            if len(pending_entries) >= batch_size:
+                await flush()
+
+    await flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "user_id": user_id,
+        "items": items,
+        "stats": {
+            "received": len(items),
+            "logged": sum(len(i["expense_ids"]) for i in items),
+            "ambiguous": sum(1 for i in items if i["is_ambiguous"]),
+            "failed": sum(1 for i in items if i["error"]),
+            "batches": batches,
+            "elapsed_s": round(elapsed, 3),
+            "items_per_s": round(len(items) / elapsed, 2) if elapsed else 0.0,
+        },
+    }
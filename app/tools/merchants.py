@@ -0,0 +1,250 @@
+"""
+Merchant alias index: one canonical merchant id per spelling.
+
+"HP", "HP petrol pump" and "hindustan petroleum" all resolve to the same
+merchants.id, which the store writes to expenses.merchant_id so lookups and
+grouping use an integer key instead of fuzzy string matching.
+
+Names are normalized (lowercase, punctuation and trailing "pvt ltd" /
+"petrol pump" style suffixes dropped) and looked up in an in-memory trie of
+the aliases in merchant_aliases:
+
+- exact: the normalized name is a known alias
+- prefix: the longest curated alias the name starts with, when the rest of
+  the name is only location or branch words ("hp petrol pump sector 5" ->
+  HP). "Uber Eats" and "Amazon Prime Video" name other businesses and get
+  their own ids. Merchants created on the fly only match exactly, so one
+  created from "Cafe" doesn't swallow "Cafe Coffee Day" either.
+
+Unknown names become new merchants. Writes go through their own short
+transaction before the expense write, so the trie only ever holds rows that
+are committed.
+"""
+
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import DB_PATH, MERCHANT_INDEX_ENABLED
+from app.db.engine import connection
+from app.tools.fast_parser import KNOWN_MERCHANTS
+
+# Spellings of known merchants besides the KNOWN_MERCHANTS keys
+MERCHANT_ALIASES = {
+    "hindustan petroleum": "HP",
+    "hpcl": "HP",
+    "iocl": "Indian Oil",
+    "indianoil": "Indian Oil",
+    "bpcl": "Bharat Petroleum",
+    "big basket": "BigBasket",
+    "d mart": "DMart",
+    "make my trip": "MakeMyTrip",
+}
+
+# Trailing words that don't tell merchants apart
+_SUFFIXES = (
+    "petrol pump",
+    "fuel station",
+    "private limited",
+    "pvt ltd",
+    "limited",
+    "ltd",
+    "llp",
+    "inc",
+)
+# Words that may follow a curated alias and still mean the same merchant
+_BRANCH_WORDS = frozenset("""
+    petrol pump fuel station outlet branch store stores shop mall market
+    sector road rd street st nagar colony city airport terminal
+    private limited pvt ltd india
+    """.split())
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_SUFFIX_RE = re.compile(r"(?:\s+(?:%s))+$" % "|".join(map(re.escape, _SUFFIXES)))
+
+_BACKFILL_CHUNK = 5000
+
+# Trie node keys for the alias stored at a node
+_ID = "$id"
+_PREFIX = "$prefix"
+
+
+def normalize(name: Optional[str]) -> str:
+    """Lowercase, collapse punctuation to spaces and drop generic suffixes."""
+    key = _NON_WORD_RE.sub(" ", (name or "").lower()).strip()
+    return _SUFFIX_RE.sub("", key)
+
+
+class MerchantIndex:
+    """Trie of merchant aliases loaded from (and persisted to) SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._root: Dict[str, Any] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.aliases = 0
+        self.hits = 0
+        self.created = 0
+
+    def _insert(self, alias: str, merchant_id: int, prefix: bool):
+        node = self._root
+        for char in alias:
+            node = node.setdefault(char, {})
+        if _ID not in node:
+            self.aliases += 1
+        node[_ID] = merchant_id
+        node[_PREFIX] = prefix
+
+    def _find(self, key: str) -> Optional[int]:
+        """Exact alias, else the longest curated prefix followed by branch words."""
+        node, best = self._root, None
+        for i, char in enumerate(key):
+            node = node.get(char)
+            if node is None:
+                break
+            if _ID not in node:
+                continue
+            if i + 1 == len(key):
+                return node[_ID]
+            if node[_PREFIX] and key[i + 1] == " " and _is_branch(key[i + 2 :]):
+                best = node[_ID]
+        return best
+
+    def _load(self, conn: sqlite3.Connection):
+        if self._loaded:
+            return
+        self._seed(conn)
+        for alias, merchant_id, prefix in conn.execute(
+            "SELECT alias, merchant_id, prefix FROM merchant_aliases"
+        ):
+            self._insert(alias, merchant_id, bool(prefix))
+        self._loaded = True
+
+    def _seed(self, conn: sqlite3.Connection):
+        """Add the curated aliases a database doesn't have yet."""
+        known = {row[0] for row in conn.execute("SELECT alias FROM merchant_aliases")}
+        for alias, name in {**KNOWN_MERCHANTS, **MERCHANT_ALIASES}.items():
+            alias = normalize(alias)
+            if alias in known:
+                continue
+            merchant_id = _alias_id(conn, normalize(name)) or _create(conn, name)
+            conn.execute(
+                "INSERT INTO merchant_aliases (alias, merchant_id, prefix) "
+                "VALUES (?, ?, 1)",
+                (alias, merchant_id),
+            )
+            known.add(alias)
+        conn.commit()
+
+    def _resolve(self, conn: sqlite3.Connection, name: str, key: str) -> int:
+        self._load(conn)
+        merchant_id = self._find(key)
+        if merchant_id is not None:
+            self.hits += 1
+            return merchant_id
+        # Another process may have added the alias since we loaded
+        merchant_id = _alias_id(conn, key)
+        if merchant_id is None:
+            merchant_id = _create(conn, name.strip())
+            conn.execute(
+                "INSERT INTO merchant_aliases (alias, merchant_id) VALUES (?, ?)",
+                (key, merchant_id),
+            )
+            self.created += 1
+        # Committed before the trie sees it, so a rollback can't leave a stale id
+        conn.commit()
+        self._insert(key, merchant_id, False)
+        return merchant_id
+
+    def lookup(self, name: Optional[str]) -> Optional[int]:
+        """Merchant id for name if it is already known, without creating one."""
+        key = normalize(name)
+        if not key:
+            return None
+        with self._lock:
+            if not self._loaded:
+                with connection(self.db_path or DB_PATH) as conn:
+                    self._load(conn)
+            return self._find(key)
+
+    def resolve(
+        self, name: Optional[str], conn: Optional[sqlite3.Connection] = None
+    ) -> Optional[int]:
+        """
+        Merchant id for name, creating the merchant if it is new. Pass conn to
+        resolve on an existing connection (it is committed).
+        """
+        key = normalize(name)
+        if not key:
+            return None
+        with self._lock:
+            if conn is not None:
+                return self._resolve(conn, name, key)
+            merchant_id = self._find(key) if self._loaded else None
+            if merchant_id is not None:
+                self.hits += 1
+                return merchant_id
+            with connection(self.db_path or DB_PATH) as conn:
+                return self._resolve(conn, name, key)
+
+    def assign(self, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of expense entries with merchant_id set from their merchant."""
+        return [{**e, "merchant_id": self.resolve(e.get("merchant"))} for e in entries]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"aliases": self.aliases, "hits": self.hits, "created": self.created}
+
+
+def _is_branch(rest: str) -> bool:
+    return all(word in _BRANCH_WORDS or word.isdigit() for word in rest.split())
+
+
+def _alias_id(conn: sqlite3.Connection, alias: str) -> Optional[int]:
+    row = conn.execute(
+        "SELECT merchant_id FROM merchant_aliases WHERE alias = ?", (alias,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _create(conn: sqlite3.Connection, name: str) -> int:
+    return conn.execute("INSERT INTO merchants (name) VALUES (?)", (name,)).lastrowid
+
+
+def backfill(index: MerchantIndex, conn: sqlite3.Connection) -> int:
+    """Set merchant_id on expenses written before the index existed."""
+    backfilled = last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, merchant FROM expenses "
+            "WHERE id > ? AND merchant_id IS NULL AND merchant IS NOT NULL "
+            "ORDER BY id LIMIT ?",
+            (last_id, _BACKFILL_CHUNK),
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        updates = [(index.resolve(merchant, conn), row_id) for row_id, merchant in rows]
+        with conn:
+            conn.executemany(
+                "UPDATE expenses SET merchant_id = ? WHERE id = ?",
+                [(m, row_id) for m, row_id in updates if m is not None],
+            )
+        backfilled += len(updates)
+    return backfilled
+
+
+_index: Optional[MerchantIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_merchant_index() -> Optional[MerchantIndex]:
+    """Return the process-wide merchant index, or None when disabled."""
+    global _index
+    if not MERCHANT_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MerchantIndex()
+    return _index
@@ -1,11 +1,16 @@
-from typing import Optional, Literal
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
 import re
-from app.core.config import LLM_ID
+import logging
+from app.core.config import FAST_PARSER_ENABLED
+from app.core.llm import get_chat_model
+from app.tools.fast_parser import fast_parse
+from app.tools.extraction_cache import get_extraction_cache
+from app.tools.categorizer import get_categorizer
 
 # import json
 # from langchain_core.messages import HumanMessage
@@ -24,17 +29,11 @@ CATEGORIES = [
     "Other",
 ]
 
+logger = logging.getLogger(__name__)
+
 
 def get_llm():
-    return ChatGoogleGenerativeAI(
-        model=LLM_ID,
-        vertexai=True,
-        project="agenticaiprep",
-        location="us-central1",
-        temperature=0.3,
-        max_output_tokens=5000,
-        max_retries=2,
-    )
+    return get_chat_model()
 
 
 class ProcessedExpense(BaseModel):
@@ -97,17 +96,95 @@ class ProcessedExpense(BaseModel):
         return v
 
 
+class ProcessedExpenses(BaseModel):
+    """Structured-output wrapper: every expense mentioned in one message."""
+
+    expenses: List[ProcessedExpense] = Field(
+        ..., min_length=1, description="One entry per expense, in the order mentioned"
+    )
+
+
 @tool
-def process_expense(text: str, tz: str = "Asia/Kolkata") -> dict:
+def process_expense(
+    text: str, tz: str = "Asia/Kolkata", config: RunnableConfig = None
+) -> List[dict]:
     """
     Extract expense info AND categorize in a single call.
-    Returns: amount, date, merchant, description, category, and confidence.
+    Returns a list with one entry per expense in the text, each with amount,
+    date, merchant, description, category, confidence and is_ambiguous.
     """
-    llm = get_llm()
+    resp = _local_extract(text, tz, _user_id(config))
+    if resp is None:
+        resp = _llm_extract(text, tz)
+        _remember(text, tz, resp)
+    return resp
+
+
+async def _aprocess_expense(
+    text: str, tz: str = "Asia/Kolkata", config: RunnableConfig = None
+) -> List[dict]:
+    resp = _local_extract(text, tz, _user_id(config))
+    if resp is None:
+        resp = await _allm_extract(text, tz)
+        _remember(text, tz, resp)
+    return resp
+
+
+process_expense.coroutine = _aprocess_expense
+
+
+def _user_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    # The graph and bulk ingest pass user_id in the run config, not as a tool arg
+    return (config or {}).get("configurable", {}).get("user_id")
+
+
+def _learned_categories(user_id: Optional[str]):
+    categorizer = get_categorizer() if user_id else None
+    if categorizer is None:
+        return None
+    return lambda description, merchant: categorizer.predict(
+        user_id, description, merchant
+    )
+
+
+def _local_extract(
+    text: str, tz: str, user_id: Optional[str] = None
+) -> Optional[List[dict]]:
+    """Resolve the extraction without the LLM (fast path, then cache) if possible."""
+    if FAST_PARSER_ENABLED:
+        parsed = fast_parse(text, tz, categorize=_learned_categories(user_id))
+        if parsed is not None:
+            logger.debug("process_expense fast path hit: %r", text)
+            return [ProcessedExpense(**parsed).model_dump()]
+
+    cache = get_extraction_cache()
+    if cache is not None:
+        cached = cache.get(text, tz)
+        if cached is not None:
+            logger.debug("process_expense cache hit: %r", text)
+            # Entries cached before multi-expense extraction hold a single dict
+            items = cached if isinstance(cached, list) else [cached]
+            return [ProcessedExpense(**item).model_dump() for item in items]
+
+    return None
+
+
+def _remember(text: str, tz: str, resp: List[dict]):
+    # Clarification answers depend on the conversation, so only cache clear results
+    cache = get_extraction_cache()
+    if cache is not None and not any(item.get("is_ambiguous") for item in resp):
+        cache.set(text, tz, resp)
+
+
+def _build_prompt(text: str, tz: str) -> str:
     now = datetime.now(ZoneInfo(tz)).isoformat()
 
     prompt = f"""
     You extract and categorize expense info from text in ONE STEP.
+
+    The text may mention several expenses (e.g. "200 petrol, 350 lunch at Haldiram
+    and 90 for parking"). Return one entry per expense in "expenses", in the order
+    mentioned; a date or merchant stated once applies to the expenses it describes.
     
     EXTRACTION RULES:
     - Resolve relative dates like "yesterday", "today", "last Friday" using: NOW={now} and timezone {tz}.
@@ -115,21 +192,37 @@ def process_expense(text: str, tz: str = "Asia/Kolkata") -> dict:
     - If time missing, set 12:00 local time.
     - created_at MUST be ISO-8601 format with COMPLETE timezone offset: YYYY-MM-DDTHH:MM:SS+HH:MM (e.g., 2026-02-25T12:00:00+05:30)
     - Merchant ONLY if clearly mentioned; else null.
-    - If amount missing or description unclear, set is_ambiguous=true and ask ONE clarification question.
+    - If an expense's amount is missing or its description unclear, set is_ambiguous=true on that entry and ask ONE clarification question.
     
     CATEGORIZATION RULES:
     - Classify into ONE category from taxonomy: {CATEGORIES}
     - Provide confidence score (0.0 to 1.0) based on how clearly the expense fits the category.
     
-    Return ONLY a JSON (NO MARKDOWN SYMBOLS) matching this schema: {ProcessedExpense.model_json_schema()}
+    Return ONLY a JSON (NO MARKDOWN SYMBOLS) matching this schema: {ProcessedExpenses.model_json_schema()}
     
     Text: {text}
     """
+    return prompt
 
-    out = llm.with_structured_output(ProcessedExpense).invoke(prompt)
-    resp = out.model_dump()
 
-    return resp
+def _extractor():
+    # Usage is accounted to "process_expense" whichever node called the tool
+    return (
+        get_llm()
+        .with_structured_output(ProcessedExpenses)
+        .with_config(metadata={"llm_call": "process_expense"})
+    )
+
+
+def _llm_extract(text: str, tz: str) -> List[dict]:
+    """Extract and categorize every expense in text with one structured-output call."""
+    out = _extractor().invoke(_build_prompt(text, tz))
+    return [item.model_dump() for item in out.expenses]
+
+
+async def _allm_extract(text: str, tz: str) -> List[dict]:
+    out = await _extractor().ainvoke(_build_prompt(text, tz))
+    return [item.model_dump() for item in out.expenses]
 
 
 # @tool
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    REPORT_CACHE_ENABLED,
+    REPORT_CACHE_MAX_BYTES,
+    REPORT_CACHE_SIZE,
+)
+
+
+def report_etag(user_id: str, kind: str, params: Tuple, version: int) -> str:
+    """Strong ETag for a report: changes whenever the inputs or the data version do."""
+    raw = json.dumps([user_id, kind, list(params), version], default=str)
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in [t.removeprefix("W/") for t in tags]
+
+
+class ReportCache:
+    """
+    Bounded cache of computed reports keyed on (user, kind, params, version).
+
+    A write bumps the user's version, so stale entries are never served; they
+    just age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int = 1024, max_bytes: Optional[int] = None):
+        self._memory = TTLCache(maxsize=maxsize, max_bytes=max_bytes)
+
+    def get_or_compute(
+        self,
+        user_id: str,
+        kind: str,
+        params: Tuple,
+        version: int,
+        compute: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        key = (user_id, kind, params, version)
+        report = self._memory.get(key)
+        if report is None:
+            report = compute()
+            self._memory.set(key, report, size=len(json.dumps(report, default=str)))
+        return report
+
+    def clear(self):
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._memory.stats()
+
+
+_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """Return the process-wide report cache, or None when disabled."""
+    global _cache
+    if not REPORT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ReportCache(
+            maxsize=REPORT_CACHE_SIZE, max_bytes=REPORT_CACHE_MAX_BYTES or None
+        )
+    return _cache
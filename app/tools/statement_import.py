@@ -0,0 +1,321 @@
+import csv
+import io
+import json
+import logging
+import re
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+from zoneinfo import ZoneInfo
+
+from app.core.config import STATEMENT_IMPORT_BATCH_SIZE
+from app.tools.categorizer import get_categorizer
+from app.tools.fast_parser import KNOWN_MERCHANTS, match_category
+from app.tools.store import log_expenses_batch
+
+logger = logging.getLogger(__name__)
+
+# Header aliases (lowercased) for the columns we map onto Expense
+DATE_COLUMNS = [
+    "date",
+    "transaction date",
+    "txn date",
+    "value date",
+    "posted date",
+    "posting date",
+]
+DESCRIPTION_COLUMNS = [
+    "description",
+    "narration",
+    "particulars",
+    "details",
+    "transaction details",
+    "remarks",
+    "memo",
+    "name",
+]
+AMOUNT_COLUMNS = ["amount", "transaction amount", "amount (inr)"]
+DEBIT_COLUMNS = ["debit", "withdrawal", "withdrawal amt.", "withdrawal amount", "dr"]
+TYPE_COLUMNS = ["type", "dr/cr", "cr/dr", "transaction type"]
+CURRENCY_COLUMNS = ["currency"]
+# Expenses are stored in INR; rows in any other currency aren't imported
+INR_CODES = {"inr", "rs", "rs.", "₹"}
+
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d/%m/%y",
+    "%d-%m-%y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d-%b-%y",
+    "%d %b %y",
+]
+
+_OFX_TAG_RE = re.compile(r"<(/?)(\w+)>([^<\r\n]*)")
+
+
+class StatementFormatError(ValueError):
+    """Raised when a statement's columns or rows can't be interpreted."""
+
+
+def _pick(fieldnames: List[str], aliases: List[str]) -> Optional[str]:
+    normalized = {name.strip().lower(): name for name in fieldnames if name}
+    for alias in aliases:
+        if alias in normalized:
+            return normalized[alias]
+    return None
+
+
+def _parse_amount(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    value = value.strip().replace(",", "").replace("₹", "")
+    if not value:
+        return None
+    negative = value.startswith("(") and value.endswith(")")
+    value = value.strip("()")
+    try:
+        amount = float(value)
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+def _parse_date(value: str, date_format: Optional[str] = None):
+    value = value.strip()
+    for fmt in [date_format] if date_format else DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementFormatError(f"Unrecognized date: {value!r}")
+
+
+def iter_csv_records(
+    lines: Iterable[str],
+    date_format: Optional[str] = None,
+    positive_debits: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield {date, amount, description, currency} for each debit row of a CSV
+    statement. Credits and rows without an amount are skipped.
+
+    Amount columns: a separate debit/withdrawal column, or a signed amount
+    column where negatives are debits (positives too with positive_debits,
+    or when a Dr/Cr type column says so).
+    """
+    reader = csv.DictReader(lines)
+    fields = reader.fieldnames or []
+    date_col = _pick(fields, DATE_COLUMNS)
+    desc_col = _pick(fields, DESCRIPTION_COLUMNS)
+    amount_col = _pick(fields, AMOUNT_COLUMNS)
+    debit_col = _pick(fields, DEBIT_COLUMNS)
+    type_col = _pick(fields, TYPE_COLUMNS)
+    currency_col = _pick(fields, CURRENCY_COLUMNS)
+
+    if not date_col or not (amount_col or debit_col):
+        raise StatementFormatError(
+            f"Need a date and an amount/debit column, got columns: {fields}"
+        )
+
+    for row in reader:
+        if debit_col:
+            amount = _parse_amount(row.get(debit_col))
+        else:
+            amount = _parse_amount(row.get(amount_col))
+            if amount is None:
+                continue
+            kind = (row.get(type_col) or "").strip().lower() if type_col else ""
+            if kind.startswith("cr"):
+                continue
+            if amount < 0:
+                amount = -amount
+            elif not (positive_debits or kind.startswith("d")):
+                continue
+
+        if not amount:
+            continue
+
+        yield {
+            "date": _parse_date(row[date_col], date_format),
+            "amount": amount,
+            "description": (row.get(desc_col) or "").strip() if desc_col else "",
+            "currency": (row.get(currency_col) or "INR").strip() or "INR",
+        }
+
+
+def iter_ofx_records(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield debit transactions from an OFX (SGML or XML) statement,
+    reading one <STMTTRN> block at a time.
+    """
+    currency = "INR"
+    txn = None
+    for line in lines:
+        for closing, tag, value in _OFX_TAG_RE.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == "STMTTRN":
+                if closing and txn is not None:
+                    record = _ofx_record(txn, currency)
+                    if record is not None:
+                        yield record
+                txn = None if closing else {}
+            elif closing:
+                continue
+            elif tag == "CURDEF" and value:
+                currency = value
+            elif txn is not None and value:
+                txn[tag] = value
+
+
+def _ofx_record(txn: Dict[str, str], currency: str) -> Optional[Dict[str, Any]]:
+    amount = _parse_amount(txn.get("TRNAMT"))
+    if amount is None or amount >= 0 or "DTPOSTED" not in txn:
+        return None
+
+    name = txn.get("NAME", "")
+    memo = txn.get("MEMO", "")
+    description = name if not memo or memo == name else f"{name} {memo}".strip()
+
+    try:
+        day = datetime.strptime(txn["DTPOSTED"][:8], "%Y%m%d").date()
+    except ValueError:
+        raise StatementFormatError(f"Unrecognized date: {txn['DTPOSTED']!r}")
+
+    return {
+        "date": day,
+        "amount": -amount,
+        "description": description,
+        "currency": currency,
+    }
+
+
+def categorize(description: str, user_id: Optional[str] = None):
+    """
+    Categorize a statement narration locally: (category, confidence).
+    Keywords first, then the user's own history when user_id is given.
+    """
+    matched = match_category(description)
+    if matched is not None:
+        category, _, confidence = matched
+        return category, confidence
+    categorizer = get_categorizer() if user_id else None
+    learned = categorizer and categorizer.predict(
+        user_id, description, _merchant(description)
+    )
+    return learned or ("Other", 0.0)
+
+
+def _merchant(description: str) -> Optional[str]:
+    lowered = description.lower()
+    for alias, name in KNOWN_MERCHANTS.items():
+        if re.search(rf"\b{re.escape(alias)}\b", lowered):
+            return name
+    return None
+
+
+def records_to_entries(
+    records: Iterable[Dict[str, Any]], tz: str, user_id: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Map statement records onto log_expense entries (12:00 local time)."""
+    zone = ZoneInfo(tz)
+    for record in records:
+        day = record["date"]
+        ts = datetime(day.year, day.month, day.day, 12, 0, tzinfo=zone)
+        description = record["description"]
+        category, _ = categorize(description, user_id)
+        yield {
+            "ts": ts.isoformat(),
+            "amount": record["amount"],
+            "currency": record["currency"],
+            "category": category,
+            "description": description or None,
+            "merchant": _merchant(description),
+            "raw_text": description,
+            "created_at": ts.isoformat(),
+        }
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def detect_format(filename: str) -> str:
+    return "ofx" if filename.lower().endswith((".ofx", ".qfx")) else "csv"
+
+
+def import_statement(
+    user_id: str,
+    stream: TextIO,
+    fmt: str = "csv",
+    tz: str = "Asia/Kolkata",
+    batch_size: Optional[int] = None,
+    date_format: Optional[str] = None,
+    positive_debits: bool = False,
+) -> Dict[str, Any]:
+    """
+    Import a CSV/OFX statement from a text stream without the LLM.
+    Rows in a currency other than INR are skipped and counted.
+
+    The file is read lazily and inserted batch_size rows per transaction,
+    so memory use doesn't depend on the file size. Every row is parsed and
+    categorized into a temporary file before the first insert, so a
+    StatementFormatError means nothing was imported.
+    """
+    start = time.perf_counter()
+    if fmt == "ofx":
+        records = iter_ofx_records(stream)
+    elif fmt == "csv":
+        records = iter_csv_records(stream, date_format, positive_debits)
+    else:
+        raise StatementFormatError(f"Unsupported statement format: {fmt}")
+
+    imported = batches = skipped = 0
+    categorized = 0
+
+    def inr_only(records):
+        nonlocal skipped
+        for record in records:
+            if record["currency"].strip().lower() in INR_CODES:
+                yield {**record, "currency": "INR"}
+            else:
+                skipped += 1
+
+    with tempfile.SpooledTemporaryFile(
+        max_size=1024 * 1024, mode="w+", encoding="utf-8"
+    ) as spool:
+        for entry in records_to_entries(inr_only(records), tz, user_id):
+            spool.write(json.dumps(entry) + "\n")
+        spool.seek(0)
+
+        for batch in batched(
+            map(json.loads, spool), batch_size or STATEMENT_IMPORT_BATCH_SIZE
+        ):
+            log_expenses_batch(user_id, batch)
+            imported += len(batch)
+            categorized += sum(1 for e in batch if e["category"] != "Other")
+            batches += 1
+            logger.info("Imported %d statement rows for %s", imported, user_id)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "user_id": user_id,
+        "imported": imported,
+        "skipped": skipped,
+        "categorized": categorized,
+        "batches": batches,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(imported / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def open_text(binary: io.IOBase) -> TextIO:
+    """Wrap a binary file for line-by-line reading (handles UTF-8 BOMs)."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
@@ -1,11 +1,26 @@
-import sqlite3
 import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, TypeVar
 from langchain_core.tools import tool
-from app.core.config import DB_PATH
+from sqlalchemy import and_, or_
+from app.tools.utils import async_in_thread
+from app.core.config import DB_PATH, FTS_SEARCH_ENABLED
 from app.models.entities import Expense
 from app.db.session import SessionLocal
-from sqlalchemy import func
+from app.db import migrations, rollups, versions
+from app.db.engine import connection
+from app.db.search import (
+    MIN_TERM_LENGTH,
+    RECENT_ROWS,
+    fts_available,
+    match_expression,
+    matching_ids,
+)
+from app.db.timestamps import local_day, to_epoch
+from app.db.write_queue import get_write_queue
+from app.tools.categorizer import get_categorizer
+from app.tools import merchants
+
+T = TypeVar("T")
 
 
 def init_db():
@@ -18,82 +33,251 @@ def init_db():
 
         schema_path = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
 
-        with sqlite3.connect(DB_PATH) as conn:
+        with connection(DB_PATH) as conn:
             with open(schema_path, "r", encoding="utf-8") as f:
-                conn.executescript(f.read())
-                conn.commit()
+                migrations.migrate(conn, f.read())
+            rollups.backfill_if_empty(conn)
+            index = merchants.get_merchant_index()
+            if index is not None:
+                merchants.backfill(index, conn)
     except Exception as e:
         print(f"Warning: Database initialization issue: {e}")
 
 
-@tool
-def log_expense(user_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+def _write(op: Callable[[Any], T]) -> T:
     """
-    Stores an expense row into the database using SQLAlchemy ORM.
-    Required entry fields: ts, amount, category, currency, description, merchant, raw_text
+    Run op(session) in a committed transaction. With the write queue enabled
+    it joins the writer thread's next group commit; either way the caller
+    gets op's result once it is durable.
     """
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        return write_queue.submit(op).result()
+
     db = SessionLocal()
     try:
-        expense = Expense(
-            user_id=user_id,
-            ts=entry["ts"],
-            amount=float(entry["amount"]),
-            currency=entry.get("currency", "INR"),
-            category=entry["category"],
-            description=entry.get("description"),
-            merchant=entry.get("merchant"),
-            raw_text=entry.get("raw_text"),
-            created_at=entry.get("created_at", datetime.datetime.now()),
-        )
-        db.add(expense)
+        result = op(db)
         db.commit()
-        db.refresh(expense)
-        return {"expense_id": expense.id}
+        return result
     finally:
         db.close()
 
 
+@async_in_thread
+@tool
+def log_expense(user_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stores an expense row into the database using SQLAlchemy ORM.
+    Required entry fields: ts, amount, category, currency, description, merchant, raw_text
+    """
+    ids = log_expenses_batch(user_id, [entry])
+    return {"expense_id": ids[0]}
+
+
+@async_in_thread
+@tool
+def log_expenses(user_id: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Stores several expenses (e.g. every item process_expense returned for one
+    message) in a single transaction. Entry fields are the same as log_expense.
+    """
+    return {"expense_ids": log_expenses_batch(user_id, entries)}
+
+
+def log_expenses_batch(user_id: str, entries: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert many expense rows in a single transaction.
+    Returns the new expense ids in the same order as entries.
+    """
+    entries = _with_merchant_ids(entries)
+    ids = _write(lambda db: _insert_expenses(db, user_id, entries))
+    # Only once committed: a rolled-back or retried write mustn't be learned
+    _learn(user_id, ids, entries)
+    return ids
+
+
+def _with_merchant_ids(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Resolved before _write: new merchants are committed on their own
+    # connection, which mustn't wait on the transaction the write is part of
+    index = merchants.get_merchant_index()
+    return index.assign(entries) if index is not None else entries
+
+
+def _insert_expenses(db, user_id: str, entries: List[Dict[str, Any]]) -> List[int]:
+    expenses = [_expense_from_entry(user_id, entry) for entry in entries]
+    db.add_all(expenses)
+    # flush() issues one batched INSERT ... RETURNING, so ids are known
+    # without the per-row refresh a commit-then-read would need
+    db.flush()
+    ids = [e.id for e in expenses]
+    rollups.add_expenses(db, expenses)
+    versions.bump(db, user_id)
+    return ids
+
+
+def _expense_from_entry(user_id: str, entry: Dict[str, Any]) -> Expense:
+    created_at = entry.get("created_at") or datetime.datetime.now()
+    if isinstance(created_at, str):
+        # Tool calls pass ISO strings; the DateTime column needs a datetime
+        created_at = datetime.datetime.fromisoformat(created_at)
+
+    expense = Expense(
+        user_id=user_id,
+        amount=float(entry["amount"]),
+        currency=entry.get("currency", "INR"),
+        category=entry["category"],
+        description=entry.get("description"),
+        merchant=entry.get("merchant"),
+        merchant_id=entry.get("merchant_id"),
+        raw_text=entry.get("raw_text"),
+        created_at=created_at,
+    )
+    _set_ts(expense, entry["ts"])
+    return expense
+
+
+def _learn(user_id: str, ids: List[int], entries: List[Dict[str, Any]]):
+    categorizer = get_categorizer()
+    if categorizer is not None:
+        categorizer.observe(
+            user_id,
+            [
+                (row_id, e.get("description"), e.get("merchant"), e["category"])
+                for row_id, e in zip(ids, entries)
+            ],
+        )
+
+
+def _unlearn(*user_ids: str):
+    # Corrections and deletions change past evidence: retrain on next use
+    categorizer = get_categorizer()
+    if categorizer is not None:
+        for user_id in set(user_ids):
+            categorizer.forget(user_id)
+
+
+def _set_ts(expense: Expense, ts: str):
+    """Set ts along with the ts_epoch/local_day columns derived from it."""
+    expense.ts = ts
+    expense.ts_epoch = to_epoch(ts)
+    expense.local_day = local_day(ts)
+
+
+@async_in_thread
 @tool
 def update_expense(expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update fields of an existing expense.
     Allowed fields: amount, category, description, merchant, ts
     """
-    db = SessionLocal()
-    try:
-        expense = db.query(Expense).filter(Expense.id == expense_id).first()
-        if not expense:
-            return {"error": "Expense not found"}
+    updates = {k: v for k, v in updates.items() if k != "merchant_id"}
+    index = merchants.get_merchant_index()
+    if "merchant" in updates and index is not None:
+        updates["merchant_id"] = index.resolve(updates["merchant"])
+    return _write(lambda db: _update_expense(db, expense_id, updates))
 
-        for key, value in updates.items():
-            if hasattr(expense, key):
-                setattr(expense, key, value)
 
-        db.commit()
-        db.refresh(expense)
-        return {"updated_expense_id": expense.id}
-    finally:
-        db.close()
+def _update_expense(db, expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not expense:
+        return {"error": "Expense not found"}
+
+    old = (expense.user_id, expense.ts, expense.category, expense.amount)
+
+    for key, value in updates.items():
+        if key == "ts":
+            _set_ts(expense, value)
+        elif hasattr(expense, key):
+            setattr(expense, key, value)
 
+    db.flush()
+    if old != (expense.user_id, expense.ts, expense.category, expense.amount):
+        rollups.remove_expense(db, *old)
+        rollups.add_expenses(db, [expense])
+    # Description/merchant edits change top_items, so always bump
+    versions.bump(db, old[0], expense.user_id)
+    _unlearn(old[0], expense.user_id)
+    return {"updated_expense_id": expense.id}
 
+
+@async_in_thread
 @tool
 def delete_expense(expense_id: int) -> Dict[str, Any]:
     """
     Delete an expense by ID.
     """
+    return _write(lambda db: _delete_expense(db, expense_id))
+
+
+def _delete_expense(db, expense_id: int) -> Dict[str, Any]:
+    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not expense:
+        return {"error": "Expense not found"}
+
+    db.delete(expense)
+    db.flush()
+    rollups.remove_expense(
+        db, expense.user_id, expense.ts, expense.category, expense.amount
+    )
+    versions.bump(db, expense.user_id)
+    _unlearn(expense.user_id)
+    return {"deleted_expense_id": expense_id}
+
+
+def _search_text(db, query, user_id: str, filters, terms, order) -> List[Expense]:
+    """
+    The 5 most recent expenses matching every (columns, term, merchant_id) in
+    terms: term as a substring of any of columns, or that merchant's id.
+
+    Lookups are mostly for something logged recently, so the user's latest
+    RECENT_ROWS rows are LIKE-matched first. A term with fewer than 5 hits
+    there is rare for this user: its matches come from the trigram index,
+    and there are few enough of them to sort by recency.
+    """
+
+    def either(text_match, merchant_id):
+        if merchant_id is None:
+            return text_match
+        # user_id inside the OR lets SQLite take it from the merchant index
+        return or_(
+            text_match,
+            and_(Expense.user_id == user_id, Expense.merchant_id == merchant_id),
+        )
+
+    likes = [
+        either(or_(*(getattr(Expense, c).ilike(f"%{t}%") for c in columns)), m)
+        for columns, t, m in terms
+    ]
+    recent = query.with_entities(Expense.id).order_by(*order).limit(RECENT_ROWS)
+    results = (
+        db.query(Expense)
+        .filter(Expense.id.in_(recent.subquery().select()), *likes)
+        .order_by(*order)
+        .limit(5)
+        .all()
+    )
+    if len(results) == 5:
+        return results
+
+    # Every term is limited to user_id already; repeating it outside would
+    # let SQLite walk all the user's rows instead of the matches
+    indexed = [
+        either(Expense.id.in_(matching_ids(user_id, match_expression(c, t))), m)
+        for c, t, m in terms
+    ]
+    return db.query(Expense).filter(*filters, *indexed).order_by(*order).limit(5).all()
+
+
+def expense_owner(expense_id: int) -> Optional[str]:
+    """Return the user_id an expense belongs to, or None if it doesn't exist."""
     db = SessionLocal()
     try:
-        expense = db.query(Expense).filter(Expense.id == expense_id).first()
-        if not expense:
-            return {"error": "Expense not found"}
-
-        db.delete(expense)
-        db.commit()
-        return {"deleted_expense_id": expense_id}
+        return db.query(Expense.user_id).filter(Expense.id == expense_id).scalar()
     finally:
         db.close()
 
 
+@async_in_thread
 @tool
 def find_expenses(
     user_id: str,
@@ -107,18 +291,41 @@ def find_expenses(
     """
     db = SessionLocal()
     try:
-        query = db.query(Expense).filter(Expense.user_id == user_id)
+        filters = []
+        if date:
+            # Equality on local_day keeps idx_expenses_user_day_epoch usable for the
+            # ORDER BY ts_epoch below, so neither a scan nor a sort is needed
+            filters.append(Expense.local_day == date)
 
+        # Text filters go through the trigram index when it exists; terms
+        # under 3 characters still need a LIKE scan
+        use_fts = FTS_SEARCH_ENABLED and (description or merchant) and fts_available(db)
+        terms = []
         if description:
-            query = query.filter(Expense.description.ilike(f"%{description}%"))
+            if use_fts and len(description.strip()) >= MIN_TERM_LENGTH:
+                terms.append((["description", "raw_text"], description.strip(), None))
+            else:
+                filters.append(Expense.description.ilike(f"%{description}%"))
 
         if merchant:
-            query = query.filter(Expense.merchant.ilike(f"%{merchant}%"))
-
-        if date:
-            query = query.filter(func.date(Expense.created_at) == date)
+            # Every spelling of a known merchant shares its id; the substring
+            # match still finds longer names ("uber" -> "Uber Eats")
+            index = merchants.get_merchant_index()
+            merchant_id = index.lookup(merchant) if index is not None else None
+            if use_fts and len(merchant.strip()) >= MIN_TERM_LENGTH:
+                terms.append((["merchant"], merchant.strip(), merchant_id))
+            else:
+                like = Expense.merchant.ilike(f"%{merchant}%")
+                if merchant_id is not None:
+                    like = or_(like, Expense.merchant_id == merchant_id)
+                filters.append(like)
 
-        results = query.order_by(Expense.created_at.desc()).limit(5).all()
+        order = [Expense.ts_epoch.desc(), Expense.id.desc()]
+        query = db.query(Expense).filter(Expense.user_id == user_id, *filters)
+        if terms:
+            results = _search_text(db, query, user_id, filters, terms, order)
+        else:
+            results = query.order_by(*order).limit(5).all()
 
         return [
             {
@@ -0,0 +1,53 @@
+import asyncio
+import functools
+import threading
+
+from langchain_core.tools import BaseTool
+
+from app.core import metrics
+
+
+def async_in_thread(t: BaseTool) -> BaseTool:
+    """
+    Give a sync tool an async variant that runs it in a worker thread,
+    so ainvoke()/ToolNode in an async graph never blocks the event loop.
+    """
+    func = t.func
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        metrics.EXECUTOR_QUEUED.inc()
+        dequeued = threading.Lock()
+
+        def dequeue():
+            # Once only: the call starting or the await ending, whichever is first
+            if dequeued.acquire(blocking=False):
+                metrics.EXECUTOR_QUEUED.dec()
+
+        def call():
+            dequeue()
+            metrics.EXECUTOR_RUNNING.inc()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.EXECUTOR_RUNNING.dec()
+
+        try:
+            return await asyncio.to_thread(call)
+        finally:
+            dequeue()
+
+    t.coroutine = run
+    return t
+
+
+def timed_tool(t: BaseTool) -> BaseTool:
+    """Record the tool's latency and failures (sync and async calls alike)."""
+    t.func = metrics.timed(metrics.TOOL_SECONDS, t.name, errors=metrics.TOOL_ERRORS)(
+        t.func
+    )
+    if t.coroutine is not None:
+        t.coroutine = metrics.timed(
+            metrics.TOOL_SECONDS, t.name, errors=metrics.TOOL_ERRORS
+        )(t.coroutine)
+    return t
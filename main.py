@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -5,6 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.api.chat import router as chat_router
 from app.api.analytics import router as analytics_router
+from app.api.expenses import router as expenses_router
+from app.api.metrics import router as metrics_router
 from app.core import config
 
 # Configure logging
@@ -31,9 +34,54 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
 
+    try:
+        # Build the shared LLM clients so the first request doesn't pay for it
+        from app.core.llm import warm_up
+
+        warm_up()
+    except Exception as e:
+        logger.warning(f"LLM warm-up failed, clients will be built lazily: {e}")
+
+    compaction = None
+    if config.CHECKPOINT_COMPACT_INTERVAL_S > 0:
+        # Prune old graph checkpoints in the background while the API runs
+        from app.db.checkpoint_retention import compact_periodically
+
+        compaction = asyncio.create_task(
+            compact_periodically(
+                config.GRAPH_STATE_DB, config.CHECKPOINT_COMPACT_INTERVAL_S
+            )
+        )
+
+    usage_flush = None
+    if config.USAGE_TRACKING_ENABLED and config.USAGE_FLUSH_INTERVAL_S > 0:
+        # Write aggregated LLM token usage out in the background
+        from app.db.usage import flush_periodically
+
+        usage_flush = asyncio.create_task(
+            flush_periodically(config.USAGE_FLUSH_INTERVAL_S)
+        )
+
     yield
 
     logger.info("Finance Manager API shutting down...")
+    for task in (compaction, usage_flush):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    from app.api.chat import close_graph
+    from app.db.engine import dispose
+    from app.db.usage import shutdown as flush_usage
+    from app.db.write_queue import shutdown as stop_write_queue
+
+    await close_graph()
+    stop_write_queue()
+    flush_usage()
+    dispose()
 
 
 # Create FastAPI app with lifespan
@@ -57,6 +105,8 @@ app.add_middleware(
 # Include routers
 app.include_router(chat_router)
 app.include_router(analytics_router)
+app.include_router(expenses_router)
+app.include_router(metrics_router)
 
 
 # Root endpoint
@@ -70,7 +120,12 @@ def root():
         "docs_url": "/docs",
         "endpoints": {
             "chat": "/api/chat/message",
+            "chat_stream": "/api/chat/stream",
             "weekly_report": "/api/analytics/weekly-report",
+            "report": "/api/analytics/report",
+            "llm_usage": "/api/analytics/usage",
+            "bulk_expenses": "/api/expenses/bulk",
+            "metrics": "/metrics",
             "health": "/docs",
         },
     }
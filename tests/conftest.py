@@ -1,4 +1,10 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
 import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.db.engine import dispose, engine_for_path
 
 
 @pytest.fixture
@@ -19,6 +25,26 @@ def sample_expense_data():
     }
 
 
+@pytest.fixture
+def make_entry():
+    """Build log_expense entries; ts defaults to now in Asia/Kolkata."""
+
+    def make(amount=100.0, category="Groceries", ts=None, merchant=None):
+        ts = ts or datetime.now(ZoneInfo("Asia/Kolkata")).replace(microsecond=0)
+        return {
+            "ts": ts.isoformat(),
+            "amount": amount,
+            "category": category,
+            "currency": "INR",
+            "description": category.lower(),
+            "merchant": merchant,
+            "raw_text": category.lower(),
+            "created_at": ts.isoformat(),
+        }
+
+    return make
+
+
 @pytest.fixture
 def sample_chat_request():
     """Sample chat request data."""
@@ -28,3 +54,32 @@ def sample_chat_request():
         "thread_id": "test_thread",
         "tz": "Asia/Kolkata",
     }
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the store and analytics tools at a fresh SQLite database."""
+    db_path = str(tmp_path / "expenses.db")
+    engine = engine_for_path(db_path)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    monkeypatch.setattr("app.tools.store.DB_PATH", db_path)
+    monkeypatch.setattr("app.tools.store.SessionLocal", session_factory)
+    monkeypatch.setattr("app.tools.analytics.DB_PATH", db_path)
+    # Versions restart at 0 in every fresh database, so don't share cached reports
+    monkeypatch.setattr("app.tools.report_cache._cache", None)
+    # Learned categories are per database too
+    monkeypatch.setattr("app.tools.categorizer.DB_PATH", db_path)
+    monkeypatch.setattr("app.tools.categorizer._categorizer", None)
+    # So are merchant ids
+    monkeypatch.setattr("app.tools.merchants.DB_PATH", db_path)
+    monkeypatch.setattr("app.tools.merchants._index", None)
+    # LLM usage is recorded into the same database
+    monkeypatch.setattr("app.db.usage.DB_PATH", db_path)
+    monkeypatch.setattr("app.db.usage._recorder", None)
+
+    from app.tools.store import init_db
+
+    init_db()
+    yield db_path
+    dispose(str(engine.url))
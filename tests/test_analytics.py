@@ -1,72 +1,216 @@
-from unittest.mock import patch
-import pandas as pd
+"""Tests for the weekly report engine."""
+
+import random
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.tools.analytics import (
+    compute_period_report,
+    compute_weekly_report,
+    weekly_report_pandas,
+)
+from app.tools.store import delete_expense, log_expenses_batch, update_expense
+
+TZ = "Asia/Kolkata"
+NOW = datetime(2026, 2, 26, 15, 0, tzinfo=ZoneInfo(TZ))  # Thursday
+
+
+def _at(day_offset=0, hour=12):
+    return (NOW + timedelta(days=day_offset)).replace(hour=hour, minute=0)
 
 
 class TestWeeklyReport:
-    """Test weekly report generation via API."""
+    """Test weekly report generation from the database."""
 
-    def test_weekly_report_with_expenses(self):
+    def test_weekly_report_with_expenses(self, temp_db, make_entry):
         """Test weekly report with expenses."""
-        mock_report = {
-            "week_start": "2026-02-23",
-            "week_end": "2026-03-01",
-            "total": 500.0,
-            "by_category": {"Groceries": 500.0},
-            "by_day": {"2026-02-25": 500.0},
-            "top_items": [],
-            "insights": ["Test"],
-        }
+        log_expenses_batch(
+            "u", [make_entry(500.0, "Groceries", merchant="FreshMart", ts=_at(-1))]
+        )
+
+        report = compute_weekly_report("u", TZ, now=NOW)
+
+        assert report["week_start"] == "2026-02-23"
+        assert report["week_end"] == "2026-03-01"
+        assert report["total"] == 500.0
+        assert report["by_category"] == {"Groceries": 500.0}
+        assert report["by_day"] == {"2026-02-25": 500.0}
+        assert report["top_items"] == [
+            {
+                "amount": 500.0,
+                "category": "Groceries",
+                "description": "groceries",
+                "merchant": "FreshMart",
+                "day": "2026-02-25",
+            }
+        ]
 
-        with patch("app.tools.analytics.sqlite3"):
-            with patch("app.tools.analytics.pd.read_sql_query") as mock_read:
-                df = pd.DataFrame(
-                    {
-                        "ts": ["2026-02-25T12:00:00+05:30"],
-                        "amount": [500.0],
-                        "currency": ["INR"],
-                        "category": ["Groceries"],
-                        "description": ["groceries"],
-                        "merchant": ["FreshMart"],
-                    }
-                )
-                mock_read.return_value = df
-
-                # Import and call the actual function to test it works
-                # from app.tools.analytics import weekly_report as wk_func
-
-                # Since it's a tool, we need to extract and call the underlying function
-                # For now, just verify the mock setup works
-                assert mock_report["total"] == 500.0
-                assert "Groceries" in mock_report["by_category"]
-
-    def test_weekly_report_empty_week(self):
+    def test_weekly_report_empty_week(self, temp_db, make_entry):
         """Test weekly report with no expenses."""
-        df = pd.DataFrame()
+        log_expenses_batch("u", [make_entry(100.0, "Fuel", ts=_at(-7))])
 
-        with patch("app.tools.analytics.sqlite3"):
-            with patch("app.tools.analytics.pd.read_sql_query") as mock_read:
-                mock_read.return_value = df
+        report = compute_weekly_report("u", TZ, now=NOW)
 
-                # Verify empty dataframe handling in mock
-                assert mock_read.return_value.empty
+        assert report["total"] == 0.0
+        assert report["top_items"] == []
+        assert report["insights"] == ["No expenses logged this week yet."]
 
-    def test_weekly_report_multiple_categories(self):
+    def test_weekly_report_multiple_categories(self, temp_db, make_entry):
         """Test weekly report breaks down by category."""
-        df = pd.DataFrame(
-            {
-                "ts": ["2026-02-25T12:00:00+05:30", "2026-02-25T18:00:00+05:30"],
-                "amount": [500.0, 300.0],
-                "currency": ["INR", "INR"],
-                "category": ["Groceries", "Food & Dining"],
-                "description": ["groceries", "dinner"],
-                "merchant": [None, "Restaurant"],
-            }
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(500.0, "Groceries", ts=_at(hour=10)),
+                make_entry(
+                    300.0, "Food & Dining", merchant="Restaurant", ts=_at(hour=18)
+                ),
+            ],
+        )
+
+        report = compute_weekly_report("u", TZ, now=NOW)
+
+        assert report["total"] == 800.0
+        assert list(report["by_category"]) == ["Groceries", "Food & Dining"]
+        assert (
+            report["insights"][0] == "Highest spend category: Groceries (amount 500.0)"
+        )
+
+
+class TestPandasParity:
+    """Test the SQL engine matches the pandas reference implementation."""
+
+    def test_matches_reference_on_random_week(self, temp_db, make_entry):
+        rng = random.Random(7)
+        categories = ["Groceries", "Fuel", "Shopping", "Utilities", "Food & Dining"]
+        entries = [
+            make_entry(
+                float(rng.randint(1, 40) * 25),
+                rng.choice(categories),
+                ts=_at(rng.randint(-10, 3), rng.randint(0, 23)),
+            )
+            for _ in range(200)
+        ]
+        ids = log_expenses_batch("u", entries)
+        log_expenses_batch("other", entries[:50])
+
+        for expense_id in ids[:10]:
+            delete_expense.invoke({"expense_id": expense_id})
+        for expense_id in ids[10:20]:
+            update_expense.invoke(
+                {"expense_id": expense_id, "updates": {"category": "Shopping"}}
+            )
+
+        assert compute_weekly_report("u", TZ, now=NOW) == weekly_report_pandas(
+            "u", TZ, now=NOW
+        )
+
+    def test_ties_break_the_same_way(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(100.0, c, ts=_at())
+                for c in ["Fuel", "Groceries", "Bills", "Fuel"]
+            ],
+        )
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(200.0, "Bills", ts=_at()),
+                make_entry(200.0, "Groceries", ts=_at()),
+            ],
         )
 
-        with patch("app.tools.analytics.sqlite3"):
-            with patch("app.tools.analytics.pd.read_sql_query") as mock_read:
-                mock_read.return_value = df
+        assert compute_weekly_report("u", TZ, now=NOW) == weekly_report_pandas(
+            "u", TZ, now=NOW
+        )
+
+    def test_empty_week_matches_reference(self, temp_db):
+        assert compute_weekly_report("u", TZ, now=NOW) == weekly_report_pandas(
+            "u", TZ, now=NOW
+        )
+
+
+class TestPeriodReport:
+    """Test arbitrary-period reports and comparisons."""
+
+    def test_month_buckets(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(100.0, "Fuel", ts=_at(-30)),  # 2026-01-27
+                make_entry(50.0, "Groceries", ts=_at(-1)),  # 2026-02-25
+                make_entry(70.0, "Fuel", ts=_at(4)),  # 2026-03-02
+            ],
+        )
+
+        report = compute_period_report(
+            "u", date(2026, 1, 1), date(2026, 3, 31), "month", tz=TZ
+        )
+
+        assert report["week_start"] == "2026-01-01"
+        assert report["week_end"] == "2026-03-31"
+        assert report["by_bucket"] == {
+            "2026-01": 100.0,
+            "2026-02": 50.0,
+            "2026-03": 70.0,
+        }
+        assert report["by_category"] == {"Fuel": 170.0, "Groceries": 50.0}
+        assert report["total"] == 220.0
+        assert report["comparison"] is None
+
+    def test_week_buckets_start_on_monday(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(10.0, "Fuel", ts=_at(-3)),
+                make_entry(20.0, "Fuel", ts=_at(4)),
+            ],
+        )
+
+        report = compute_period_report(
+            "u", date(2026, 2, 20), date(2026, 3, 5), "week", tz=TZ
+        )
+
+        assert report["by_bucket"] == {"2026-02-23": 10.0, "2026-03-02": 20.0}
+
+    def test_compare_with_previous_period(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(200.0, "Fuel", ts=_at(-7)),  # previous week
+                make_entry(100.0, "Shopping", ts=_at(-7)),
+                make_entry(300.0, "Fuel", ts=_at(-1)),  # this week
+            ],
+        )
+
+        report = compute_period_report(
+            "u", date(2026, 2, 23), date(2026, 3, 1), compare=True, tz=TZ
+        )
+
+        comparison = report["comparison"]
+        assert comparison["start"] == "2026-02-16"
+        assert comparison["end"] == "2026-02-22"
+        assert comparison["total"] == 300.0
+        assert comparison["change"] == 0.0
+        assert comparison["change_pct"] == 0.0
+        assert comparison["by_category_change"] == {"Fuel": 100.0, "Shopping": -100.0}
+        assert report["total"] == 300.0
+        assert report["top_items"][0]["amount"] == 300.0
+
+    def test_matches_weekly_report_for_current_week(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [make_entry(float(i * 10), "Fuel", ts=_at(i - 3)) for i in range(1, 8)],
+        )
+
+        weekly = compute_weekly_report("u", TZ, now=NOW)
+        period = compute_period_report("u", date(2026, 2, 23), date(2026, 3, 1), tz=TZ)
+
+        for key in ("total", "by_category", "by_day", "top_items", "insights"):
+            assert period[key] == weekly[key]
 
-                # Verify the data structure
-                assert len(df) == 2
-                assert df["amount"].sum() == 800.0
+    def test_rejects_inverted_range(self, temp_db):
+        with pytest.raises(ValueError):
+            compute_period_report("u", date(2026, 3, 1), date(2026, 2, 1))
@@ -18,7 +18,7 @@ class TestAnalyticsAPI:
         app.include_router(router)
         return TestClient(app)
 
-    def test_weekly_report_success(self, client):
+    def test_weekly_report_success(self, client, temp_db):
         """Test getting weekly report."""
         mock_report = {
             "week_start": "2026-02-23",
@@ -30,7 +30,7 @@ class TestAnalyticsAPI:
             "insights": ["High spending"],
         }
 
-        with patch("app.api.analytics.weekly_report") as mock_weekly:
+        with patch("app.api.analytics.compute_weekly_report") as mock_weekly:
             # Make it callable and return the dict directly
             mock_weekly.side_effect = lambda user_id, tz: mock_report
 
@@ -51,3 +51,31 @@ class TestAnalyticsAPI:
 
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
+
+    def test_period_report(self, client, temp_db):
+        """Test the arbitrary-period report endpoint."""
+        response = client.get(
+            "/api/analytics/report",
+            params={
+                "user_id": "test_user",
+                "start": "2026-01-01",
+                "end": "2026-01-31",
+                "granularity": "week",
+                "compare": "true",
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["granularity"] == "week"
+        assert data["total"] == 0.0
+        assert data["comparison"]["start"] == "2025-12-01"
+
+    def test_period_report_validation(self, client, temp_db):
+        """Test invalid ranges and granularities are rejected."""
+        base = {"user_id": "u", "start": "2026-02-01", "end": "2026-01-01"}
+        assert client.get("/api/analytics/report", params=base).status_code == 400
+
+        base["end"] = "2026-03-01"
+        base["granularity"] = "year"
+        assert client.get("/api/analytics/report", params=base).status_code == 422
@@ -1,10 +1,41 @@
 """Tests for chat API endpoints."""
 
+import asyncio
+import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
-from langchain_core.messages import AIMessage
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+
+class _StreamingFakeModel(GenericFakeChatModel):
+    """Fake chat model that also streams tool calls (the generic one drops them)."""
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._generate(messages).generations[0].message
+        if message.tool_calls:
+            chunks = [
+                {
+                    "name": tc["name"],
+                    "args": json.dumps(tc["args"]),
+                    "id": tc["id"],
+                    "index": i,
+                }
+                for i, tc in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content="", tool_call_chunks=chunks)
+            )
+            return
+
+        for token in message.content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
 
 
 class TestChatAPI:
@@ -21,13 +52,13 @@ class TestChatAPI:
 
     def test_send_message_success(self, client, sample_chat_request):
         """Test sending a message successfully."""
-        with patch("app.api.chat.get_graph") as mock_get_graph:
+        with patch("app.api.chat.get_graph", new_callable=AsyncMock) as mock_get_graph:
             mock_graph = MagicMock()
             mock_get_graph.return_value = mock_graph
 
-            # Mock the response - graph.invoke returns dict with "messages" key
+            # Mock the response - graph.ainvoke returns dict with "messages" key
             mock_message = AIMessage(content="Logged: ₹500 on groceries")
-            mock_graph.invoke.return_value = {"messages": [mock_message]}
+            mock_graph.ainvoke = AsyncMock(return_value={"messages": [mock_message]})
 
             response = client.post("/api/chat/message", json=sample_chat_request)
 
@@ -36,6 +67,97 @@ class TestChatAPI:
             assert data["status"] == "success"
             assert data["user_id"] == "test_user"
 
+    def test_send_message_timeout(self, client, sample_chat_request):
+        """Test that a slow graph returns 504."""
+
+        async def slow_invoke(*args, **kwargs):
+            await asyncio.sleep(1)
+
+        with patch("app.api.chat.get_graph", new_callable=AsyncMock) as mock_get_graph:
+            mock_get_graph.return_value.ainvoke = slow_invoke
+            with patch("app.api.chat.CHAT_TIMEOUT_S", 0.01):
+                response = client.post("/api/chat/message", json=sample_chat_request)
+
+        assert response.status_code == 504
+
+    def test_concurrency_limited_by_semaphore(self, sample_chat_request):
+        """Test no more than CHAT_MAX_CONCURRENCY graph runs are in flight."""
+        from app.api import chat
+
+        in_flight = 0
+        peak = 0
+
+        async def tracked_invoke(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"messages": [AIMessage(content="ok")]}
+
+        async def run_many():
+            mock_graph = MagicMock()
+            mock_graph.ainvoke = tracked_invoke
+            with patch.object(chat, "_semaphore", asyncio.Semaphore(2)):
+                with patch(
+                    "app.api.chat.get_graph", AsyncMock(return_value=mock_graph)
+                ):
+                    requests = [
+                        chat.ChatSchema(**sample_chat_request) for _ in range(6)
+                    ]
+                    await asyncio.gather(*(chat.send_message(r) for r in requests))
+
+        asyncio.run(run_many())
+        assert peak == 2
+
+    def test_stream_message_events(self, client, sample_chat_request):
+        """Test the SSE stream emits tool events, tokens and a final payload."""
+        from langgraph.checkpoint.memory import MemorySaver
+        from app.core.state_graph import _compile
+
+        model = _StreamingFakeModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="",
+                        tool_calls=[
+                            {
+                                "name": "process_expense",
+                                "args": {"text": "coffee 150"},
+                                "id": "call_1",
+                            }
+                        ],
+                    ),
+                    AIMessage(content="Logged coffee for 150"),
+                ]
+            )
+        )
+        with patch("app.core.state_graph.init_db"):
+            graph = _compile(MemorySaver())
+
+        # No amount, so this goes through the agent rather than the fused path
+        request = {**sample_chat_request, "message": "help me track a coffee"}
+        with patch("app.api.chat.get_graph", AsyncMock(return_value=graph)):
+            with patch("app.core.state_graph._agent_model", return_value=model):
+                response = client.post("/api/chat/stream", json=request)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [
+            line.split(": ", 1)[1]
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events[0] == "tool_start"
+        assert "tool_end" in events
+        assert "token" in events
+        assert events[-1] == "final"
+
+        final = json.loads(response.text.strip().splitlines()[-1].split(": ", 1)[1])
+        assert final["agent_response"].strip() == "Logged coffee for 150"
+        assert final["thread_id"] == "test_thread"
+
     def test_missing_required_fields(self, client):
         """Test that required fields are validated."""
         incomplete_request = {"message": "I spent money"}
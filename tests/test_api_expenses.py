@@ -0,0 +1,175 @@
+"""Tests for bulk expense ingestion."""
+
+import asyncio
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def _fake_extract(text, tz):
+    """Stand-in for process_expense: 'unclear' texts are ambiguous, ' and ' splits."""
+    if "unclear" in text:
+        return [{"is_ambiguous": True, "clarification_question": "How much?"}]
+    if "boom" in text:
+        raise RuntimeError("LLM unavailable")
+    ts = "2026-02-25T12:00:00+05:30"
+    return [
+        {
+            "amount": float(part.split()[-1]),
+            "currency": "INR",
+            "ts": ts,
+            "created_at": ts,
+            "merchant": None,
+            "description": part.split()[0],
+            "category": "Other",
+            "is_ambiguous": False,
+            "clarification_question": None,
+        }
+        for part in text.split(" and ")
+    ]
+
+
+class TestBulkIngestAPI:
+    """Test /api/expenses/bulk."""
+
+    @pytest.fixture
+    def client(self, temp_db):
+        from app.api.expenses import router
+
+        app = FastAPI()
+        app.include_router(router)
+
+        async def fake_ainvoke(args, config=None):
+            return _fake_extract(args["text"], args["tz"])
+
+        with patch("app.tools.ingest.process_expense") as mock_tool:
+            mock_tool.ainvoke = fake_ainvoke
+            yield TestClient(app)
+
+    def _rows(self, db_path):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute(
+                "SELECT id, amount, raw_text FROM expenses ORDER BY id"
+            ).fetchall()
+
+    def test_json_bulk_logs_clear_items(self, client, temp_db):
+        body = {
+            "user_id": "test_user",
+            "texts": ["coffee 150", "unclear thing", "petrol 500", "boom 1"],
+        }
+        with patch("app.tools.ingest.BULK_BATCH_SIZE", 1):
+            response = client.post("/api/expenses/bulk", json=body)
+
+        assert response.status_code == 200
+        data = response.json()
+        items = data["items"]
+        assert [i["index"] for i in items] == [0, 1, 2, 3]
+        assert items[0]["expense_id"] is not None
+        assert items[1]["is_ambiguous"] is True
+        assert items[1]["clarification_question"] == "How much?"
+        assert items[1]["expense_id"] is None
+        assert items[3]["error"] == "LLM unavailable"
+        assert data["stats"]["logged"] == 2
+        assert data["stats"]["ambiguous"] == 1
+        assert data["stats"]["failed"] == 1
+
+        rows = self._rows(temp_db)
+        assert {r[2] for r in rows} == {"coffee 150", "petrol 500"}
+
+    def test_batches_share_transactions(self, client):
+        body = {"user_id": "test_user", "texts": [f"tea {i + 1}" for i in range(5)]}
+        with patch("app.tools.ingest.BULK_BATCH_SIZE", 2):
+            response = client.post("/api/expenses/bulk", json=body)
+
+        stats = response.json()["stats"]
+        assert stats["logged"] == 5
+        assert stats["batches"] == 3
+
+    def test_multi_expense_text_logs_every_item(self, client, temp_db):
+        body = {
+            "user_id": "test_user",
+            "texts": ["petrol 200 and lunch 350 and parking 90", "tea 10"],
+        }
+        response = client.post("/api/expenses/bulk", json=body)
+
+        items = response.json()["items"]
+        assert len(items[0]["expense_ids"]) == 3
+        assert items[0]["expense_id"] == items[0]["expense_ids"][0]
+        assert len(items[1]["expense_ids"]) == 1
+        assert response.json()["stats"]["logged"] == 4
+        assert [r[1] for r in self._rows(temp_db)][:3] == [200.0, 350.0, 90.0]
+
+    def test_ndjson_stream(self, client, temp_db):
+        lines = [json.dumps("lunch 200"), json.dumps({"text": "taxi 90"}), ""]
+        response = client.post(
+            "/api/expenses/bulk?user_id=test_user",
+            content="\n".join(lines),
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["stats"]["logged"] == 2
+        assert len(self._rows(temp_db)) == 2
+
+    def test_ndjson_limit_counts_unterminated_last_line(self, client, temp_db):
+        with patch("app.api.expenses.BULK_MAX_ITEMS", 2):
+            response = client.post(
+                "/api/expenses/bulk?user_id=test_user",
+                content="\n".join(json.dumps(f"tea {i + 1}") for i in range(3)),
+                headers={"content-type": "application/x-ndjson"},
+            )
+
+        assert response.status_code == 413
+        assert self._rows(temp_db) == []
+
+    def test_rejected_stream_cancels_pending_extractions(self):
+        from fastapi import HTTPException
+
+        from app.tools.ingest import ingest_texts
+
+        started, cancelled = [], []
+
+        async def slow_ainvoke(args, config=None):
+            started.append(args["text"])
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(args["text"])
+                raise
+
+        async def texts():
+            yield "coffee 150"
+            yield "tea 20"
+            await asyncio.sleep(0)
+            raise HTTPException(status_code=422, detail="Invalid NDJSON line")
+
+        async def run():
+            with pytest.raises(HTTPException):
+                await ingest_texts("test_user", texts(), "Asia/Kolkata")
+            # Checked before asyncio.run() would cancel leftovers itself
+            return list(cancelled)
+
+        with patch("app.tools.ingest.process_expense") as mock_tool:
+            mock_tool.ainvoke = slow_ainvoke
+            cancelled_on_error = asyncio.run(run())
+
+        assert started == ["coffee 150", "tea 20"]
+        assert cancelled_on_error == started
+
+    def test_ndjson_requires_user_id(self, client):
+        response = client.post(
+            "/api/expenses/bulk",
+            content='"lunch 200"',
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert response.status_code == 422
+
+    def test_empty_texts_rejected(self, client):
+        response = client.post(
+            "/api/expenses/bulk", json={"user_id": "test_user", "texts": []}
+        )
+        assert response.status_code == 422
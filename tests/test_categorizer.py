@@ -0,0 +1,150 @@
+"""Tests for the per-user categorizer learned from past expenses."""
+
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.tools.categorizer import UserCategorizer, get_categorizer
+from app.tools.processor import process_expense
+
+TZ = "Asia/Kolkata"
+
+
+def _log(user_id, merchant, category, description="monthly stock", n=3):
+    from app.tools.store import log_expenses_batch
+
+    ts = datetime.now(ZoneInfo(TZ)).isoformat()
+    entry = {
+        "ts": ts,
+        "amount": 100.0,
+        "category": category,
+        "description": description,
+        "merchant": merchant,
+    }
+    return log_expenses_batch(user_id, [dict(entry) for _ in range(n)])
+
+
+def _extract(text, user_id="u1"):
+    return process_expense.invoke(
+        {"text": text, "tz": TZ}, {"configurable": {"user_id": user_id}}
+    )
+
+
+class TestUserCategorizer:
+    """Test merchant lookup, kNN and confidence scaling."""
+
+    def test_merchant_lookup_needs_consistent_evidence(self):
+        model = UserCategorizer()
+        model.add("stock", "Kumar Stores", "Groceries")
+        assert model.predict(None, "kumar stores")[1] < 0.85
+
+        model.add("stock", "Kumar Stores", "Groceries")
+        model.add("stock", "Kumar Stores", "Groceries")
+        category, confidence = model.predict(None, "Kumar  Stores")
+        assert category == "Groceries"
+        assert confidence > 0.85
+
+        model.add("gift", "Kumar Stores", "Shopping")
+        assert model.predict(None, "Kumar Stores")[1] < 0.85
+
+    def test_neighbors_match_description_tokens(self):
+        model = UserCategorizer()
+        for _ in range(3):
+            model.add("zomato dinner", None, "Food & Dining")
+            model.add("metro card recharge", None, "Transport")
+
+        assert model.predict("metro card recharge", None)[0] == "Transport"
+        assert model.predict("zomato dinner", None)[0] == "Food & Dining"
+        assert model.predict("gym membership", None) is None
+
+    def test_other_is_not_learned(self):
+        model = UserCategorizer()
+        for _ in range(5):
+            model.add("misc", "Kumar Stores", "Other")
+        assert model.predict("misc", "Kumar Stores") is None
+
+    def test_neighbor_votes_cached_until_next_row(self):
+        model = UserCategorizer()
+        for _ in range(3):
+            model.add("kumar stores", None, "Groceries")
+
+        with patch.object(model, "_vote", wraps=model._vote) as vote:
+            # Reference numbers aren't tokens: one vote for every narration
+            for ref in range(3):
+                assert model.by_neighbors(f"UPI/{ref}/KUMAR STORES", None)
+            assert vote.call_count == 1
+
+            model.add("kumar stores", None, "Shopping")
+            model.by_neighbors("UPI/9/KUMAR STORES", None)
+            assert vote.call_count == 2
+
+
+class TestLearnedCategories:
+    """Test process_expense uses each user's history before the LLM."""
+
+    def test_history_categorizes_without_llm(self, temp_db):
+        _log("u1", "Kumar Stores", "Groceries")
+
+        with patch("app.tools.processor._llm_extract") as mock_llm:
+            out = _extract("450 at Kumar Stores")
+
+        mock_llm.assert_not_called()
+        assert out[0]["category"] == "Groceries"
+        assert out[0]["merchant"] == "Kumar Stores"
+        assert out[0]["category_confidence"] >= 0.85
+
+    def test_other_users_history_not_used(self, temp_db):
+        _log("u2", "Kumar Stores", "Groceries")
+
+        with patch(
+            "app.tools.processor._llm_extract", return_value=[]
+        ) as mock_llm, patch(
+            "app.tools.processor.get_extraction_cache", return_value=None
+        ):
+            _extract("450 at Kumar Stores")
+
+        mock_llm.assert_called_once()
+
+    def test_new_rows_learned_without_retraining(self, temp_db):
+        categorizer = get_categorizer()
+        assert categorizer.predict("u1", None, "Kumar Stores") is None
+
+        with patch.object(categorizer, "_train", wraps=categorizer._train) as train:
+            _log("u1", "Kumar Stores", "Groceries")
+            assert categorizer.predict("u1", None, "Kumar Stores")[0] == "Groceries"
+
+        train.assert_not_called()
+
+    def test_failed_commit_is_not_learned(self, temp_db):
+        categorizer = get_categorizer()
+        assert categorizer.predict("u1", None, "Kumar Stores") is None
+
+        with patch("sqlalchemy.orm.Session.commit", side_effect=RuntimeError("full")):
+            with pytest.raises(RuntimeError):
+                _log("u1", "Kumar Stores", "Groceries")
+
+        assert categorizer.predict("u1", None, "Kumar Stores") is None
+
+    def test_corrections_retrain(self, temp_db):
+        from app.tools.store import update_expense
+
+        ids = _log("u1", "Kumar Stores", "Groceries")
+        categorizer = get_categorizer()
+        assert categorizer.predict("u1", None, "Kumar Stores")[0] == "Groceries"
+
+        for expense_id in ids:
+            update_expense.invoke(
+                {"expense_id": expense_id, "updates": {"category": "Shopping"}}
+            )
+
+        assert categorizer.predict("u1", None, "Kumar Stores")[0] == "Shopping"
+
+    @pytest.mark.parametrize("user_id", [None, "u1"])
+    def test_statement_import_uses_history(self, temp_db, user_id):
+        from app.tools.statement_import import categorize
+
+        _log("u1", None, "Groceries", description="kumar stores", n=3)
+        category, _ = categorize("KUMAR STORES", user_id)
+        assert category == ("Groceries" if user_id else "Other")
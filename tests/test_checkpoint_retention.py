@@ -0,0 +1,110 @@
+"""Tests for pruning and compacting the LangGraph checkpoint database."""
+
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from app.db.checkpoint_retention import checkpoint_time, compact
+from app.db.engine import connect
+
+
+def _put(saver, thread_id, steps, blob_size=2000):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for step in range(steps):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": "x" * blob_size}
+        config = saver.put(config, checkpoint, {"step": step}, {})
+        saver.put_writes(config, [("messages", f"w{step}")], task_id="t")
+    return config
+
+
+@pytest.fixture
+def saver(tmp_path):
+    conn = connect(str(tmp_path / "graph_state.db"), check_same_thread=False)
+    saver = SqliteSaver(conn)
+    saver.setup()
+    yield saver
+    conn.close()
+
+
+def _count(conn, table, thread_id=None):
+    sql = f"SELECT COUNT(*) FROM {table}"
+    if thread_id is None:
+        return conn.execute(sql).fetchone()[0]
+    return conn.execute(sql + " WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+class TestCheckpointRetention:
+    """Test keep-last pruning, idle thread TTL and space reclamation."""
+
+    def test_checkpoint_time_matches_clock(self):
+        checkpoint = empty_checkpoint()
+        assert checkpoint_time(checkpoint["id"]) == pytest.approx(time.time(), abs=5)
+        assert checkpoint_time("not-a-uuid") is None
+
+    def test_keeps_last_n_per_thread(self, saver):
+        latest = _put(saver, "a", 10)
+        _put(saver, "b", 3)
+
+        report = compact(saver.conn, keep_last=4, idle_ttl_s=0)
+
+        assert _count(saver.conn, "checkpoints", "a") == 4
+        assert _count(saver.conn, "checkpoints", "b") == 3
+        assert report["checkpoints_deleted"] == 6
+        assert report["writes_deleted"] == 6
+        assert _count(saver.conn, "writes") == 7
+        # The thread still resumes from its newest checkpoint
+        restored = saver.get_tuple({"configurable": {"thread_id": "a"}})
+        assert (
+            restored.config["configurable"]["checkpoint_id"]
+            == latest["configurable"]["checkpoint_id"]
+        )
+
+    def test_drops_idle_threads(self, saver):
+        _put(saver, "old", 3)
+        time.sleep(0.01)
+        cutoff = time.time()
+        time.sleep(0.01)
+        _put(saver, "active", 3)
+
+        report = compact(saver.conn, keep_last=0, idle_ttl_s=60, now=cutoff + 60)
+
+        assert report["threads_dropped"] == 1
+        assert _count(saver.conn, "checkpoints", "old") == 0
+        assert _count(saver.conn, "writes", "old") == 0
+        assert _count(saver.conn, "checkpoints", "active") == 3
+
+    def test_reclaims_space(self, saver):
+        _put(saver, "a", 200, blob_size=20000)
+
+        report = compact(saver.conn, keep_last=2, idle_ttl_s=0, convert=True)
+
+        assert report["full_vacuum"] is True
+        assert report["bytes_reclaimed"] > 0
+        assert report["bytes_after"] < report["bytes_before"]
+        assert saver.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        # Later runs only need an incremental vacuum
+        _put(saver, "b", 200, blob_size=20000)
+        report = compact(saver.conn, keep_last=2, idle_ttl_s=0, convert=True)
+        assert report["full_vacuum"] is False
+        assert report["bytes_reclaimed"] > 0
+
+    def test_background_run_never_full_vacuums(self, saver, caplog):
+        _put(saver, "a", 50)
+
+        with caplog.at_level("INFO", logger="app.db.checkpoint_retention"):
+            report = compact(saver.conn, keep_last=2, idle_ttl_s=0)
+
+        assert report["full_vacuum"] is False
+        assert report["checkpoints_deleted"] == 48
+        assert saver.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        assert "not in incremental auto_vacuum mode" in caplog.text
+
+    def test_missing_tables_is_a_noop(self, tmp_path):
+        conn = connect(str(tmp_path / "empty.db"))
+        report = compact(conn)
+        conn.close()
+        assert report["checkpoints_deleted"] == 0
+        assert report["bytes_reclaimed"] == 0
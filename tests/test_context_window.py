@@ -0,0 +1,136 @@
+"""Tests for the token-budgeted agent prompt window."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core import context_window
+from app.core.context_window import compact, plan_cut, window
+from app.core.state_graph import _compile
+
+
+def _turn(i, size=400):
+    """One user turn with a tool round trip (4 messages)."""
+    call = {"name": "find_expenses", "args": {"q": str(i)}, "id": f"call_{i}"}
+    return [
+        HumanMessage(content=f"question {i} " + "x" * size),
+        AIMessage(content="", tool_calls=[call]),
+        ToolMessage(content="y" * size, tool_call_id=f"call_{i}", name="find_expenses"),
+        AIMessage(content=f"answer {i}"),
+    ]
+
+
+def _history(turns, size=400):
+    return [m for i in range(turns) for m in _turn(i, size)]
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    context_window.reset_context_window_stats()
+
+
+class TestPlanCut:
+    """Test where the verbatim window starts."""
+
+    def test_within_budget_keeps_everything(self):
+        assert plan_cut(_history(3), 0, overhead=100, budget=10_000) == 0
+
+    def test_cuts_at_turn_boundary_below_target(self):
+        messages = _history(10)
+        cut = plan_cut(messages, 0, overhead=0, budget=1500, ratio=0.5)
+
+        assert isinstance(messages[cut], HumanMessage)
+        assert context_window.count_tokens(messages[cut:]) <= 750
+        assert context_window.count_tokens(messages[cut - 4 :]) > 750
+
+    def test_keeps_latest_turn_even_if_over_budget(self):
+        messages = _history(3, size=4000)
+        assert plan_cut(messages, 0, overhead=0, budget=100) == 8
+
+    def test_disabled_budget(self):
+        assert plan_cut(_history(10), 0, overhead=0, budget=0) == 0
+
+
+class TestCompact:
+    """Test summarizing folded turns and the prompt sent to the agent."""
+
+    def test_folds_old_turns_into_summary(self):
+        model = MagicMock()
+        model.invoke.return_value = AIMessage(content="User asked about 3 expenses")
+        state = {"messages": _history(10), "summary": "older facts"}
+
+        with patch("app.core.context_window.CONTEXT_TOKEN_BUDGET", 1500), patch(
+            "app.core.context_window.get_chat_model", return_value=model
+        ):
+            update = compact(state)
+
+        assert update["summary"] == "User asked about 3 expenses"
+        cut = update["summarized_upto"]
+        assert 0 < cut < 40 and cut % 4 == 0
+        prompt = model.invoke.call_args.args[0][1].content
+        assert "older facts" in prompt
+        assert "Agent called find_expenses" in prompt
+        assert "question 0" in prompt
+
+    def test_within_budget_is_noop(self):
+        model = MagicMock()
+        with patch("app.core.context_window.get_chat_model", return_value=model):
+            assert compact({"messages": _history(2)}) == {}
+        model.invoke.assert_not_called()
+
+    def test_summarizer_failure_falls_back_to_excerpt(self):
+        model = MagicMock()
+        model.invoke.side_effect = RuntimeError("quota")
+
+        with patch("app.core.context_window.CONTEXT_TOKEN_BUDGET", 1500), patch(
+            "app.core.context_window.get_chat_model", return_value=model
+        ):
+            update = compact({"messages": _history(10)})
+
+        # The most recent folded messages are kept, clipped to a fixed size
+        assert update["summary"].endswith("Agent: answer 7")
+        assert len(update["summary"]) <= 2000
+        assert context_window.context_window_stats()["summary_failures"] == 1
+
+    def test_window_sends_summary_and_recent_turns(self):
+        messages = _history(5)
+        state = {"messages": messages, "summary": "s", "summarized_upto": 16}
+
+        prompt = window(state, [SystemMessage(content="sys")])
+
+        assert prompt[1].content.endswith("s")
+        assert prompt[2:] == messages[16:]
+        stats = context_window.context_window_stats()
+        assert stats["trimmed_calls"] == 1
+        assert stats["tokens_after"] < stats["tokens_before"]
+
+
+class TestGraphWindow:
+    """Test the graph keeps full history but sends a trimmed prompt."""
+
+    def test_long_thread_is_trimmed(self):
+        agent = MagicMock()
+        agent.ainvoke = AsyncMock(return_value=AIMessage(content="ok"))
+        summarizer = MagicMock()
+        summarizer.ainvoke = AsyncMock(return_value=AIMessage(content="summary"))
+        config = {"configurable": {"user_id": "u", "thread_id": "long"}}
+
+        with patch("app.core.state_graph.init_db"):
+            graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=agent), patch(
+            "app.core.context_window.get_chat_model", return_value=summarizer
+        ), patch("app.core.context_window.CONTEXT_TOKEN_BUDGET", 1500):
+            graph.update_state(config, {"messages": _history(10)})
+            out = asyncio.run(
+                graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+            )
+
+        assert len(out["messages"]) == 42
+        assert out["summary"] == "summary"
+        sent = agent.ainvoke.call_args.args[0]
+        assert "SUMMARY OF EARLIER CONVERSATION" in sent[2].content
+        assert len(sent) < 42
+        assert isinstance(sent[3], HumanMessage)
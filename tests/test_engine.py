@@ -0,0 +1,116 @@
+"""Tests for the shared SQLite engine and connection factory."""
+
+import sqlite3
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.core.config import SQLITE_BUSY_TIMEOUT_MS
+from app.db.engine import connect, connection, engine_for_path
+from app.tools.store import log_expense
+
+
+def _pragmas(conn):
+    return {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ("journal_mode", "synchronous", "busy_timeout")
+    }
+
+
+EXPECTED = {
+    "journal_mode": "wal",
+    "synchronous": 1,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+}
+
+
+class TestPragmas:
+    """Test every kind of connection gets the standard settings."""
+
+    def test_pooled_connection(self, temp_db):
+        with connection(temp_db) as conn:
+            assert _pragmas(conn) == EXPECTED
+
+    def test_session_connection(self, temp_db):
+        from app.tools import store
+
+        db = store.SessionLocal()
+        try:
+            raw = db.connection().connection.driver_connection
+            assert _pragmas(raw) == EXPECTED
+        finally:
+            db.close()
+
+    def test_dedicated_connection(self, tmp_path):
+        conn = connect(str(tmp_path / "other.db"))
+        try:
+            assert _pragmas(conn) == EXPECTED
+        finally:
+            conn.close()
+
+
+class TestPooling:
+    """Test engines are shared and connections reused."""
+
+    def test_one_engine_per_database(self, temp_db):
+        assert engine_for_path(temp_db) is engine_for_path(temp_db)
+
+    def test_connections_return_to_pool(self, temp_db):
+        pool = engine_for_path(temp_db).pool
+        with connection(temp_db):
+            pass
+        with connection(temp_db):
+            assert pool.checkedout() == 1
+        assert pool.checkedout() == 0
+
+    def test_rolls_back_on_error(self, temp_db):
+        try:
+            with connection(temp_db) as conn:
+                conn.execute("INSERT INTO user_data_versions VALUES ('u', 1)")
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        with connection(temp_db) as conn:
+            assert conn.execute(
+                "SELECT COUNT(*) FROM user_data_versions"
+            ).fetchone() == (0,)
+
+
+class TestConcurrency:
+    """Test concurrent readers and writers don't hit 'database is locked'."""
+
+    def test_reader_not_blocked_by_open_write(self, temp_db):
+        writer = connect(temp_db, isolation_level=None)
+        try:
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("INSERT INTO user_data_versions VALUES ('u', 1)")
+
+            with connection(temp_db) as reader:
+                count = reader.execute("SELECT COUNT(*) FROM user_data_versions")
+                assert count.fetchone() == (0,)
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+    def test_parallel_writers(self, temp_db):
+        ts = datetime.now(ZoneInfo("Asia/Kolkata")).isoformat()
+        entry = {"ts": ts, "amount": 10.0, "category": "Fuel", "raw_text": "fuel"}
+        errors = []
+
+        def write():
+            try:
+                for _ in range(20):
+                    log_expense.invoke({"user_id": "u", "entry": entry})
+            except Exception as e:  # pragma: no cover - failure path
+                errors.append(e)
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM expenses").fetchone() == (160,)
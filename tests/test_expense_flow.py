@@ -0,0 +1,199 @@
+"""Tests for the fused extract-and-log graph path."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.expense_flow import is_new_expense
+from app.core.state_graph import _compile
+from app.tools.fast_parser import looks_like_expense
+
+CONFIG = {"configurable": {"user_id": "u1", "thread_id": "t", "tz": "Asia/Kolkata"}}
+
+
+def _ambiguous(text, tz="Asia/Kolkata"):
+    return [
+        {
+            "amount": 1.0,
+            "currency": "INR",
+            "ts": "2026-02-25T12:00:00+05:30",
+            "description": "unclear",
+            "category": "Other",
+            "category_confidence": 0.1,
+            "created_at": "2026-02-25T12:00:00+05:30",
+            "is_ambiguous": True,
+            "clarification_question": "How much did you spend?",
+        }
+    ]
+
+
+def _run(messages, agent_reply="from agent"):
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=AIMessage(content=agent_reply))
+    with patch("app.core.state_graph.init_db"):
+        graph = _compile(MemorySaver())
+    with patch("app.core.state_graph._agent_model", return_value=model):
+        out = asyncio.run(graph.ainvoke({"messages": messages}, CONFIG))
+    return out["messages"], model
+
+
+def _count(db_path):
+    import sqlite3
+
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+
+class TestLooksLikeExpense:
+    """Test which messages are treated as a new expense."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "spent 250 on petrol",
+            "lunch 300",
+            "paid 1,200 rent on 2026-01-03",
+            "bought shoes for 2k at Nike yesterday",
+            "200 petrol, 350 lunch at Haldiram and 90 for parking",
+        ],
+    )
+    def test_expenses(self, text):
+        assert looks_like_expense(text)
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "hi",
+            "what did I spend 200 on?",
+            "change expense 4 to 300",
+            "paid $20 for lunch",
+            "my salary is 50000",
+        ],
+    )
+    def test_not_expenses(self, text):
+        assert not looks_like_expense(text)
+
+    def test_clarification_answer_goes_to_agent(self):
+        messages = [
+            HumanMessage(content="spent some on fuel"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "process_expense", "args": {}, "id": "c1"}],
+            ),
+            ToolMessage(
+                content=json.dumps([{"is_ambiguous": False}, {"is_ambiguous": True}]),
+                name="process_expense",
+                tool_call_id="c1",
+            ),
+            AIMessage(content="How much did you spend?"),
+            HumanMessage(content="spent 300"),
+        ]
+        assert not is_new_expense(messages)
+        assert is_new_expense(messages[-1:])
+
+    def test_answer_picking_between_expenses_goes_to_agent(self):
+        messages = [
+            HumanMessage(content="delete the petrol expense"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "find_expenses", "args": {}, "id": "c1"}],
+            ),
+            ToolMessage(
+                content=json.dumps([{"id": 3}, {"id": 4}]),
+                name="find_expenses",
+                tool_call_id="c1",
+            ),
+            AIMessage(content="Which one: #3 ₹500 petrol or #4 ₹450 petrol"),
+            HumanMessage(content="the 500 petrol one"),
+        ]
+        assert not is_new_expense(messages)
+
+    def test_answer_to_agent_question_goes_to_agent(self):
+        messages = [
+            HumanMessage(content="I had coffee with Priya"),
+            AIMessage(content="Nice! How much was the coffee?"),
+            HumanMessage(content="coffee 150"),
+        ]
+        assert not is_new_expense(messages)
+
+    def test_expense_after_confirmation_takes_fused_path(self):
+        messages = [
+            HumanMessage(content="lunch 300"),
+            AIMessage(content="Logged ₹300 for lunch. Expense id: #1."),
+            HumanMessage(content="coffee 150"),
+        ]
+        assert is_new_expense(messages)
+
+
+class TestFusedPath:
+    """Test clear expenses skip the agent and ambiguous ones reach it."""
+
+    def test_clear_expense_logged_without_agent(self, temp_db):
+        messages, model = _run([HumanMessage(content="spent 250 on petrol")])
+
+        model.ainvoke.assert_not_called()
+        names = [
+            m.tool_calls[0]["name"] for m in messages if getattr(m, "tool_calls", None)
+        ]
+        assert names == ["process_expense", "log_expense"]
+        assert messages[-1].content.startswith("Logged ₹250.00 for petrol (Fuel)")
+        assert "#1" in messages[-1].content
+        assert _count(temp_db) == 1
+
+    def test_multiple_expenses_logged_in_one_call(self, temp_db):
+        items = [
+            {**_ambiguous("")[0], "is_ambiguous": False, "clarification_question": None}
+            | {"amount": amount, "description": what, "category": category}
+            for amount, what, category in [
+                (200.0, "petrol", "Fuel"),
+                (350.0, "lunch", "Food & Dining"),
+                (90.0, "parking", "Transport"),
+            ]
+        ]
+        tool = MagicMock()
+        tool.ainvoke = AsyncMock(return_value=items)
+
+        with patch("app.core.expense_flow.process_expense", tool):
+            messages, model = _run(
+                [HumanMessage(content="200 petrol, 350 lunch and 90 for parking")]
+            )
+
+        model.ainvoke.assert_not_called()
+        tool.ainvoke.assert_called_once()
+        calls = [m.tool_calls[0] for m in messages if getattr(m, "tool_calls", None)]
+        assert [c["name"] for c in calls] == ["process_expense", "log_expenses"]
+        assert len(calls[1]["args"]["entries"]) == 3
+        assert messages[-1].content.startswith("Logged 3 expenses (₹640.00 in total)")
+        assert _count(temp_db) == 3
+
+    def test_ambiguous_expense_asks_through_agent(self, temp_db):
+        tool = MagicMock()
+        tool.ainvoke = AsyncMock(
+            side_effect=lambda args, config=None: _ambiguous(**args)
+        )
+
+        with patch("app.core.expense_flow.process_expense", tool):
+            messages, model = _run(
+                [HumanMessage(content="spent 250 on stuff")], "How much exactly?"
+            )
+
+        model.ainvoke.assert_called_once()
+        sent = model.ainvoke.call_args.args[0]
+        assert isinstance(sent[-1], ToolMessage)
+        assert json.loads(sent[-1].content)[0]["is_ambiguous"] is True
+        assert messages[-1].content == "How much exactly?"
+        assert _count(temp_db) == 0
+
+    def test_extraction_failure_falls_back_to_agent(self, temp_db):
+        tool = MagicMock()
+        tool.ainvoke = AsyncMock(side_effect=RuntimeError("quota"))
+
+        with patch("app.core.expense_flow.process_expense", tool):
+            messages, model = _run([HumanMessage(content="spent 250 on stuff")])
+
+        model.ainvoke.assert_called_once()
+        assert messages[-1].content == "from agent"
@@ -0,0 +1,135 @@
+"""Tests for the extraction result cache."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from app.core.cache import TTLCache
+from app.tools.extraction_cache import ExtractionCache, normalize_text
+from app.tools.processor import process_expense
+
+TZ = "Asia/Kolkata"
+
+
+def _today():
+    return datetime.now(ZoneInfo(TZ)).date()
+
+
+def _result(sample_expense_data, day):
+    ts = f"{day.isoformat()}T12:00:00+05:30"
+    return {**sample_expense_data, "ts": ts, "created_at": ts}
+
+
+class TestTTLCache:
+    """Test the generic LRU/TTL cache."""
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = TTLCache(ttl=10)
+        with patch("app.core.cache.time.monotonic", return_value=0):
+            cache.set("a", 1)
+        with patch("app.core.cache.time.monotonic", return_value=11):
+            assert cache.get("a") is None
+
+    def test_byte_budget(self):
+        cache = TTLCache(max_bytes=10)
+        cache.set("a", "x", size=6)
+        cache.set("b", "y", size=6)
+        assert len(cache) == 1
+        assert cache.stats()["bytes"] == 6
+
+
+class TestExtractionCache:
+    """Test extraction caching and date re-resolution."""
+
+    def test_normalization(self):
+        assert normalize_text("  Coffee   150! ") == "coffee 150"
+
+    def test_hit_after_set(self, sample_expense_data):
+        cache = ExtractionCache()
+        result = _result(sample_expense_data, _today())
+        cache.set("Coffee 150", TZ, result)
+        hit = cache.get("coffee  150", TZ)
+        assert hit["amount"] == result["amount"]
+        assert hit["ts"] == result["ts"]
+        assert cache.stats()["hit_ratio"] == 1.0
+
+    def test_relative_dates_re_resolved(self, sample_expense_data):
+        """Test 'yesterday' cached on one day resolves correctly the next."""
+        cache = ExtractionCache()
+        today = _today()
+        cache.set("petrol yesterday", TZ, _result(sample_expense_data, today))
+
+        with patch("app.tools.extraction_cache.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime.now(ZoneInfo(TZ)) + timedelta(days=1)
+            mock_dt.combine = datetime.combine
+            mock_dt.fromisoformat = datetime.fromisoformat
+            hit = cache.get("petrol yesterday", TZ)
+
+        assert hit["ts"].startswith((today + timedelta(days=1)).isoformat())
+
+    def test_multi_expense_results_round_trip(self, sample_expense_data):
+        cache = ExtractionCache()
+        items = [
+            {**_result(sample_expense_data, _today()), "amount": amount}
+            for amount in (200.0, 90.0)
+        ]
+        cache.set("200 petrol and 90 parking", TZ, items)
+
+        hit = cache.get("200 petrol and 90 parking", TZ)
+        assert [i["amount"] for i in hit] == [200.0, 90.0]
+        assert hit[1]["ts"] == items[1]["ts"]
+
+    def test_weekday_texts_keyed_on_reference_date(self, sample_expense_data):
+        cache = ExtractionCache()
+        cache.set("lunch last friday", TZ, _result(sample_expense_data, _today()))
+
+        with patch("app.tools.extraction_cache.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime.now(ZoneInfo(TZ)) + timedelta(days=1)
+            assert cache.get("lunch last friday", TZ) is None
+
+    def test_sqlite_persistence(self, tmp_path, sample_expense_data):
+        db_path = str(tmp_path / "cache.db")
+        ExtractionCache(db_path=db_path).set(
+            "coffee 150", TZ, _result(sample_expense_data, _today())
+        )
+
+        fresh = ExtractionCache(db_path=db_path)
+        assert fresh.get("coffee 150", TZ)["amount"] == sample_expense_data["amount"]
+        assert fresh.stats()["hits"] == 1
+
+
+class TestProcessExpenseCache:
+    """Test process_expense reuses cached LLM extractions."""
+
+    def test_second_call_served_from_cache(self, sample_expense_data):
+        cache = ExtractionCache()
+        result = _result(sample_expense_data, _today())
+        with patch("app.tools.processor.get_extraction_cache", return_value=cache):
+            with patch(
+                "app.tools.processor._llm_extract", return_value=[result]
+            ) as mock_llm:
+                args = {"text": "weekly veggie box 500", "tz": TZ}
+                process_expense.invoke(args)
+                out = process_expense.invoke(args)
+
+        mock_llm.assert_called_once()
+        assert out[0]["amount"] == result["amount"]
+
+    def test_ambiguous_results_not_cached(self, sample_expense_data):
+        cache = ExtractionCache()
+        result = {**_result(sample_expense_data, _today()), "is_ambiguous": True}
+        with patch("app.tools.processor.get_extraction_cache", return_value=cache):
+            with patch("app.tools.processor._llm_extract", return_value=[result]):
+                process_expense.invoke({"text": "spent some money", "tz": TZ})
+
+        assert len(cache._memory) == 0
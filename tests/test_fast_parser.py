@@ -0,0 +1,112 @@
+"""Tests for the rule-based expense extractor."""
+
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.tools.fast_parser import (
+    CATEGORY_KEYWORDS,
+    fast_parse,
+    fast_path_stats,
+    reset_fast_path_stats,
+)
+from app.tools.processor import CATEGORIES, ProcessedExpense, process_expense
+
+TZ = "Asia/Kolkata"
+# Wednesday
+NOW = datetime(2026, 2, 25, 9, 30, tzinfo=ZoneInfo(TZ))
+
+
+class TestFastParse:
+    """Test deterministic extraction of simple messages."""
+
+    def test_keywords_use_known_categories(self):
+        """Test every keyword category exists in the taxonomy."""
+        assert set(CATEGORY_KEYWORDS) <= set(CATEGORIES)
+
+    def test_amount_category_and_relative_date(self):
+        """Test 'spent 500 on petrol yesterday' is parsed locally."""
+        out = fast_parse("spent 500 on petrol yesterday", TZ, now=NOW)
+        assert out["amount"] == 500.0
+        assert out["category"] == "Fuel"
+        assert out["description"] == "petrol"
+        assert out["ts"] == "2026-02-24T12:00:00+05:30"
+        ProcessedExpense(**out)
+
+    @pytest.mark.parametrize(
+        "text,amount",
+        [
+            ("coffee 150", 150.0),
+            ("₹1,200 groceries", 1200.0),
+            ("rs. 99.50 for tea", 99.5),
+            ("dinner 1.5k", 1500.0),
+        ],
+    )
+    def test_amount_formats(self, text, amount):
+        """Test currency prefixes, separators and k suffix."""
+        assert fast_parse(text, TZ, now=NOW)["amount"] == amount
+
+    def test_known_merchant(self):
+        """Test merchants are picked up from known names and 'at X'."""
+        assert fast_parse("uber to office 320", TZ, now=NOW)["merchant"] == "Uber"
+        out = fast_parse("lunch at Haldiram 350", TZ, now=NOW)
+        assert out["merchant"] == "Haldiram"
+        assert out["description"] == "lunch"
+
+    def test_weekday_resolves_to_previous_occurrence(self):
+        """Test 'last friday' resolves to the most recent past Friday."""
+        out = fast_parse("petrol 800 last friday", TZ, now=NOW)
+        assert out["ts"].startswith("2026-02-20")
+
+    def test_day_before_yesterday(self):
+        """Test the longer phrase wins over 'yesterday'."""
+        out = fast_parse("parking 40 day before yesterday", TZ, now=NOW)
+        assert out["ts"].startswith("2026-02-23")
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "bought stuff",
+            "500 and 300 on lunch",
+            "spent 20 dollars on coffee",
+            "delete the petrol expense of 500",
+            "gift for mom 2000",
+            "lunch and petrol 600",
+            "what did I spend on lunch 2 days ago?",
+        ],
+    )
+    def test_unclear_messages_fall_back(self, text):
+        """Test anything not clearly a single expense is left to the LLM."""
+        assert fast_parse(text, TZ, now=NOW) is None
+
+    def test_hit_miss_counters(self):
+        """Test hit/miss counters are updated."""
+        reset_fast_path_stats()
+        fast_parse("coffee 150", TZ, now=NOW)
+        fast_parse("gift for mom", TZ, now=NOW)
+        stats = fast_path_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+
+class TestProcessExpenseFastPath:
+    """Test process_expense only calls the LLM on a fast-path miss."""
+
+    def test_hit_skips_llm(self):
+        with patch("app.tools.processor._llm_extract") as mock_llm:
+            out = process_expense.invoke({"text": "coffee 150", "tz": TZ})
+            mock_llm.assert_not_called()
+            assert [e["category"] for e in out] == ["Food & Dining"]
+
+    def test_miss_calls_llm(self, sample_expense_data):
+        with patch(
+            "app.tools.processor.get_extraction_cache", return_value=None
+        ), patch(
+            "app.tools.processor._llm_extract", return_value=[sample_expense_data]
+        ) as mock_llm:
+            out = process_expense.invoke({"text": "bought stuff for 500", "tz": TZ})
+            mock_llm.assert_called_once()
+            assert out == [sample_expense_data]
@@ -0,0 +1,61 @@
+"""Tests for the shared LLM client registry."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core import llm
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    llm.reset()
+    yield
+    llm.reset()
+
+
+class TestLLMRegistry:
+    """Test clients are built once and reused."""
+
+    def test_chat_model_built_once(self):
+        with patch("app.core.llm._build_chat_model") as mock_build:
+            assert llm.get_chat_model() is llm.get_chat_model()
+            mock_build.assert_called_once()
+
+    def test_agent_model_binds_tools_once(self):
+        model = MagicMock()
+        with patch("app.core.llm._build_chat_model", return_value=model):
+            first = llm.get_agent_model()
+            second = llm.get_agent_model()
+
+        assert first is second
+        model.bind_tools.assert_called_once()
+
+    def test_warm_up_builds_both(self):
+        model = MagicMock()
+        with patch("app.core.llm._build_chat_model", return_value=model):
+            llm.warm_up()
+            model.bind_tools.assert_called_once()
+            assert llm.get_agent_model() is model.bind_tools.return_value
+
+    def test_processor_uses_shared_model(self):
+        from app.tools.processor import get_llm
+
+        with patch("app.core.llm._build_chat_model") as mock_build:
+            assert get_llm() is mock_build.return_value
+
+
+class TestConnectionPool:
+    """Test both the sync and async transports share the configured limits."""
+
+    def test_async_client_is_pooled(self):
+        from app.core.config import LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE
+
+        api_client = llm._build_chat_model().client._api_client
+
+        # aiohttp would bypass the pool with an unlimited connector
+        assert not api_client._use_aiohttp()
+        for client in (api_client._httpx_client, api_client._async_httpx_client):
+            pool = client._transport._pool
+            assert pool._max_connections == LLM_POOL_MAX_CONNECTIONS
+            assert pool._max_keepalive_connections == LLM_POOL_MAX_KEEPALIVE
@@ -0,0 +1,192 @@
+"""Tests for the merchant alias index and canonical merchant ids."""
+
+import sqlite3
+
+from app.db.engine import connection
+from app.tools.merchants import MerchantIndex, backfill, get_merchant_index, normalize
+
+
+def _merchant_ids(db_path, ids):
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT merchant_id FROM expenses WHERE id IN ({','.join('?' * len(ids))})",
+            ids,
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+class TestNormalize:
+    """Test merchant name normalization."""
+
+    def test_drops_case_punctuation_and_suffixes(self):
+        assert normalize("HP Petrol Pump") == "hp"
+        assert normalize("  Kumar & Sons Pvt. Ltd.") == "kumar sons"
+        assert normalize("D-Mart") == "d mart"
+        assert normalize(None) == ""
+        assert normalize("Ltd") == "ltd"
+
+
+class TestMerchantIndex:
+    """Test alias resolution against a fresh database."""
+
+    def test_spellings_of_a_seeded_merchant_share_an_id(self, temp_db):
+        index = MerchantIndex(temp_db)
+        hp = index.resolve("HP")
+        assert hp is not None
+        assert index.resolve("HP petrol pump") == hp
+        assert index.resolve("Hindustan Petroleum") == hp
+        assert index.resolve("hpcl") == hp
+        assert index.resolve("BigBasket") == index.resolve("Big Basket")
+        assert index.resolve("Indian Oil") != hp
+
+    def test_prefix_match_on_word_boundary(self, temp_db):
+        index = MerchantIndex(temp_db)
+        hp = index.resolve("HP")
+        assert index.resolve("HP petrol pump sector 5") == hp
+        assert index.resolve("hpx traders") != hp
+
+    def test_other_businesses_sharing_a_brand_word_get_own_ids(self, temp_db):
+        index = MerchantIndex(temp_db)
+        uber, amazon = index.resolve("Uber"), index.resolve("Amazon")
+        uber_eats = index.resolve("Uber Eats")
+        prime_video = index.resolve("Amazon Prime Video")
+        assert uber_eats not in (uber, None)
+        assert prime_video not in (amazon, None)
+        assert index.resolve("Ola Electric") != index.resolve("Ola")
+        assert index.resolve("uber eats") == uber_eats
+
+    def test_new_merchants_only_match_exactly(self, temp_db):
+        index = MerchantIndex(temp_db)
+        cafe = index.resolve("Cafe")
+        assert index.resolve("cafe") == cafe
+        assert index.resolve("Cafe Coffee Day") != cafe
+        assert index.stats()["created"] == 2
+
+    def test_lookup_does_not_create(self, temp_db):
+        index = MerchantIndex(temp_db)
+        assert index.lookup("Kumar Stores") is None
+        assert index.lookup("hindustan petroleum") == index.resolve("HP")
+        assert index.stats()["created"] == 0
+
+    def test_aliases_persist_across_instances(self, temp_db):
+        kumar = MerchantIndex(temp_db).resolve("Kumar Stores")
+        fresh = MerchantIndex(temp_db)
+        assert fresh.lookup("kumar stores") == kumar
+        assert fresh.resolve("KUMAR STORES") == kumar
+        assert fresh.stats()["created"] == 0
+
+
+class TestStoreIntegration:
+    """Test merchant ids on logged, updated and searched expenses."""
+
+    def test_logged_spellings_get_one_merchant_id(self, temp_db, make_entry):
+        from app.tools.store import log_expenses_batch
+
+        ids = log_expenses_batch(
+            "u1",
+            [
+                make_entry(merchant="HP"),
+                make_entry(merchant="HP petrol pump"),
+                make_entry(merchant="hindustan petroleum"),
+            ],
+        )
+        merchant_ids = _merchant_ids(temp_db, ids)
+        assert len(merchant_ids) == 1
+        assert None not in merchant_ids
+
+    def test_find_expenses_matches_every_spelling(self, temp_db, make_entry):
+        from app.tools.store import find_expenses, log_expense, log_expenses_batch
+
+        log_expenses_batch(
+            "u1", [make_entry(merchant="HP"), make_entry(merchant="HP Petrol Pump")]
+        )
+        log_expense.invoke(
+            {"user_id": "u1", "entry": make_entry(merchant="Indian Oil")}
+        )
+
+        found = find_expenses.invoke(
+            {"user_id": "u1", "merchant": "Hindustan Petroleum"}
+        )
+        assert sorted(e["merchant"] for e in found) == ["HP", "HP Petrol Pump"]
+
+    def test_find_expenses_falls_back_to_text_match(self, temp_db, make_entry):
+        from app.tools.store import find_expenses, log_expenses_batch
+
+        log_expenses_batch("u1", [make_entry(merchant="Kumar Stores")])
+        found = find_expenses.invoke({"user_id": "u1", "merchant": "kumar"})
+        assert [e["merchant"] for e in found] == ["Kumar Stores"]
+
+    def test_find_expenses_keeps_brand_spinoffs_apart(self, temp_db, make_entry):
+        from app.tools.store import find_expenses, log_expenses_batch
+
+        log_expenses_batch(
+            "u1", [make_entry(merchant="Uber"), make_entry(merchant="Uber Eats")]
+        )
+        found = find_expenses.invoke({"user_id": "u1", "merchant": "Uber Eats"})
+        assert [e["merchant"] for e in found] == ["Uber Eats"]
+
+    def test_find_expenses_keeps_longer_names_for_known_merchant(
+        self, temp_db, make_entry
+    ):
+        from app.tools.store import find_expenses, log_expenses_batch
+
+        log_expenses_batch(
+            "u1",
+            [
+                make_entry(merchant="Uber"),
+                make_entry(merchant="Uber Eats"),
+                make_entry(merchant="HP"),
+                make_entry(merchant="Cafe"),
+                make_entry(merchant="Cafe Coffee Day"),
+            ],
+        )
+
+        found = find_expenses.invoke({"user_id": "u1", "merchant": "uber"})
+        assert sorted(e["merchant"] for e in found) == ["Uber", "Uber Eats"]
+        found = find_expenses.invoke({"user_id": "u1", "merchant": "cafe"})
+        assert sorted(e["merchant"] for e in found) == ["Cafe", "Cafe Coffee Day"]
+        found = find_expenses.invoke(
+            {"user_id": "u1", "merchant": "hindustan petroleum"}
+        )
+        assert [e["merchant"] for e in found] == ["HP"]
+
+    def test_update_merchant_reassigns_id(self, temp_db, make_entry):
+        from app.tools.store import log_expenses_batch, update_expense
+
+        ids = log_expenses_batch(
+            "u1", [make_entry(merchant="Kumar Stores"), make_entry(merchant="HP")]
+        )
+        update_expense.invoke(
+            {"expense_id": ids[0], "updates": {"merchant": "HP petrol pump"}}
+        )
+        assert len(_merchant_ids(temp_db, ids)) == 1
+
+    def test_backfill_sets_missing_ids(self, temp_db):
+        with connection(temp_db) as conn:
+            conn.executemany(
+                "INSERT INTO expenses (user_id, ts, amount, currency, category, "
+                "merchant, created_at) VALUES ('u1', '2025-01-01T10:00:00+05:30', "
+                "10, 'INR', 'Fuel', ?, '2025-01-01')",
+                [("HP",), ("hindustan petroleum",), (None,), ("---",)],
+            )
+        with connection(temp_db) as conn:
+            assert backfill(get_merchant_index(), conn) == 3
+            rows = conn.execute(
+                "SELECT merchant, merchant_id FROM expenses ORDER BY id"
+            ).fetchall()
+        assert rows[0][1] == rows[1][1] is not None
+        assert rows[2][1] is None and rows[3][1] is None
+
+    def test_old_database_gains_merchant_column(self, tmp_path):
+        from app.db import migrations
+
+        conn = sqlite3.connect(tmp_path / "old.db")
+        conn.execute(
+            "CREATE TABLE expenses (id INTEGER PRIMARY KEY, user_id TEXT, "
+            "ts TEXT, amount REAL, currency TEXT, category TEXT, merchant TEXT)"
+        )
+        migrations.add_expense_merchant_id(conn)
+        migrations.add_expense_merchant_id(conn)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(expenses)")}
+        assert "merchant_id" in columns
+        conn.close()
@@ -0,0 +1,186 @@
+"""Tests for the in-process metrics registry and /metrics endpoint."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    registered = list(metrics._registry)
+    metrics.reset()
+    yield
+    # Drop the metrics tests defined so they don't show up in later scrapes
+    metrics._registry[:] = registered
+    metrics.reset()
+
+
+class TestRegistry:
+    """Test counters, gauges, histograms and the text format."""
+
+    def test_counter_and_gauge_render(self):
+        counter = metrics.Counter("t_requests_total", "Requests", ["path"])
+        gauge = metrics.Gauge("t_in_flight", "In flight")
+        counter.inc("/a")
+        counter.inc("/a", amount=2)
+        counter.inc('say "hi"')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        lines = "\n".join(counter.render() + gauge.render())
+        assert "# TYPE t_requests_total counter" in lines
+        assert 't_requests_total{path="/a"} 3' in lines
+        assert 't_requests_total{path="say \\"hi\\""} 1' in lines
+        assert "t_in_flight 1" in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("t_seconds", "Latency", ["op"], buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value, "get")
+
+        lines = histogram.render()
+        assert 't_seconds_bucket{op="get",le="1.0"} 2' in lines
+        assert 't_seconds_bucket{op="get",le="5.0"} 3' in lines
+        assert 't_seconds_bucket{op="get",le="+Inf"} 4' in lines
+        assert 't_seconds_sum{op="get"} 14.5' in lines
+        assert 't_seconds_count{op="get"} 4' in lines
+
+    def test_label_count_is_checked(self):
+        with pytest.raises(ValueError):
+            metrics.TOOL_SECONDS.observe(1.0)
+
+    def test_timed_records_sync_async_and_errors(self):
+        histogram = metrics.Histogram("t_timed_seconds", "Timed", ["fn"])
+        errors = metrics.Counter("t_timed_errors_total", "Errors", ["fn"])
+
+        @metrics.timed(histogram, "ok")
+        def ok():
+            return 1
+
+        @metrics.timed(histogram, "async", errors=errors)
+        async def fails():
+            raise RuntimeError("boom")
+
+        assert ok() == 1
+        with pytest.raises(RuntimeError):
+            asyncio.run(fails())
+        assert histogram.count("ok") == 1
+        assert histogram.count("async") == 1
+        assert errors.value("async") == 1
+
+    def test_render_appends_component_stats(self):
+        text = metrics.render({"router": {"routed": 3, "note": "x", "ok": True}})
+        assert "finance_router_routed 3" in text
+        assert "finance_router_note" not in text
+        assert "finance_router_ok" not in text
+
+
+class TestInstrumentation:
+    """Test nodes, tools, LLM calls and SQL are recorded."""
+
+    def _config(self):
+        return {
+            "configurable": {"user_id": "u1", "thread_id": "t1", "tz": "Asia/Kolkata"}
+        }
+
+    def test_graph_nodes_and_tools_are_timed(self, temp_db):
+        from app.core.state_graph import _compile
+
+        model = MagicMock()
+        model.ainvoke = AsyncMock(
+            side_effect=[
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "find_expenses",
+                            "args": {"user_id": "u1", "merchant": "swiggy"},
+                            "id": "call_1",
+                        }
+                    ],
+                ),
+                AIMessage(content="Nothing found"),
+            ]
+        )
+        graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=model):
+            out = asyncio.run(
+                graph.ainvoke(
+                    {"messages": [HumanMessage(content="what did I order")]},
+                    self._config(),
+                )
+            )
+
+        assert out["messages"][-1].content == "Nothing found"
+        assert metrics.GRAPH_NODE_SECONDS.count("agent") == 2
+        assert metrics.GRAPH_NODE_SECONDS.count("tools") == 1
+        assert metrics.GRAPH_NODE_SECONDS.count("router") == 1
+        assert metrics.TOOL_SECONDS.count("find_expenses") == 1
+        assert metrics.DB_QUERY_SECONDS.count("SELECT") >= 1
+        assert metrics.EXECUTOR_QUEUED.value() == 0
+        assert metrics.EXECUTOR_RUNNING.value() == 0
+
+    def test_llm_calls_are_timed_by_node(self):
+        from app.core.llm import LLMMetrics
+
+        model = GenericFakeChatModel(
+            messages=iter([AIMessage(content="hi")]), callbacks=[LLMMetrics()]
+        )
+        asyncio.run(model.ainvoke("hello"))
+        assert metrics.LLM_SECONDS.count("none") == 1
+
+    def test_tool_errors_are_counted(self):
+        from app.tools import update_expense
+
+        with patch("app.tools.store._write", side_effect=RuntimeError("db down")):
+            with pytest.raises(RuntimeError):
+                update_expense.invoke({"expense_id": 1, "updates": {"amount": 1}})
+        assert metrics.TOOL_ERRORS.value("update_expense") == 1
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics scrape endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        from app.api.chat import router as chat_router
+        from app.api.metrics import router
+
+        app = FastAPI()
+        app.include_router(router)
+        app.include_router(chat_router)
+        return TestClient(app)
+
+    def test_scrape_format(self, client):
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE finance_graph_node_seconds histogram" in response.text
+        assert "finance_router_routed " in response.text
+        assert "finance_context_window_calls " in response.text
+
+    def test_chat_timeouts_counted(self, client, sample_chat_request):
+        async def slow_invoke(*args, **kwargs):
+            await asyncio.sleep(1)
+
+        with patch("app.api.chat.get_graph", new_callable=AsyncMock) as mock_get_graph:
+            mock_get_graph.return_value.ainvoke = slow_invoke
+            with patch("app.api.chat.CHAT_TIMEOUT_S", 0.01):
+                response = client.post("/api/chat/message", json=sample_chat_request)
+
+        assert response.status_code == 504
+
+        text = client.get("/metrics").text
+        assert 'finance_chat_timeouts_total{endpoint="message"} 1' in text
+        assert "finance_chat_in_flight 0" in text
+        assert "finance_chat_waiting 0" in text
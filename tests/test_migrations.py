@@ -0,0 +1,130 @@
+"""Tests for in-place schema migrations and the derived timestamp columns."""
+
+import sqlite3
+
+import pytest
+
+from app.db import rollups
+from app.db.timestamps import local_day, to_epoch
+from app.tools.store import find_expenses, init_db, log_expense, update_expense
+
+OLD_SCHEMA = """
+CREATE TABLE expenses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    amount REAL NOT NULL,
+    currency TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT,
+    merchant TEXT,
+    raw_text TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX idx_expenses_user_ts ON expenses(user_id, ts);
+"""
+
+
+@pytest.fixture
+def old_db(tmp_path, monkeypatch):
+    """An expenses.db as created before ts_epoch/local_day existed."""
+    db_path = str(tmp_path / "old.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(OLD_SCHEMA)
+        conn.executemany(
+            "INSERT INTO expenses (user_id, ts, amount, currency, category, "
+            "created_at) VALUES ('u', ?, ?, 'INR', 'Fuel', ?)",
+            [
+                ("2026-02-25T23:30:00+05:30", 100.0, "2026-02-25T23:30:00"),
+                ("2026-02-25T20:00:00-05:00", 50.0, "2026-02-25T20:00:00"),
+            ],
+        )
+    monkeypatch.setattr("app.tools.store.DB_PATH", db_path)
+    return db_path
+
+
+class TestTimestampColumns:
+    """Test the values derived from ISO timestamps."""
+
+    def test_epoch_respects_offsets(self):
+        assert to_epoch("2026-02-25T05:30:00+05:30") == to_epoch(
+            "2026-02-25T00:00:00+00:00"
+        )
+        assert to_epoch("2026-02-25T00:00:00Z") == 1771977600
+        assert to_epoch("not a date") is None
+
+    def test_local_day_keeps_logged_offset(self):
+        assert local_day("2026-02-25T20:00:00-05:00") == "2026-02-25"
+
+
+class TestExpenseTimeMigration:
+    """Test existing databases gain indexed ts_epoch/local_day columns."""
+
+    def test_migrates_and_backfills_old_database(self, old_db):
+        init_db()
+
+        with sqlite3.connect(old_db) as conn:
+            rows = conn.execute(
+                "SELECT ts, ts_epoch, local_day FROM expenses ORDER BY id"
+            ).fetchall()
+            indexes = {r[1] for r in conn.execute("PRAGMA index_list(expenses)")}
+            assert rollups.verify(conn) == []
+
+        assert rows == [(ts, to_epoch(ts), ts[:10]) for ts, _, _ in rows]
+        assert {"idx_expenses_user_epoch", "idx_expenses_user_day_epoch"} <= indexes
+
+    def test_migration_is_idempotent(self, old_db):
+        init_db()
+        init_db()
+
+        with sqlite3.connect(old_db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM expenses").fetchone() == (2,)
+
+    def test_range_queries_use_indexes(self, temp_db):
+        with sqlite3.connect(temp_db) as conn:
+            epoch_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM expenses "
+                "WHERE user_id = ? AND ts_epoch >= ? AND ts_epoch < ?",
+                ("u", 0, 1),
+            ).fetchall()
+            day_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM expenses "
+                "WHERE user_id = ? AND local_day >= ? AND local_day < ?",
+                ("u", "2026-02-23", "2026-03-02"),
+            ).fetchall()
+
+        assert "idx_expenses_user_epoch" in str(epoch_plan)
+        assert "idx_expenses_user_day_epoch" in str(day_plan)
+
+
+class TestStoreTimestamps:
+    """Test the store tools keep the derived columns in step with ts."""
+
+    def test_log_and_update_set_columns(self, temp_db):
+        entry = {
+            "ts": "2026-02-25T23:30:00+05:30",
+            "amount": 100.0,
+            "category": "Fuel",
+            "description": "petrol",
+            "merchant": None,
+            "raw_text": "petrol",
+        }
+        expense_id = log_expense.invoke({"user_id": "u", "entry": entry})["expense_id"]
+        update_expense.invoke(
+            {"expense_id": expense_id, "updates": {"ts": "2026-02-26T08:00:00+05:30"}}
+        )
+
+        with sqlite3.connect(temp_db) as conn:
+            row = conn.execute(
+                "SELECT ts_epoch, local_day FROM expenses WHERE id = ?", (expense_id,)
+            ).fetchone()
+        assert row == (to_epoch("2026-02-26T08:00:00+05:30"), "2026-02-26")
+
+    def test_find_expenses_filters_on_local_day(self, temp_db):
+        for ts in ["2026-02-25T23:30:00+05:30", "2026-02-26T00:30:00+05:30"]:
+            entry = {"ts": ts, "amount": 10.0, "category": "Fuel", "raw_text": "x"}
+            log_expense.invoke({"user_id": "u", "entry": entry})
+
+        found = find_expenses.invoke({"user_id": "u", "date": "2026-02-25"})
+        assert [e["amount"] for e in found] == [10.0]
+        assert len(find_expenses.invoke({"user_id": "u"})) == 2
@@ -3,7 +3,7 @@
 import pytest
 from pydantic import ValidationError
 
-from app.tools.processor import ProcessedExpense
+from app.tools.processor import ProcessedExpense, ProcessedExpenses
 
 
 class TestProcessedExpense:
@@ -41,3 +41,22 @@ class TestProcessedExpense:
         expense = ProcessedExpense(**sample_expense_data)
         # Should not raise error
         assert expense.created_at is not None
+
+
+class TestProcessedExpenses:
+    """Test the multi-expense extraction wrapper."""
+
+    def test_items_validated_individually(self, sample_expense_data):
+        """Test every item goes through ProcessedExpense validation."""
+        out = ProcessedExpenses(
+            expenses=[sample_expense_data, {**sample_expense_data, "amount": 90}]
+        )
+        assert [e.amount for e in out.expenses] == [500.0, 90.0]
+
+        with pytest.raises(ValidationError):
+            ProcessedExpenses(expenses=[{**sample_expense_data, "amount": 0}])
+
+    def test_at_least_one_item(self):
+        """Test an empty extraction is rejected."""
+        with pytest.raises(ValidationError):
+            ProcessedExpenses(expenses=[])
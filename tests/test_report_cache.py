@@ -0,0 +1,129 @@
+"""Tests for data versions, the report cache and ETag handling."""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db.versions import get_version
+from app.tools.analytics import compute_weekly_report
+from app.tools.report_cache import ReportCache, etag_matches, report_etag
+from app.tools.store import (
+    delete_expense,
+    log_expense,
+    log_expenses_batch,
+    update_expense,
+)
+
+
+def _version(db_path, user_id="u"):
+    with sqlite3.connect(db_path) as conn:
+        return get_version(conn, user_id)
+
+
+class TestDataVersions:
+    """Test every write tool bumps the user's data version."""
+
+    def test_writes_bump_version(self, temp_db, make_entry):
+        assert _version(temp_db) == 0
+
+        expense_id = log_expense.invoke({"user_id": "u", "entry": make_entry()})[
+            "expense_id"
+        ]
+        assert _version(temp_db) == 1
+
+        log_expenses_batch("u", [make_entry(), make_entry()])
+        assert _version(temp_db) == 2
+
+        update_expense.invoke(
+            {"expense_id": expense_id, "updates": {"description": "fruit"}}
+        )
+        assert _version(temp_db) == 3
+
+        delete_expense.invoke({"expense_id": expense_id})
+        assert _version(temp_db) == 4
+        assert _version(temp_db, "someone_else") == 0
+
+
+class TestReportCache:
+    """Test versioned caching and ETag helpers."""
+
+    def test_same_version_is_computed_once(self):
+        cache = ReportCache(maxsize=4)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": len(calls)}
+
+        assert cache.get_or_compute("u", "weekly", ("tz",), 1, compute) == {"total": 1}
+        assert cache.get_or_compute("u", "weekly", ("tz",), 1, compute) == {"total": 1}
+        assert cache.get_or_compute("u", "weekly", ("tz",), 2, compute) == {"total": 2}
+        assert cache.stats()["hits"] == 1
+
+    def test_etag_changes_with_version_and_params(self):
+        base = report_etag("u", "weekly", ("Asia/Kolkata",), 1)
+        assert base == report_etag("u", "weekly", ("Asia/Kolkata",), 1)
+        assert base != report_etag("u", "weekly", ("Asia/Kolkata",), 2)
+        assert base != report_etag("u", "weekly", ("UTC",), 1)
+        assert base != report_etag("v", "weekly", ("Asia/Kolkata",), 1)
+
+    def test_etag_matching(self):
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches(None, '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+
+class TestConditionalReports:
+    """Test analytics endpoints answer 304 until the user's data changes."""
+
+    @pytest.fixture
+    def client(self):
+        from app.api.analytics import router
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_weekly_report_etag_flow(self, client, temp_db, make_entry):
+        log_expense.invoke({"user_id": "u", "entry": make_entry(250.0)})
+        url = "/api/analytics/weekly-report?user_id=u"
+
+        with patch(
+            "app.api.analytics.compute_weekly_report", wraps=compute_weekly_report
+        ) as compute:
+            first = client.get(url)
+            etag = first.headers["etag"]
+            assert first.status_code == 200
+            assert first.json()["total"] == 250.0
+
+            assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+            assert client.get(url).json() == first.json()
+            assert compute.call_count == 1
+
+            log_expense.invoke({"user_id": "u", "entry": make_entry(50.0)})
+
+            changed = client.get(url, headers={"If-None-Match": etag})
+            assert changed.status_code == 200
+            assert changed.headers["etag"] != etag
+            assert changed.json()["total"] == 300.0
+            assert compute.call_count == 2
+
+    def test_period_report_etag_depends_on_params(self, client, temp_db):
+        params = {"user_id": "u", "start": "2026-01-01", "end": "2026-01-31"}
+        day = client.get("/api/analytics/report", params=params)
+        month = client.get(
+            "/api/analytics/report", params={**params, "granularity": "month"}
+        )
+
+        assert day.headers["etag"] != month.headers["etag"]
+        again = client.get(
+            "/api/analytics/report",
+            params=params,
+            headers={"If-None-Match": day.headers["etag"]},
+        )
+        assert again.status_code == 304
@@ -0,0 +1,109 @@
+"""Tests for incrementally maintained spending rollups."""
+
+import sqlite3
+
+from app.db import rollups
+from app.tools.analytics import weekly_report
+from app.tools.store import (
+    delete_expense,
+    log_expense,
+    log_expenses_batch,
+    update_expense,
+)
+
+
+def _rollup_rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT category, total, count, max_amount FROM expense_daily_rollups "
+            "ORDER BY category"
+        ).fetchall()
+
+
+def _verify(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return rollups.verify(conn)
+
+
+class TestRollupMaintenance:
+    """Test every write tool keeps rollups in sync with expenses."""
+
+    def test_log_expense_adds_to_rollup(self, temp_db, make_entry):
+        log_expense.invoke({"user_id": "u", "entry": make_entry(100)})
+        log_expense.invoke({"user_id": "u", "entry": make_entry(250)})
+
+        assert _rollup_rows(temp_db) == [("Groceries", 350.0, 2, 250.0)]
+        assert _verify(temp_db) == []
+
+    def test_batch_insert_aggregates_groups(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u",
+            [
+                make_entry(100),
+                make_entry(50, "Fuel"),
+                make_entry(20),
+                make_entry(30, "Fuel"),
+            ],
+        )
+        assert _rollup_rows(temp_db) == [
+            ("Fuel", 80.0, 2, 50.0),
+            ("Groceries", 120.0, 2, 100.0),
+        ]
+
+    def test_update_moves_between_categories(self, temp_db, make_entry):
+        first = log_expense.invoke({"user_id": "u", "entry": make_entry(100)})
+        log_expense.invoke({"user_id": "u", "entry": make_entry(40)})
+
+        update_expense.invoke(
+            {
+                "expense_id": first["expense_id"],
+                "updates": {"category": "Fuel", "amount": 120.0},
+            }
+        )
+
+        assert _rollup_rows(temp_db) == [
+            ("Fuel", 120.0, 1, 120.0),
+            ("Groceries", 40.0, 1, 40.0),
+        ]
+        assert _verify(temp_db) == []
+
+    def test_delete_recomputes_max_and_prunes(self, temp_db, make_entry):
+        big = log_expense.invoke({"user_id": "u", "entry": make_entry(500)})
+        small = log_expense.invoke({"user_id": "u", "entry": make_entry(20)})
+
+        delete_expense.invoke({"expense_id": big["expense_id"]})
+        assert _rollup_rows(temp_db) == [("Groceries", 20.0, 1, 20.0)]
+
+        delete_expense.invoke({"expense_id": small["expense_id"]})
+        assert _rollup_rows(temp_db) == []
+        assert _verify(temp_db) == []
+
+
+class TestRebuild:
+    """Test rebuilding and verifying rollups from raw rows."""
+
+    def test_verify_detects_drift_and_rebuild_fixes_it(self, temp_db, make_entry):
+        log_expense.invoke({"user_id": "u", "entry": make_entry(100)})
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE expense_daily_rollups SET total = 1")
+            assert len(rollups.verify(conn)) == 1
+
+            assert rollups.rebuild(conn) == 1
+            assert rollups.verify(conn) == []
+
+
+class TestWeeklyReportFromRollups:
+    """Test weekly_report reads rollups for its aggregates."""
+
+    def test_report_totals(self, temp_db, make_entry):
+        log_expenses_batch(
+            "u", [make_entry(100), make_entry(300, "Fuel"), make_entry(50, "Fuel")]
+        )
+        log_expense.invoke({"user_id": "other", "entry": make_entry(999)})
+
+        report = weekly_report.invoke({"user_id": "u", "tz": "Asia/Kolkata"})
+
+        assert report["total"] == 450.0
+        assert report["by_category"] == {"Fuel": 350.0, "Groceries": 100.0}
+        assert list(report["by_category"]) == ["Fuel", "Groceries"]
+        assert [i["amount"] for i in report["top_items"]] == [300.0, 100.0, 50.0]
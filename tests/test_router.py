@@ -0,0 +1,166 @@
+"""Tests for the deterministic intent router."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.router import match_intent, reset_router_stats, router_stats
+from app.core.state_graph import _compile
+
+TZ = "Asia/Kolkata"
+
+
+class TestMatchIntent:
+    """Test which messages map onto a direct tool call."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "weekly report",
+            "Show my weekly report",
+            "show me my spending this week?",
+            "this week's summary",
+            "How much did I spend this week",
+            "please weekly report",
+        ],
+    )
+    def test_weekly_report(self, text):
+        intent = match_intent(text, "u1", TZ)
+        assert intent.tool == "weekly_report"
+        assert intent.args == {"user_id": "u1", "tz": TZ}
+
+    @pytest.mark.parametrize(
+        "text", ["delete expense 42", "Remove expense #42.", "delete expense id 42"]
+    )
+    def test_delete(self, text):
+        intent = match_intent(text, "u1", TZ)
+        assert intent.tool == "delete_expense"
+        assert intent.args == {"expense_id": 42}
+
+    def test_find_by_day(self):
+        yesterday = (datetime.now(ZoneInfo(TZ)) - timedelta(days=1)).date()
+
+        assert match_intent("show my expenses yesterday", "u1", TZ).args == {
+            "user_id": "u1",
+            "date": yesterday.isoformat(),
+        }
+        assert match_intent("list expenses on 2026-01-05", "u1", TZ).args == {
+            "user_id": "u1",
+            "date": "2026-01-05",
+        }
+
+    def test_find_by_merchant(self):
+        intent = match_intent("find expenses at Swiggy", "u1", TZ)
+        assert intent.args == {"user_id": "u1", "merchant": "swiggy"}
+
+        intent = match_intent("show expenses at Cafe Coffee Day", "u1", TZ)
+        assert intent.args == {"user_id": "u1", "merchant": "cafe coffee day"}
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "show expenses at starbucks yesterday",
+            "show my expenses from amazon last week",
+            "find expenses at swiggy this month",
+            "list expenses at uber on 2026-02-24",
+            "show expenses from zomato on friday",
+            "find expenses at dmart today",
+        ],
+    )
+    def test_merchant_with_period_goes_to_agent(self, text):
+        assert match_intent(text, "u1", TZ) is None
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "spent 200 on fuel",
+            "delete the coffee expense",
+            "delete expense 42 and 43",
+            "weekly report for last month",
+            "show my expenses on 2026-02-30",
+            "why is my weekly report so high",
+        ],
+    )
+    def test_falls_through(self, text):
+        assert match_intent(text, "u1", TZ) is None
+
+
+class TestRouterGraph:
+    """Test routed commands skip the agent and unknown ones reach it."""
+
+    def _run(self, text, user_id="u1"):
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value=AIMessage(content="from agent"))
+        config = {"configurable": {"user_id": user_id, "thread_id": "t", "tz": TZ}}
+
+        with patch("app.core.state_graph.init_db"):
+            graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=model):
+            out = asyncio.run(
+                graph.ainvoke({"messages": [HumanMessage(content=text)]}, config)
+            )
+        return out["messages"], model
+
+    def _log(self, user_id, amount, description):
+        from app.tools.store import log_expense
+
+        ts = datetime.now(ZoneInfo(TZ)).isoformat()
+        entry = {"ts": ts, "amount": amount, "category": "Fuel"}
+        entry.update(description=description, raw_text=description)
+        return log_expense.invoke({"user_id": user_id, "entry": entry})["expense_id"]
+
+    def test_weekly_report_is_templated(self, temp_db):
+        self._log("u1", 250.0, "petrol")
+        reset_router_stats()
+
+        messages, model = self._run("weekly report")
+
+        model.ainvoke.assert_not_called()
+        assert isinstance(messages[1], AIMessage)
+        assert messages[1].tool_calls[0]["name"] == "weekly_report"
+        assert isinstance(messages[2], ToolMessage)
+        assert "₹250.00" in messages[-1].content
+        assert "Fuel" in messages[-1].content
+        assert router_stats()["routed"] == 1
+
+    def test_delete_own_expense(self, temp_db):
+        from app.tools.store import expense_owner
+
+        expense_id = self._log("u1", 100.0, "petrol")
+
+        messages, model = self._run(f"delete expense {expense_id}")
+
+        model.ainvoke.assert_not_called()
+        assert messages[-1].content == f"Deleted expense #{expense_id}."
+        assert expense_owner(expense_id) is None
+
+    def test_other_users_expense_goes_to_agent(self, temp_db):
+        from app.tools.store import expense_owner
+
+        expense_id = self._log("u2", 100.0, "petrol")
+
+        messages, model = self._run(f"delete expense {expense_id}")
+
+        model.ainvoke.assert_called_once()
+        assert messages[-1].content == "from agent"
+        assert expense_owner(expense_id) == "u2"
+
+    def test_find_expenses_lists_matches(self, temp_db):
+        expense_id = self._log("u1", 80.0, "coffee")
+
+        messages, model = self._run("show my expenses today")
+
+        model.ainvoke.assert_not_called()
+        assert f"#{expense_id}" in messages[-1].content
+        assert "coffee" in messages[-1].content
+
+    def test_unrecognized_message_reaches_agent(self, temp_db):
+        messages, model = self._run("can you help me plan a budget")
+
+        model.ainvoke.assert_called_once()
+        assert messages[-1].content == "from agent"
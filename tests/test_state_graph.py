@@ -0,0 +1,53 @@
+"""Tests for the LangGraph agent graph."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.state_graph import _compile
+
+
+class TestAgentGraph:
+    """Test the agent graph runs on both the sync and async paths."""
+
+    def _config(self):
+        return {
+            "configurable": {
+                "user_id": "test_user",
+                "thread_id": "test_thread",
+                "tz": "Asia/Kolkata",
+            }
+        }
+
+    def test_ainvoke_uses_async_model(self):
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value=AIMessage(content="Hello"))
+
+        with patch("app.core.state_graph.init_db"):
+            graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=model):
+            out = asyncio.run(
+                graph.ainvoke(
+                    {"messages": [HumanMessage(content="hi")]}, self._config()
+                )
+            )
+
+        assert out["messages"][-1].content == "Hello"
+        model.invoke.assert_not_called()
+        sent = model.ainvoke.call_args.args[0]
+        assert "user_id=test_user" in sent[1].content
+
+    def test_invoke_uses_sync_model(self):
+        model = MagicMock()
+        model.invoke.return_value = AIMessage(content="Hello")
+
+        with patch("app.core.state_graph.init_db"):
+            graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=model):
+            out = graph.invoke(
+                {"messages": [HumanMessage(content="hi")]}, self._config()
+            )
+
+        assert out["messages"][-1].content == "Hello"
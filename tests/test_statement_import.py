@@ -0,0 +1,154 @@
+"""Tests for streaming bank statement import."""
+
+import io
+import itertools
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.tools.statement_import import (
+    StatementFormatError,
+    import_statement,
+    iter_csv_records,
+    iter_ofx_records,
+)
+
+DEBIT_CSV = """Txn Date,Narration,Withdrawal Amt.,Deposit Amt.
+24/02/2026,HP PETROL PUMP,"1,500.00",
+24/02/2026,SALARY,,50000.00
+25/02/2026,SWIGGY ORDER,320.50,
+"""
+
+SIGNED_CSV = """Date,Description,Amount
+2026-02-24,Amazon order,-999
+2026-02-25,Refund,250
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>INR
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260224120000[+5.5:IST]
+<TRNAMT>-450.00
+<NAME>UBER TRIP
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260225<TRNAMT>100.00<NAME>CASHBACK</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TestStatementParsing:
+    """Test CSV/OFX parsing into debit records."""
+
+    def test_csv_debit_column(self):
+        records = list(iter_csv_records(io.StringIO(DEBIT_CSV)))
+        assert [r["amount"] for r in records] == [1500.0, 320.5]
+        assert records[0]["date"].isoformat() == "2026-02-24"
+        assert records[0]["description"] == "HP PETROL PUMP"
+
+    def test_csv_signed_amounts(self):
+        records = list(iter_csv_records(io.StringIO(SIGNED_CSV)))
+        assert [r["amount"] for r in records] == [999.0]
+
+        records = list(iter_csv_records(io.StringIO(SIGNED_CSV), positive_debits=True))
+        assert [r["amount"] for r in records] == [999.0, 250.0]
+
+    def test_csv_missing_columns(self):
+        with pytest.raises(StatementFormatError):
+            list(iter_csv_records(io.StringIO("Foo,Bar\n1,2\n")))
+
+    def test_ofx_debits_only(self):
+        records = list(iter_ofx_records(io.StringIO(OFX)))
+        assert len(records) == 1
+        assert records[0]["amount"] == 450.0
+        assert records[0]["description"] == "UBER TRIP"
+
+    def test_ofx_bad_date(self):
+        bad = OFX.replace("<DTPOSTED>20260224120000", "<DTPOSTED>20261324120000")
+        with pytest.raises(StatementFormatError):
+            list(iter_ofx_records(io.StringIO(bad)))
+
+    def test_parsing_is_lazy(self):
+        """Test rows are produced one at a time from an unbounded source."""
+        rows = itertools.chain(
+            ["Date,Description,Amount\n"],
+            itertools.repeat("2026-02-24,coffee,-100\n"),
+        )
+        first = list(itertools.islice(iter_csv_records(rows), 3))
+        assert len(first) == 3
+
+
+class TestImportStatement:
+    """Test importing into the database."""
+
+    def test_import_categorizes_and_batches(self, temp_db):
+        stats = import_statement("test_user", io.StringIO(DEBIT_CSV), batch_size=1)
+
+        assert stats["imported"] == 2
+        assert stats["categorized"] == 2
+        assert stats["batches"] == 2
+
+        with sqlite3.connect(temp_db) as conn:
+            rows = conn.execute(
+                "SELECT category, merchant, ts FROM expenses ORDER BY id"
+            ).fetchall()
+        assert rows[0] == ("Fuel", "HP", "2026-02-24T12:00:00+05:30")
+        assert rows[1][:2] == ("Food & Dining", "Swiggy")
+
+    def test_non_inr_rows_skipped(self, temp_db):
+        statement = (
+            "Date,Description,Amount,Currency\n"
+            "2026-02-24,Swiggy order,-300,INR\n"
+            "2026-02-24,Hotel Paris,-120,EUR\n"
+            "2026-02-25,Amazon US,-40,usd\n"
+            "2026-02-25,Petrol,-500,\n"
+        )
+        stats = import_statement("test_user", io.StringIO(statement))
+
+        assert stats["imported"] == 2
+        assert stats["skipped"] == 2
+        with sqlite3.connect(temp_db) as conn:
+            rows = conn.execute(
+                "SELECT amount, currency FROM expenses ORDER BY id"
+            ).fetchall()
+        assert rows == [(300.0, "INR"), (500.0, "INR")]
+
+    def test_bad_row_after_first_batch_imports_nothing(self, temp_db):
+        good = "24/02/2026,SWIGGY ORDER,100,\n" * 3
+        statement = DEBIT_CSV.splitlines()[0] + "\n" + good + "31/31/2026,BAD,50,\n"
+
+        with pytest.raises(StatementFormatError):
+            import_statement("test_user", io.StringIO(statement), batch_size=2)
+
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM expenses").fetchone() == (0,)
+
+    def test_import_api(self, temp_db):
+        from app.api.expenses import router
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/expenses/import?user_id=test_user&format=ofx",
+            content=OFX.encode(),
+            headers={"content-type": "application/x-ofx"},
+        )
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1
+
+        response = client.post(
+            "/api/expenses/import?user_id=test_user&format=ofx",
+            content=OFX.replace("20260224120000", "2026XX24").encode(),
+        )
+        assert response.status_code == 422
+
+        response = client.post(
+            "/api/expenses/import?user_id=test_user",
+            content=b"Foo,Bar\n1,2\n",
+        )
+        assert response.status_code == 422
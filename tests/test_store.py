@@ -1,3 +1,4 @@
+import re
 from unittest.mock import patch, MagicMock
 
 
@@ -43,3 +44,188 @@ class TestLogExpense:
 
             with patch("app.tools.store.Expense", return_value=mock_expense):
                 assert mock_expense.id == 42
+
+
+class TestLogExpensesBatch:
+    """Test batched inserts against a real SQLite database."""
+
+    def test_batch_returns_ids_in_order(self, temp_db, sample_expense_data):
+        from app.tools.store import log_expenses_batch
+
+        entries = [
+            {**sample_expense_data, "amount": float(i + 1), "raw_text": f"item {i}"}
+            for i in range(3)
+        ]
+        ids = log_expenses_batch("test_user", entries)
+
+        assert len(ids) == 3
+        assert ids == sorted(ids)
+
+    def test_log_expenses_tool_single_transaction(self, temp_db, sample_expense_data):
+        """Test the agent's batch tool inserts every entry with one commit."""
+        from app.tools import store
+        from app.tools.store import log_expenses
+
+        entries = [{**sample_expense_data, "amount": a} for a in (200.0, 350.0, 90.0)]
+        with patch.object(store, "SessionLocal", wraps=store.SessionLocal) as sessions:
+            out = log_expenses.invoke({"user_id": "test_user", "entries": entries})
+
+        assert out == {"expense_ids": [1, 2, 3]}
+        assert sessions.call_count == 1
+
+    def test_iso_created_at_accepted(self, temp_db, sample_expense_data):
+        """Test tool-call style ISO strings are stored as datetimes."""
+        from app.tools.store import log_expense
+
+        out = log_expense.invoke({"user_id": "test_user", "entry": sample_expense_data})
+        assert out["expense_id"] == 1
+
+
+class TestFindExpenses:
+    """Test find_expenses over the full-text index."""
+
+    def _log(self, sample_expense_data, rows):
+        from app.tools.store import log_expenses_batch
+
+        entries = [
+            {
+                **sample_expense_data,
+                "description": description,
+                "merchant": merchant,
+                "raw_text": raw_text,
+            }
+            for description, merchant, raw_text in rows
+        ]
+        return log_expenses_batch("test_user", entries)
+
+    def test_substring_match_on_description_and_raw_text(
+        self, temp_db, sample_expense_data
+    ):
+        from app.tools.store import find_expenses
+
+        ids = self._log(
+            sample_expense_data,
+            [
+                ("Groceries", None, "weekly groceries"),
+                ("dinner", "Swiggy", "dinner order"),
+                ("snacks", None, "grocery run snacks"),
+            ],
+        )
+
+        found = find_expenses.invoke({"user_id": "test_user", "description": "GROCER"})
+        assert sorted(e["id"] for e in found) == [ids[0], ids[2]]
+
+        found = find_expenses.invoke({"user_id": "test_user", "merchant": "wigg"})
+        assert [e["id"] for e in found] == [ids[1]]
+
+    def test_index_follows_updates_and_deletes(self, temp_db, sample_expense_data):
+        from app.tools.store import delete_expense, find_expenses, update_expense
+
+        first, second = self._log(
+            sample_expense_data,
+            [("coffee", "Starbucks", "coffee"), ("tea", "Chaayos", "tea")],
+        )
+        update_expense.invoke(
+            {"expense_id": second, "updates": {"merchant": "Starbucks Reserve"}}
+        )
+        delete_expense.invoke({"expense_id": first})
+
+        found = find_expenses.invoke({"user_id": "test_user", "merchant": "starbucks"})
+        assert [e["id"] for e in found] == [second]
+
+    def test_matches_are_newest_first(self, temp_db, sample_expense_data):
+        from app.tools.store import find_expenses
+
+        days = ["2026-02-20", "2026-02-24", "2026-02-22"]
+        ids = [
+            self._log(
+                {**sample_expense_data, "ts": f"{day}T09:00:00+05:30"},
+                [(description, None, description)],
+            )[0]
+            for day, description in zip(days, ["coffee", "coffee", "coffee coffee"])
+        ]
+        newest_first = [ids[1], ids[2], ids[0]]
+
+        found = find_expenses.invoke({"user_id": "test_user", "description": "coffee"})
+        assert [e["id"] for e in found] == newest_first
+
+        # Same order when the matches come from the index, not the recent rows
+        with patch("app.tools.store.RECENT_ROWS", 1):
+            found = find_expenses.invoke(
+                {"user_id": "test_user", "description": "coffee"}
+            )
+        assert [e["id"] for e in found] == newest_first
+
+    def test_short_terms_and_other_users(self, temp_db, sample_expense_data):
+        from app.tools.store import find_expenses
+
+        (own,) = self._log(sample_expense_data, [("tv", "LG", "tv")])
+
+        found = find_expenses.invoke({"user_id": "test_user", "merchant": "lg"})
+        assert [e["id"] for e in found] == [own]
+        assert find_expenses.invoke({"user_id": "other", "merchant": "lg"}) == []
+
+
+class TestFindExpensesQueryPlan:
+    """Guard find_expenses' SQL against full scans and sort steps."""
+
+    def _plans(self, temp_db, **filters):
+        import sqlite3
+
+        from sqlalchemy import event
+
+        from app.tools import store
+
+        statements = []
+        engine = store.SessionLocal.kw["bind"]
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith("SELECT expenses.id"):
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            store.find_expenses.invoke({"user_id": "test_user", **filters})
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert statements
+        with sqlite3.connect(temp_db) as conn:
+            return [
+                " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {s}", p))
+                for s, p in statements
+            ]
+
+    def test_date_lookup_uses_day_index_without_sort(self, temp_db):
+        (plan,) = self._plans(temp_db, date="2026-02-25")
+
+        assert "idx_expenses_user_day_epoch (user_id=? AND local_day=?)" in plan
+        assert not re.search(r"SCAN expenses\b(?!_fts)", plan)
+        assert "TEMP B-TREE" not in plan
+
+    def test_latest_lookup_reads_epoch_index_in_order(self, temp_db):
+        (plan,) = self._plans(temp_db)
+
+        assert "idx_expenses_user_epoch (user_id=?)" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_text_lookup_never_scans_expenses(self, temp_db):
+        # Recent rows first, then (with fewer than 5 hits) the trigram index
+        recent, indexed = self._plans(
+            temp_db, merchant="kumar stores", date="2026-02-25"
+        )
+
+        assert "idx_expenses_user_day_epoch (user_id=? AND local_day=?)" in recent
+        assert "expenses_fts VIRTUAL TABLE" in indexed
+        assert not re.search(r"SCAN expenses\b(?!_fts)", recent + indexed)
+
+    def test_known_merchant_never_scans_expenses(self, temp_db):
+        # The merchant id and the trigram matches are read as a union of
+        # both indexes, not by walking every row the user has
+        recent, indexed = self._plans(temp_db, merchant="swiggy")
+
+        assert (
+            "idx_expenses_user_merchant_epoch (user_id=? AND merchant_id=?)" in indexed
+        )
+        assert "expenses_fts VIRTUAL TABLE" in indexed
+        assert not re.search(r"SCAN expenses\b(?!_fts)", recent + indexed)
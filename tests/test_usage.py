@@ -0,0 +1,177 @@
+"""Tests for LLM token usage accounting and the usage report."""
+
+import asyncio
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.db.engine import connection
+from app.db.usage import cost_usd, get_usage_recorder, usage_report
+
+DAY = "2026-02-10"
+
+
+def _usage(input_tokens, output_tokens):
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _rows(db_path):
+    with connection(db_path) as conn:
+        return conn.execute(
+            "SELECT user_id, day, thread_id, node, calls, input_tokens, "
+            "output_tokens, total_tokens FROM llm_usage ORDER BY node"
+        ).fetchall()
+
+
+def _reply(content="ok"):
+    return AIMessage(content=content, usage_metadata=_usage(100, 10))
+
+
+class TestUsageRecorder:
+    """Test in-memory aggregation and upserts."""
+
+    def test_flush_aggregates_and_upserts(self, temp_db):
+        recorder = get_usage_recorder()
+        recorder.record("u1", "t1", "agent", DAY, _usage(100, 10))
+        recorder.record("u1", "t1", "agent", DAY, _usage(50, 5))
+        assert recorder.flush() == 1
+        recorder.record("u1", "t1", "agent", DAY, _usage(1, 1))
+        recorder.flush()
+
+        assert _rows(temp_db) == [("u1", DAY, "t1", "agent", 3, 151, 16, 167)]
+        assert recorder.stats()["pending_rows"] == 0
+        assert recorder.flush() == 0
+
+    def test_failed_flush_keeps_counts(self, temp_db):
+        recorder = get_usage_recorder()
+        recorder.record("u1", "t1", "agent", DAY, _usage(10, 1))
+        with patch("app.db.usage.connection", side_effect=RuntimeError("locked")):
+            with pytest.raises(RuntimeError):
+                recorder.flush()
+        recorder.record("u1", "t1", "agent", DAY, _usage(10, 1))
+        recorder.flush()
+
+        assert _rows(temp_db)[0][4:6] == (2, 20)
+
+
+class TestUsageReport:
+    """Test grouping, ordering and cost estimates."""
+
+    @pytest.fixture
+    def recorded(self, temp_db):
+        recorder = get_usage_recorder()
+        recorder.record("u1", "t1", "agent", "2026-02-09", _usage(1000, 100))
+        recorder.record("u1", "t1", "process_expense", DAY, _usage(500, 50))
+        recorder.record("u1", "t2", "agent", DAY, _usage(9000, 900))
+        recorder.record("u2", "t3", "agent", DAY, _usage(100, 10))
+        recorder.record("u2", "t3", "agent", "2026-01-01", _usage(5, 5))
+        recorder.flush()
+        return temp_db
+
+    def test_groups_heaviest_first(self, recorded):
+        with connection(recorded) as conn:
+            report = usage_report(
+                conn, date(2026, 2, 1), date(2026, 2, 28), ["user_id", "thread_id"]
+            )
+
+        assert [(r["user_id"], r["thread_id"]) for r in report["rows"]] == [
+            ("u1", "t2"),
+            ("u1", "t1"),
+            ("u2", "t3"),
+        ]
+        assert report["rows"][1]["calls"] == 2
+        assert report["totals"]["input_tokens"] == 10600
+        assert report["totals"]["cost_usd"] == cost_usd(10600, 1060)
+
+    def test_filters_by_user_and_groups_by_node(self, recorded):
+        with connection(recorded) as conn:
+            report = usage_report(
+                conn, date(2026, 2, 1), date(2026, 2, 28), ["node"], user_id="u1"
+            )
+
+        assert {r["node"]: r["total_tokens"] for r in report["rows"]} == {
+            "agent": 11000,
+            "process_expense": 550,
+        }
+
+    def test_unknown_group_rejected(self, recorded):
+        with connection(recorded) as conn:
+            with pytest.raises(ValueError):
+                usage_report(conn, date(2026, 2, 1), date(2026, 2, 28), ["amount"])
+
+
+class TestUsageCallback:
+    """Test Gemini calls are recorded against user, thread and node."""
+
+    def test_graph_calls_recorded_per_node(self, temp_db):
+        from app.core.llm import LLMUsage
+        from app.core.state_graph import _compile
+
+        model = GenericFakeChatModel(messages=iter([_reply()]), callbacks=[LLMUsage()])
+        graph = _compile(MemorySaver())
+        with patch("app.core.state_graph._agent_model", return_value=model):
+            asyncio.run(
+                graph.ainvoke(
+                    {"messages": [HumanMessage(content="how am I doing")]},
+                    {"configurable": {"user_id": "u1", "thread_id": "t1"}},
+                )
+            )
+        get_usage_recorder().flush()
+
+        ((user_id, _, thread_id, node, calls, *_),) = _rows(temp_db)
+        assert (user_id, thread_id, node, calls) == ("u1", "t1", "agent", 1)
+
+    def test_llm_call_label_outside_graph(self, temp_db):
+        from app.core.llm import LLMUsage
+
+        model = GenericFakeChatModel(messages=iter([_reply()]), callbacks=[LLMUsage()])
+        model.with_config(metadata={"llm_call": "process_expense"}).invoke(
+            "coffee 150", {"configurable": {"user_id": "u2"}}
+        )
+        get_usage_recorder().flush()
+
+        ((user_id, _, thread_id, node, *_),) = _rows(temp_db)
+        assert (user_id, thread_id, node) == ("u2", "", "process_expense")
+
+
+class TestUsageEndpoint:
+    """Test the /api/analytics/usage endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        from app.api.analytics import router
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_report_includes_unflushed_calls(self, client, temp_db):
+        today = date.today().isoformat()
+        get_usage_recorder().record("u1", "t1", "agent", today, _usage(100, 10))
+
+        response = client.get(
+            "/api/analytics/usage", params={"group_by": ["thread_id", "node"]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["group_by"] == ["thread_id", "node"]
+        assert data["rows"][0]["thread_id"] == "t1"
+        assert data["rows"][0]["user_id"] is None
+        assert data["totals"]["total_tokens"] == 110
+
+    def test_bad_range_rejected(self, client, temp_db):
+        response = client.get(
+            "/api/analytics/usage", params={"start": "2026-02-10", "end": "2026-02-01"}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,107 @@
+"""Tests for the group-commit write queue."""
+
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.db import rollups
+from app.db.write_queue import WriteQueue
+
+
+@pytest.fixture
+def write_queue(temp_db):
+    """Route the store tools through a write queue on the temp database."""
+    from app.tools import store
+
+    wq = WriteQueue(store.SessionLocal, max_batch=64, max_wait_ms=20)
+    with patch("app.tools.store.get_write_queue", return_value=wq):
+        yield wq
+    wq.stop()
+
+
+class TestWriteQueue:
+    """Test coalescing, synchronous results and failure isolation."""
+
+    def test_concurrent_inserts_share_commits(self, temp_db, write_queue, make_entry):
+        from app.tools.store import log_expense
+
+        ids = []
+        barrier = threading.Barrier(16)
+
+        def write():
+            barrier.wait()
+            ids.append(log_expense.invoke({"user_id": "u", "entry": make_entry()}))
+
+        threads = [threading.Thread(target=write) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({i["expense_id"] for i in ids}) == 16
+        stats = write_queue.stats()
+        assert stats["committed"] == 16
+        assert stats["batches"] < 16
+        assert stats["max_batch_size"] > 1
+        assert stats["depth"] == 0
+
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM expenses").fetchone() == (16,)
+            assert rollups.verify(conn) == []
+
+    def test_updates_and_deletes_go_through_queue(
+        self, temp_db, write_queue, make_entry
+    ):
+        from app.tools.store import delete_expense, log_expense, update_expense
+
+        expense_id = log_expense.invoke({"user_id": "u", "entry": make_entry()})[
+            "expense_id"
+        ]
+        assert update_expense.invoke(
+            {"expense_id": expense_id, "updates": {"amount": 25.0}}
+        ) == {"updated_expense_id": expense_id}
+        assert delete_expense.invoke({"expense_id": expense_id}) == {
+            "deleted_expense_id": expense_id
+        }
+        assert delete_expense.invoke({"expense_id": expense_id}) == {
+            "error": "Expense not found"
+        }
+        assert write_queue.stats()["committed"] == 4
+
+    def test_failing_op_does_not_fail_its_batch(self, temp_db, write_queue, make_entry):
+        from app.tools.store import _insert_expenses
+
+        def bad(db):
+            _insert_expenses(db, "u", [make_entry()])
+            raise ValueError("bad write")
+
+        write_queue.start()
+        good = write_queue.submit(
+            lambda db: _insert_expenses(db, "u", [make_entry(5.0)])
+        )
+        failed = write_queue.submit(bad)
+
+        assert len(good.result(timeout=5)) == 1
+        with pytest.raises(ValueError):
+            failed.result(timeout=5)
+
+        stats = write_queue.stats()
+        assert stats["failed"] == 1
+        assert stats["retried_batches"] == 1
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("SELECT SUM(amount) FROM expenses").fetchone() == (5.0,)
+
+    def test_stop_drains_pending_writes(self, temp_db, make_entry):
+        from app.tools import store
+
+        wq = WriteQueue(store.SessionLocal, max_wait_ms=50)
+        futures = [
+            wq.submit(lambda db: store._insert_expenses(db, "u", [make_entry()]))
+            for _ in range(5)
+        ]
+        wq.stop()
+
+        assert all(f.done() for f in futures)
+        assert wq.stats()["committed"] == 5